@@ -0,0 +1,75 @@
+import asyncio
+
+import unify
+
+from .helpers import _handle_project
+
+
+@_handle_project
+def test_log_entry():
+    async def main():
+        async with unify.aio.session():
+            data = {
+                "question": "What is 1 + 1?",
+                "answer": "It's 2",
+            }
+            assert len(await unify.aio.get_logs()) == 0
+            log_id = (await unify.aio.log(**data)).id
+            project_logs = await unify.aio.get_logs()
+            assert len(project_logs) and project_logs[0].id == log_id
+            id_log = await unify.aio.get_log_by_id(log_id)
+            assert len(id_log) and "question" in id_log.entries
+            await unify.aio.delete_log_fields(field="question", logs=log_id)
+            id_log = await unify.aio.get_log_by_id(log_id)
+            assert len(id_log) and "question" not in id_log.entries
+            await unify.aio.add_log_entries(logs=log_id, question=data["question"])
+            id_log = await unify.aio.get_log_by_id(log_id)
+            assert len(id_log) and "question" in id_log.entries
+            await unify.aio.delete_logs(logs=log_id)
+            assert len(await unify.aio.get_logs()) == 0
+
+    asyncio.run(main())
+
+
+@_handle_project
+def test_concurrent_create_logs():
+    async def main():
+        async with unify.aio.session():
+            await asyncio.gather(
+                *[unify.aio.create_logs(entries=[{"x": i}]) for i in range(10)],
+            )
+            assert len(await unify.aio.get_logs()) == 10
+            assert len(unify.get_logs()) == 10
+
+    asyncio.run(main())
+
+
+@_handle_project
+def test_contexts():
+    async def main():
+        async with unify.aio.session():
+            assert len(await unify.aio.get_contexts()) == 0
+            await unify.aio.create_context("my_context")
+            assert "my_context" in await unify.aio.get_contexts()
+            await unify.aio.delete_context("my_context")
+            assert "my_context" not in await unify.aio.get_contexts()
+
+    asyncio.run(main())
+
+
+@_handle_project
+def test_upload_and_download_dataset():
+    async def main():
+        async with unify.aio.session():
+            await unify.aio.upload_dataset("my_dataset", [0, 1, 2])
+            assert "my_dataset" in await unify.aio.list_datasets()
+            dataset = await unify.aio.download_dataset("my_dataset")
+            assert [lg.entries["data"] for lg in dataset] == [0, 1, 2]
+            await unify.aio.delete_dataset("my_dataset")
+            assert "my_dataset" not in await unify.aio.list_datasets()
+
+    asyncio.run(main())
+
+
+if __name__ == "__main__":
+    pass
@@ -189,15 +189,15 @@ def test_traced_uni_llm_w_caching():
 @_handle_project
 def test_traced_w_caching():
     local_cache_path = _cache_fpath.replace(
-        ".cache.json",
-        ".test_traced_w_cached.cache.json",
+        ".cache.db",
+        ".test_traced_w_cached.cache.db",
     )
     if os.path.exists(local_cache_path):
         os.remove(local_cache_path)
 
     try:
         unify.set_caching(True)
-        unify.set_caching_fname(".test_traced_w_cached.cache.json")
+        unify.set_caching_fname(".test_traced_w_cached.cache.db")
 
         @unify.traced
         def some_func(a, b, c):
@@ -227,7 +227,7 @@ def test_get_source():
 
 @_handle_project
 def test_log_caching():
-    cache_fname = ".test_log_caching.cache.json"
+    cache_fname = ".test_log_caching.cache.db"
     if os.path.exists(cache_fname):
         os.remove(cache_fname)
     unify.set_caching(True)
@@ -1,4 +1,7 @@
+import os
+
 import unify
+from unify.utils.helpers import _is_known_project
 
 
 def test_project():
@@ -29,5 +32,21 @@ def test_project_thread_lock():
     unify.delete_project("test_project")
 
 
+def test_known_projects_cache():
+    name = "my_project"
+    api_key = os.environ["UNIFY_KEY"]
+    if name in unify.list_projects():
+        unify.delete_project(name)
+    assert not _is_known_project(api_key, name)
+    unify.create_project(name)
+    assert _is_known_project(api_key, name)
+    new_name = "my_project1"
+    unify.rename_project(name, new_name)
+    assert not _is_known_project(api_key, name)
+    assert _is_known_project(api_key, new_name)
+    unify.delete_project(new_name)
+    assert not _is_known_project(api_key, new_name)
+
+
 if __name__ == "__main__":
     pass
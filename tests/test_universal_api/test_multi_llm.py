@@ -1,3 +1,7 @@
+import asyncio
+import threading
+import time
+
 import pytest
 from unify import AsyncMultiUnify, MultiUnify
 
@@ -9,6 +13,22 @@ class TestMultiUnify:
             cache=True,
         )
 
+    def test_invalid_endpoints(self) -> None:
+        with pytest.raises(AssertionError):
+            MultiUnify(endpoints=["gpt-4o@openai", "not-a-model@not-a-provider"])
+
+    def test_deferred_validation(self) -> None:
+        client = MultiUnify(
+            endpoints=["gpt-4o@openai"],
+            defer_validation=True,
+            cache=True,
+        )
+        client.add_endpoints("not-a-model@not-a-provider")
+        with pytest.raises(AssertionError):
+            client.generate("Hello, how it is going?")
+        client.remove_endpoints("not-a-model@not-a-provider")
+        client.generate("Hello, how it is going?")
+
     def test_add_endpoints(self):
         endpoints = ("llama-3-8b-chat@together-ai", "gpt-4o@openai")
         client = MultiUnify(endpoints=endpoints, cache=True)
@@ -105,6 +125,31 @@ class TestMultiUnify:
             "gpt-4-turbo@openai",
         }
 
+    def test_persistent_event_loop(self):
+        client = MultiUnify(
+            endpoints=("gpt-4o@openai", "claude-3.5-sonnet@anthropic"),
+            defer_validation=True,
+        )
+        loops = set()
+
+        async def generate(**kwargs):
+            loops.add(asyncio.get_running_loop())
+            return "response"
+
+        for endpoint_client in client.clients.values():
+            endpoint_client.generate = generate
+        threads = [
+            threading.Thread(target=client._generate, kwargs=dict(messages=[]))
+            for _ in range(4)
+        ]
+        [thread.start() for thread in threads]
+        [thread.join() for thread in threads]
+        assert len(loops) == 1
+        client.close()
+        assert client._generate(messages=[])["gpt-4o@openai"] == "response"
+        assert len(loops) == 2
+        client.close()
+
 
 @pytest.mark.asyncio
 class TestAsyncMultiUnify:
@@ -123,6 +168,71 @@ class TestAsyncMultiUnify:
             assert isinstance(response, str)
             assert len(response) > 0
 
+    async def test_concurrent_fan_out(self):
+        endpoints = ("gpt-4o@openai", "claude-3.5-sonnet@anthropic", "o1@openai")
+        client = AsyncMultiUnify(
+            endpoints=endpoints,
+            defer_validation=True,
+            endpoint_timeout=0.5,
+            return_partial=True,
+        )
+        delays = {"gpt-4o@openai": 0.2, "claude-3.5-sonnet@anthropic": 0.2}
+
+        def _fake_generate(endpoint):
+            async def generate(**kwargs):
+                await asyncio.sleep(delays.get(endpoint, 5.0))
+                return endpoint
+
+            return generate
+
+        for endpoint, endpoint_client in client.clients.items():
+            endpoint_client.generate = _fake_generate(endpoint)
+        start = time.perf_counter()
+        responses = await client._generate(messages=[])
+        assert time.perf_counter() - start < 1.0
+        assert responses["gpt-4o@openai"] == "gpt-4o@openai"
+        assert responses["claude-3.5-sonnet@anthropic"] == "claude-3.5-sonnet@anthropic"
+        assert isinstance(responses["o1@openai"], asyncio.TimeoutError)
+        client._return_partial = False
+        with pytest.raises(asyncio.TimeoutError):
+            await client._generate(messages=[])
+
+    async def test_hedged_requests(self):
+        endpoints = ("gpt-4o@openai", "claude-3.5-sonnet@anthropic", "o1@openai")
+        client = AsyncMultiUnify(endpoints=endpoints, defer_validation=True, hedge=True)
+        delays = {"gpt-4o@openai": 5.0, "claude-3.5-sonnet@anthropic": 0.1}
+        launched, cancelled = list(), list()
+
+        def _fake_generate(endpoint):
+            async def generate(**kwargs):
+                launched.append(endpoint)
+                try:
+                    if endpoint not in delays:
+                        raise Exception("endpoint failed")
+                    await asyncio.sleep(delays[endpoint])
+                except asyncio.CancelledError:
+                    cancelled.append(endpoint)
+                    raise
+                return endpoint
+
+            return generate
+
+        for endpoint, endpoint_client in client.clients.items():
+            endpoint_client.generate = _fake_generate(endpoint)
+        start = time.perf_counter()
+        assert await client._generate(messages=[]) == "claude-3.5-sonnet@anthropic"
+        assert time.perf_counter() - start < 1.0
+        await asyncio.sleep(0)
+        assert cancelled == ["gpt-4o@openai"]
+
+        # staggered, the slow primary gets a head start before the others launch
+        launched.clear()
+        client._hedge_delay = 0.3
+        client._hedge_delays = None
+        delays["gpt-4o@openai"] = 0.1
+        assert await client._generate(messages=[]) == "gpt-4o@openai"
+        assert launched == ["gpt-4o@openai"]
+
 
 if __name__ == "__main__":
     pass
@@ -0,0 +1,57 @@
+import pytest
+from unify.universal_api.clients.helpers import (
+    MetaProvider,
+    RoutingStep,
+    _parse_endpoint,
+    _parse_meta_provider,
+    _parse_provider,
+)
+
+
+def test_parse_fallback_chains() -> None:
+    assert _parse_endpoint("gpt-4o@openai->claude-3-haiku@anthropic") == (
+        RoutingStep("gpt-4o", "openai"),
+        RoutingStep("claude-3-haiku", "anthropic"),
+    )
+    assert _parse_endpoint("gpt-4o@openai->azure-ai") == (
+        RoutingStep("gpt-4o", "openai"),
+        RoutingStep("gpt-4o", "azure-ai"),
+    )
+    assert _parse_endpoint("gpt-4o->gpt-4o-mini@openai") == (
+        RoutingStep("gpt-4o", "openai"),
+        RoutingStep("gpt-4o-mini", "openai"),
+    )
+    assert _parse_provider("openai->anthropic") == (
+        RoutingStep(None, "openai"),
+        RoutingStep(None, "anthropic"),
+    )
+    with pytest.raises(ValueError):
+        _parse_endpoint("gpt-4o@openai@azure-ai")
+
+
+def test_parse_meta_provider() -> None:
+    assert _parse_meta_provider("q:1|ttft:0.5|providers:openai, anthropic") == (
+        MetaProvider(
+            metrics=(("q", ":", 1.0), ("ttft", ":", 0.5)),
+            providers=("openai", "anthropic"),
+        )
+    )
+    assert _parse_meta_provider("lowest-cost|c<=.5|skip_models:gpt-4o") == (
+        MetaProvider(
+            metrics=(("lowest-cost", None, None), ("c", "<=", 0.5)),
+            skip_models=("gpt-4o",),
+        )
+    )
+    assert _parse_meta_provider("openai") is None
+    assert _parse_meta_provider("q:abc") is None
+    step = _parse_endpoint("router@highest-quality")[0]
+    assert step.meta == MetaProvider(metrics=(("highest-quality", None, None),))
+
+
+def test_parse_is_memoized() -> None:
+    endpoint = "router@q:1|i:0.5|models:gpt-4o"
+    assert _parse_endpoint(endpoint) is _parse_endpoint(endpoint)
+
+
+if __name__ == "__main__":
+    pass
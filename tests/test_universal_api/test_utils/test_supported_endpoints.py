@@ -1,3 +1,6 @@
+import json
+import os
+
 import pytest
 import unify
 
@@ -102,5 +105,85 @@ class TestSupportedEndpoints:
             unify.list_endpoints("gpt-4o", "openai")
 
 
+class TestCatalogCache:
+    def test_catalog_is_cached(self, monkeypatch, tmp_path) -> None:
+        from unify.universal_api.utils import supported_endpoints
+
+        monkeypatch.setenv("UNIFY_CACHE_DIR", str(tmp_path))
+        monkeypatch.setattr(unify.utils._caching, "_cache_dir", str(tmp_path))
+        monkeypatch.setattr(supported_endpoints, "_catalog", None)
+        unify.refresh_catalog()
+        assert os.path.exists(tmp_path / supported_endpoints.CATALOG_FNAME)
+        mtime = os.path.getmtime(tmp_path / supported_endpoints.CATALOG_FNAME)
+        endpoints = unify.list_endpoints()
+        assert endpoints == unify.list_endpoints()
+        assert mtime == os.path.getmtime(tmp_path / supported_endpoints.CATALOG_FNAME)
+
+        # a fresh process reloads the on-disk snapshot
+        def unreachable(*args, **kwargs):
+            raise AssertionError("catalog fetched again")
+
+        monkeypatch.setattr(supported_endpoints, "_catalog", None)
+        monkeypatch.setattr(supported_endpoints.http, "get", unreachable)
+        assert unify.list_endpoints() == endpoints
+
+    def test_catalog_is_per_base_url(self, monkeypatch, tmp_path) -> None:
+        from unify.universal_api.utils import supported_endpoints
+
+        class Response:
+            status_code = 200
+
+            def __init__(self, url):
+                self.text = json.dumps([url.split("/")[2] + "@test"])
+
+        monkeypatch.setattr(unify.utils._caching, "_cache_dir", str(tmp_path))
+        monkeypatch.setattr(supported_endpoints, "_catalog", None)
+        monkeypatch.setattr(
+            supported_endpoints.http,
+            "get",
+            lambda url, **kwargs: Response(url),
+        )
+        monkeypatch.setattr(supported_endpoints, "BASE_URL", "https://prod/v0")
+        assert unify.list_endpoints() == ["prod@test"]
+        monkeypatch.setattr(supported_endpoints, "_catalog", None)
+        monkeypatch.setattr(supported_endpoints, "BASE_URL", "https://staging/v0")
+        assert unify.list_endpoints() == ["staging@test"]
+
+    def test_catalog_is_not_written_by_default(self, monkeypatch, tmp_path) -> None:
+        from unify.universal_api.utils import supported_endpoints
+
+        class Response:
+            status_code = 200
+            text = json.dumps(["gpt-4o@openai"])
+
+        monkeypatch.delenv("UNIFY_CACHE_DIR", raising=False)
+        monkeypatch.setattr(unify.utils._caching, "CACHING", False)
+        monkeypatch.setattr(unify.utils._caching, "_cache_dir", str(tmp_path))
+        monkeypatch.setattr(supported_endpoints, "_catalog", None)
+        monkeypatch.setattr(
+            supported_endpoints.http,
+            "get",
+            lambda url, **kwargs: Response(),
+        )
+        assert unify.list_endpoints() == ["gpt-4o@openai"]
+        assert not os.path.exists(tmp_path / supported_endpoints.CATALOG_FNAME)
+        unify.set_caching(True)
+        try:
+            unify.refresh_catalog()
+        finally:
+            unify.set_caching(False)
+        assert os.path.exists(tmp_path / supported_endpoints.CATALOG_FNAME)
+
+    def test_catalog_ttl(self, monkeypatch, tmp_path) -> None:
+        from unify.universal_api.utils import supported_endpoints
+
+        monkeypatch.setattr(unify.utils._caching, "_cache_dir", str(tmp_path))
+        monkeypatch.setattr(supported_endpoints, "_catalog", None)
+        monkeypatch.setattr(supported_endpoints, "CATALOG_TTL", 3600)
+        unify.set_catalog_ttl(0)
+        assert unify.list_models()
+        assert not os.path.exists(tmp_path / supported_endpoints.CATALOG_FNAME)
+
+
 if __name__ == "__main__":
     pass
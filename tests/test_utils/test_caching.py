@@ -1,18 +1,49 @@
+import asyncio
+import functools
+import gc
+import json
+import multiprocessing
 import os
+import sqlite3
+import threading
 import time
 
+import pytest
 import unify
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
 from unify import Unify
-from unify.utils._caching import _cache_fpath
+from unify.utils._caching import (
+    SQLiteCacheBackend,
+    _cache_fpath,
+    _cache_key,
+    _get_cache,
+    _get_cache_async,
+    _record_stream,
+    _replay_stream,
+    _write_to_cache,
+    _write_to_cache_async,
+)
+
+
+def _mtime(path: str) -> float:
+    # sqlite appends writes to the write-ahead log before checkpointing them
+    paths = [path, path + "-wal"]
+    return max(os.path.getmtime(p) for p in paths if os.path.exists(p))
+
+
+def _remove(path: str) -> None:
+    for p in [path, path + "-wal", path + "-shm"]:
+        if os.path.exists(p):
+            os.remove(p)
 
 
 # noinspection PyBroadException
 def test_cache() -> None:
-    local_cache_path = _cache_fpath.replace(".cache.json", ".test_cache.json")
+    local_cache_path = _cache_fpath.replace(".cache.db", ".test_cache.db")
     try:
         unify.utils._caching._cache_fpath = local_cache_path
         if os.path.exists(local_cache_path):
-            os.remove(local_cache_path)
+            _remove(local_cache_path)
         client = Unify(
             endpoint="gpt-4o@openai",
         )
@@ -20,55 +51,55 @@ def test_cache() -> None:
         r0 = client.generate(user_message="hello", cache=True)
         t0 = time.perf_counter() - t
         assert os.path.exists(local_cache_path)
-        mt0 = os.path.getmtime(local_cache_path)
+        mt0 = _mtime(local_cache_path)
         t = time.perf_counter()
         r1 = client.generate(user_message="hello", cache=True)
-        mt1 = os.path.getmtime(local_cache_path)
+        mt1 = _mtime(local_cache_path)
         t1 = time.perf_counter() - t
         assert t1 < t0
         assert mt0 == mt1
         assert r0 == r1
-        os.remove(local_cache_path)
-        global_cache_path = local_cache_path.replace(".test_cache.json", ".cache.json")
+        _remove(local_cache_path)
+        global_cache_path = local_cache_path.replace(".test_cache.db", ".cache.db")
         unify.utils._caching._cache_fpath = global_cache_path
     except Exception as e:
         if os.path.exists(local_cache_path):
-            os.remove(local_cache_path)
+            _remove(local_cache_path)
         raise e
 
 
 # noinspection PyBroadException
 def test_cache_write() -> None:
-    local_cache_path = _cache_fpath.replace(".cache.json", ".test_cache.json")
+    local_cache_path = _cache_fpath.replace(".cache.db", ".test_cache.db")
     try:
         unify.utils._caching._cache_fpath = local_cache_path
         if os.path.exists(local_cache_path):
-            os.remove(local_cache_path)
+            _remove(local_cache_path)
         client = Unify(
             endpoint="gpt-4o@openai",
         )
         client.generate(user_message="hello", cache="write")
         assert os.path.exists(local_cache_path)
-        mt0 = os.path.getmtime(local_cache_path)
+        mt0 = _mtime(local_cache_path)
         client.generate(user_message="hello", cache="write")
-        mt1 = os.path.getmtime(local_cache_path)
+        mt1 = _mtime(local_cache_path)
         assert mt0 < mt1
-        os.remove(local_cache_path)
-        global_cache_path = local_cache_path.replace(".test_cache.json", ".cache.json")
+        _remove(local_cache_path)
+        global_cache_path = local_cache_path.replace(".test_cache.db", ".cache.db")
         unify.utils._caching._cache_fpath = global_cache_path
     except Exception as e:
         if os.path.exists(local_cache_path):
-            os.remove(local_cache_path)
+            _remove(local_cache_path)
         raise e
 
 
 # noinspection PyBroadException
 def test_cache_read() -> None:
-    local_cache_path = _cache_fpath.replace(".cache.json", ".test_cache.json")
+    local_cache_path = _cache_fpath.replace(".cache.db", ".test_cache.db")
     try:
         unify.utils._caching._cache_fpath = local_cache_path
         if os.path.exists(local_cache_path):
-            os.remove(local_cache_path)
+            _remove(local_cache_path)
         client = Unify(
             endpoint="gpt-4o@openai",
         )
@@ -76,30 +107,30 @@ def test_cache_read() -> None:
         r0 = client.generate(user_message="hello", cache="write")
         t0 = time.perf_counter() - t
         assert os.path.exists(local_cache_path)
-        mt0 = os.path.getmtime(local_cache_path)
+        mt0 = _mtime(local_cache_path)
         t = time.perf_counter()
         r1 = client.generate(user_message="hello", cache="read")
-        mt1 = os.path.getmtime(local_cache_path)
+        mt1 = _mtime(local_cache_path)
         t1 = time.perf_counter() - t
         assert t1 < t0
         assert mt0 == mt1
         assert r0 == r1
-        os.remove(local_cache_path)
-        global_cache_path = local_cache_path.replace(".test_cache.json", ".cache.json")
+        _remove(local_cache_path)
+        global_cache_path = local_cache_path.replace(".test_cache.db", ".cache.db")
         unify.utils._caching._cache_fpath = global_cache_path
     except Exception as e:
         if os.path.exists(local_cache_path):
-            os.remove(local_cache_path)
+            _remove(local_cache_path)
         raise e
 
 
 # noinspection PyBroadException
 def test_cache_read_only() -> None:
-    local_cache_path = _cache_fpath.replace(".cache.json", ".test_cache.json")
+    local_cache_path = _cache_fpath.replace(".cache.db", ".test_cache.db")
     try:
         unify.utils._caching._cache_fpath = local_cache_path
         if os.path.exists(local_cache_path):
-            os.remove(local_cache_path)
+            _remove(local_cache_path)
         client = Unify(
             endpoint="gpt-4o@openai",
         )
@@ -107,15 +138,15 @@ def test_cache_read_only() -> None:
         r0 = client.generate(user_message="hello", cache="write")
         t0 = time.perf_counter() - t
         assert os.path.exists(local_cache_path)
-        mt0 = os.path.getmtime(local_cache_path)
+        mt0 = _mtime(local_cache_path)
         t = time.perf_counter()
         r1 = client.generate(user_message="hello", cache="read-only")
-        mt1 = os.path.getmtime(local_cache_path)
+        mt1 = _mtime(local_cache_path)
         t1 = time.perf_counter() - t
         assert t1 < t0
         assert mt0 == mt1
         assert r0 == r1
-        os.remove(local_cache_path)
+        _remove(local_cache_path)
         unify._caching._cache = None
         try:
             client.generate(user_message="hello", cache="read-only")
@@ -123,13 +154,333 @@ def test_cache_read_only() -> None:
         except Exception:
             raised_exception = True
         assert raised_exception, "read-only mode should have raised exception"
-        global_cache_path = local_cache_path.replace(".test_cache.json", ".cache.json")
+        global_cache_path = local_cache_path.replace(".test_cache.db", ".cache.db")
         unify.utils._caching._cache_fpath = global_cache_path
     except Exception as e:
         if os.path.exists(local_cache_path):
-            os.remove(local_cache_path)
+            _remove(local_cache_path)
         raise e
 
 
+def test_migrate_json_cache(tmp_path) -> None:
+    json_path = os.path.join(tmp_path, "legacy.json")
+    with open(json_path, "w") as f:
+        json.dump({'fn_{"a": 1}': "[1, 2]", 'fn_{"a": 2}': '"b"'}, f)
+    filename = os.path.join(tmp_path, "migrated.db")
+    assert unify.migrate_json_cache(json_path, filename) == 2
+    assert _get_cache("fn", {"a": 1}, filename) == [1, 2]
+    assert _get_cache("fn", {"a": 2}, filename) == "b"
+    assert _get_cache("fn", {"a": 3}, filename) is None
+
+
+def test_cache_keys_are_canonical(monkeypatch) -> None:
+    monkeypatch.setattr(unify.utils._caching, "CACHE_DEBUG", True)
+    key, canonical = _cache_key("fn", {"b": 1.0, "a": {"y": (1, 2), "x": 0.5}})
+    assert key == _cache_key("fn", {"a": {"x": 0.5, "y": [1, 2]}, "b": 1})[0]
+    assert key != _cache_key("fn", {"a": {"x": 0.5, "y": [1, 2]}, "b": 2})[0]
+    assert key != _cache_key("other_fn", {"a": {"x": 0.5, "y": [1, 2]}, "b": 1})[0]
+    assert canonical == '{"a":{"x":0.5,"y":[1,2]},"b":1}'
+    assert len(key) == len("fn_") + 32
+
+
+def test_cache_stats(tmp_path, monkeypatch) -> None:
+    filename = os.path.join(tmp_path, "lru.db")
+    monkeypatch.setattr(unify.utils._caching, "CACHE_MAX_ENTRIES", 2)
+    for i in range(3):
+        _write_to_cache("fn", {"i": i}, "x" * i, filename)
+    stats = unify.cache_stats()
+    assert stats["entries"] == 2
+    assert _get_cache("fn", {"i": 2}, filename) == "xx"
+    assert unify.cache_stats()["memory_hits"] == stats["memory_hits"] + 1
+    assert _get_cache("fn", {"i": 0}, filename) == ""
+    assert unify.cache_stats()["store_hits"] == stats["store_hits"] + 1
+    assert unify.cache_stats()["evictions"] == stats["evictions"] + 1
+    assert _get_cache("fn", {"i": 3}, filename) is None
+    assert unify.cache_stats()["store_misses"] == stats["store_misses"] + 1
+
+
+def test_cache_async(tmp_path) -> None:
+    filename = os.path.join(tmp_path, "async.db")
+
+    async def main():
+        assert await _get_cache_async("fn", {"a": 1}, filename) is None
+        await _write_to_cache_async("fn", {"a": 1}, {"b": [1, 2]}, filename)
+        assert await _get_cache_async("fn", {"a": 1}, filename) == {"b": [1, 2]}
+
+    asyncio.run(main())
+    assert _get_cache("fn", {"a": 1}, filename) == {"b": [1, 2]}
+
+
+def test_cache_async_stats(tmp_path) -> None:
+    filename = os.path.join(tmp_path, "async_stats.db")
+    _write_to_cache("fn", {"a": 1}, "x", filename)
+    stats = unify.cache_stats()
+    assert asyncio.run(_get_cache_async("fn", {"a": 2}, filename)) is None
+    assert unify.cache_stats()["memory_misses"] == stats["memory_misses"] + 1
+    assert unify.cache_stats()["store_misses"] == stats["store_misses"] + 1
+    assert asyncio.run(_get_cache_async("fn", {"a": 1}, filename)) == "x"
+    assert unify.cache_stats()["memory_hits"] == stats["memory_hits"] + 1
+
+
+@pytest.mark.asyncio
+async def test_async_cache_read_only() -> None:
+    local_cache_path = _cache_fpath.replace(".cache.db", ".test_cache.db")
+    try:
+        unify.utils._caching._cache_fpath = local_cache_path
+        _remove(local_cache_path)
+        client = unify.AsyncUnify(endpoint="gpt-4o@openai")
+        r0 = await client.generate(user_message="hello", cache="write")
+        assert os.path.exists(local_cache_path)
+        mt0 = _mtime(local_cache_path)
+        r1 = await client.generate(user_message="hello", cache="read-only")
+        assert mt0 == _mtime(local_cache_path)
+        assert r0 == r1
+        with pytest.raises(Exception):
+            await client.generate(user_message="goodbye", cache="read-only")
+    finally:
+        _remove(local_cache_path)
+        unify.utils._caching._cache_fpath = _cache_fpath
+
+
+def _hammer_cache(args) -> int:
+    filename, worker = args
+    for i in range(50):
+        _write_to_cache("fn", {"worker": worker, "i": i}, [worker, i], filename)
+        assert _get_cache("fn", {"worker": worker, "i": i}, filename) == [worker, i]
+    return worker
+
+
+def test_cache_multiple_processes(tmp_path) -> None:
+    filename = os.path.join(tmp_path, "shared.db")
+    with open(os.path.join(tmp_path, "shared.json"), "w") as f:
+        json.dump({'fn_{"legacy": true}': '"migrated"'}, f)
+    with multiprocessing.get_context("spawn").Pool(8) as pool:
+        pool.map(_hammer_cache, [(filename, worker) for worker in range(8)])
+    unify.utils._caching._close_cache()
+    for worker in range(8):
+        for i in range(50):
+            assert _get_cache("fn", {"worker": worker, "i": i}, filename) == [
+                worker,
+                i,
+            ]
+    assert _get_cache("fn", {"legacy": True}, filename) == "migrated"
+
+
+def test_cache_stream_replay(tmp_path) -> None:
+    filename = os.path.join(tmp_path, "stream.db")
+    chunks = [
+        ChatCompletionChunk(
+            id="chunk",
+            choices=[dict(index=0, delta=dict(content=word))],
+            created=0,
+            model="gpt-4o",
+            object="chat.completion.chunk",
+        )
+        for word in ["hello", " ", "world"]
+    ]
+    kw = {"messages": [{"role": "user", "content": "hi"}], "stream": True}
+    stream = _record_stream(
+        iter(chunks),
+        lambda recording: _write_to_cache("fn", kw, recording, filename),
+    )
+    next(stream)
+    # partially consumed streams are never recorded
+    assert _get_cache("fn", kw, filename) is None
+    assert list(stream) == chunks[1:]
+    recording = _get_cache("fn", kw, filename)
+    assert len(recording["delays"]) == 3
+    replayed = list(_replay_stream(recording))
+    assert all(isinstance(c, ChatCompletionChunk) for c in replayed)
+    assert "".join(c.choices[0].delta.content for c in replayed) == "hello world"
+
+
+def test_cache_ttl(tmp_path) -> None:
+    filename = os.path.join(tmp_path, "ttl.db")
+    kw = {"model": "gpt-4o@openai"}
+    _write_to_cache("fn", kw, "response", filename)
+    try:
+        unify.set_cache_ttl(0.0, endpoint="gpt-4o")
+        assert _get_cache("fn", kw, filename) is None
+        unify.set_cache_ttl(3600.0)
+        assert _get_cache("fn", kw, filename) is None
+        unify.set_cache_ttl(None, endpoint="gpt-4o")
+        assert _get_cache("fn", kw, filename) == "response"
+    finally:
+        unify.set_cache_ttl(None)
+
+
+def test_cache_compact(tmp_path) -> None:
+    filename = os.path.join(tmp_path, "compact.db")
+    for i in range(4):
+        _write_to_cache("fn", {"model": "old@openai", "i": i}, "x" * 100, filename)
+    for i in range(4):
+        _write_to_cache("fn", {"model": "new@openai", "i": i}, "x" * 100, filename)
+    try:
+        unify.set_cache_ttl(0.0, endpoint="old@openai")
+        stats = unify.cache.compact(filename, max_entries=3)
+    finally:
+        unify.set_cache_ttl(None, endpoint="old@openai")
+    assert stats == dict(expired=4, pruned=1, remaining=3)
+    # the oldest response is pruned first
+    assert _get_cache("fn", {"model": "new@openai", "i": 0}, filename) is None
+    assert _get_cache("fn", {"model": "new@openai", "i": 3}, filename) == "x" * 100
+    stats = unify.cache.compact(filename, max_bytes=250)
+    assert stats["pruned"] == 1 and stats["remaining"] == 2
+
+
+def test_cache_upgrade_schema(tmp_path) -> None:
+    filename = os.path.join(tmp_path, "upgrade.db")
+    key, _ = _cache_key("fn", {"a": 1})
+    connection = sqlite3.connect(filename)
+    connection.execute(
+        "CREATE TABLE cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+        "res_types TEXT, canonical TEXT)",
+    )
+    connection.execute("INSERT INTO cache VALUES (?, ?, NULL, NULL)", (key, '"old"'))
+    connection.commit()
+    connection.close()
+    assert _get_cache("fn", {"a": 1}, filename) == "old"
+    assert unify.cache.compact(filename)["remaining"] == 1
+
+
+def test_cache_closes_thread_connections(tmp_path) -> None:
+    backend = SQLiteCacheBackend(os.path.join(tmp_path, "threads.db"))
+
+    def lookup_from_threads():
+        threads = [
+            threading.Thread(target=backend.get, args=("key",)) for _ in range(20)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    for _ in range(5):
+        lookup_from_threads()
+    gc.collect()
+    # only the connection of the main thread is still open
+    assert len(backend._connections) == 1
+    backend.close()
+
+
+def test_cache_content_only(tmp_path, monkeypatch) -> None:
+    filename = os.path.join(tmp_path, "content.db")
+    completion = ChatCompletion(
+        id="completion",
+        choices=[
+            dict(
+                index=0,
+                finish_reason="stop",
+                message=dict(role="assistant", content=" hello "),
+            ),
+        ],
+        created=0,
+        model="gpt-4o",
+        object="chat.completion",
+    )
+    _write_to_cache("fn", {"a": 1}, completion, filename)
+    assert _get_cache("fn", {"a": 1}, filename) == completion
+
+    class Unbuildable:
+        def __init__(self, **kwargs):
+            raise AssertionError("model built for a content-only lookup")
+
+    monkeypatch.setattr(unify.utils._caching, "ChatCompletion", Unbuildable)
+    assert _get_cache("fn", {"a": 1}, filename, content_only=True) == " hello "
+    content = asyncio.run(
+        _get_cache_async("fn", {"a": 1}, filename, content_only=True),
+    )
+    assert content == " hello "
+
+
+def test_cache_keys_skip_volatile_fields() -> None:
+    volatile = {"id": None, "exec_time": None}
+    volatile["child_spans"] = [volatile]
+
+    def span(id, exec_time, inputs):
+        return {"id": id, "exec_time": exec_time, "inputs": inputs, "child_spans": []}
+
+    trace = span("a", 1.5, {"x": 1})
+    trace["child_spans"].append(span("b", 0.5, {"y": 2}))
+    other = span("c", 2.5, {"x": 1})
+    other["child_spans"].append(span("d", 0.7, {"y": 2}))
+    key = _cache_key("fn", {"trace": trace}, {"trace": volatile})[0]
+    assert key == _cache_key("fn", {"trace": other}, {"trace": volatile})[0]
+    other["child_spans"][0]["inputs"]["y"] = 3
+    assert key != _cache_key("fn", {"trace": other}, {"trace": volatile})[0]
+    assert trace["child_spans"][0]["id"] == "b"
+
+
+@pytest.mark.parametrize("suffix", [".jsonl", ".jsonl.gz"])
+def test_cache_export_import(tmp_path, suffix) -> None:
+    source = os.path.join(tmp_path, "source.db")
+    target = os.path.join(tmp_path, "target.db")
+    path = os.path.join(tmp_path, "cache" + suffix)
+    for i in range(3):
+        _write_to_cache("fn", {"model": "gpt-4o@openai", "i": i}, [i], source)
+    assert unify.cache.export(path, source) == 3
+    assert unify.cache.import_(path, target, batch_size=2) == 3
+    for i in range(3):
+        assert _get_cache("fn", {"model": "gpt-4o@openai", "i": i}, target) == [i]
+
+
+def test_cache_warm_from_logs(tmp_path, monkeypatch) -> None:
+    from openai.resources.chat.completions import Completions
+    from unify.universal_api.utils import supported_endpoints
+
+    monkeypatch.setattr(
+        supported_endpoints,
+        "_get_catalog",
+        lambda route, params, api_key: {
+            "endpoints": ["gpt-4o@openai"],
+            "models": ["gpt-4o"],
+            "providers": ["openai"],
+        }[route],
+    )
+    monkeypatch.setattr(
+        unify.utils._caching,
+        "_cache_fpath",
+        os.path.join(tmp_path, "warm.db"),
+    )
+    traces = list()
+    monkeypatch.setattr(unify, "log", lambda *args, **kwargs: unify.Log(api_key="x"))
+    monkeypatch.setattr(
+        unify,
+        "add_log_entries",
+        lambda trace, **kwargs: traces.append(trace),
+    )
+    completion = ChatCompletion(
+        id="completion",
+        choices=[
+            dict(
+                index=0,
+                finish_reason="stop",
+                message=dict(role="assistant", content="hello"),
+            ),
+        ],
+        created=0,
+        model="gpt-4o",
+        object="chat.completion",
+    )
+
+    @functools.wraps(Completions.create)
+    def create(self, **kwargs):
+        return completion
+
+    monkeypatch.setattr(Completions, "create", create)
+    client = Unify("gpt-4o@openai", traced=True, api_key="x")
+    assert unify.traced(client.generate)("hi") == "hello"
+    # the last trace written is the root span, holding the llm span
+    logs = [unify.Log(trace=traces[-1], api_key="x")]
+    assert unify.cache.warm_from_logs(logs) == 1
+
+    def unreachable(self, **kwargs):
+        raise AssertionError("cache missed")
+
+    monkeypatch.setattr(Completions, "create", unreachable)
+    client = Unify("gpt-4o@openai", api_key="x")
+    assert client.generate("hi", cache="read-only") == "hello"
+
+
 if __name__ == "__main__":
     pass
@@ -0,0 +1,116 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import unify
+from unify.utils import http
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    ports = list()
+
+    def do_GET(self):
+        _Handler.ports.append(self.client_address[1])
+        body = self.headers["Authorization"].encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_sessions_are_shared() -> None:
+    session = http._get_session("key", "https://api.unify.ai/v0/logs")
+    assert session is http._get_session("key", "https://api.unify.ai/v0/projects")
+    assert session is not http._get_session("other_key", "https://api.unify.ai/v0")
+    assert session.headers["Authorization"] == "Bearer key"
+    http.close_sessions()
+    assert session is not http._get_session("key", "https://api.unify.ai/v0/logs")
+    http.close_sessions()
+
+
+def test_connections_are_reused() -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    _Handler.ports.clear()
+    try:
+        url = f"http://127.0.0.1:{server.server_port}"
+        for i in range(5):
+            response = http.get(url + f"/{i}", api_key="key")
+            assert response.text == "Bearer key"
+        assert len(set(_Handler.ports)) == 1
+    finally:
+        http.close_sessions()
+        server.shutdown()
+        server.server_close()
+
+
+def test_async_params_match_requests() -> None:
+    assert http._encode_params(
+        {"project": "p", "context": None, "ids": [1, 2], "return_ids_only": False},
+    ) == [("project", "p"), ("ids", "1"), ("ids", "2"), ("return_ids_only", "False")]
+
+
+def test_async_connections_are_reused() -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    _Handler.ports.clear()
+
+    async def main():
+        url = f"http://127.0.0.1:{server.server_port}"
+        responses = await asyncio.gather(
+            *[http.async_get(url + f"/{i}", api_key="key") for i in range(5)],
+        )
+        assert all(r.status_code == 200 for r in responses)
+        assert all(r.text == "Bearer key" for r in responses)
+        for i in range(5):
+            await http.async_get(url + f"/{i}", api_key="key")
+        await http.close_async_sessions()
+
+    try:
+        asyncio.run(main())
+        assert len(set(_Handler.ports)) <= 5
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_openai_clients_are_shared() -> None:
+    client = http.get_openai_client("key", unify.BASE_URL)
+    assert client is http.get_openai_client("key", unify.BASE_URL)
+    assert client is not http.get_openai_client("other_key", unify.BASE_URL)
+    unify_client = unify.Unify(api_key="key")
+    assert unify_client._client is unify_client.copy()._client
+    http.close_openai_clients()
+    assert client is not http.get_openai_client("key", unify.BASE_URL)
+    http.close_openai_clients()
+
+
+def test_async_openai_clients_are_per_loop() -> None:
+    async def main():
+        client = http.get_async_openai_client("key", unify.BASE_URL)
+        assert client is unify.AsyncUnify(api_key="key")._client
+        await http.close_async_openai_clients()
+        return client
+
+    assert asyncio.run(main()) is not asyncio.run(main())
+
+
+def test_aio_session_closes_connections() -> None:
+    async def main():
+        async with unify.aio.session():
+            session = http._get_async_session("key", unify.BASE_URL)
+            client = http.get_async_openai_client("key", unify.BASE_URL)
+        return session, client
+
+    session, client = asyncio.run(main())
+    assert session.closed and client.is_closed()
+
+
+if __name__ == "__main__":
+    pass
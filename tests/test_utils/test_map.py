@@ -1,7 +1,10 @@
 import asyncio
+import threading
+import time
 
 import pytest
 import unify
+from unify.logging.utils.logs import ACTIVE_PARAMS
 
 # Helpers #
 # --------#
@@ -49,6 +52,10 @@ def evaluate_w_log(q: str):
     )
 
 
+def contextual_square(x: int):
+    return x * x, dict(ACTIVE_PARAMS.get())
+
+
 @pytest.mark.asyncio
 async def async_evaluate(q: str):
     response = await async_client.generate(q)
@@ -220,5 +227,168 @@ def test_asyncio_map_with_context_from_args() -> None:
             assert results == [1 + 2 + 2, 3 + 4 + 4]
 
 
+def test_threaded_map_max_workers() -> None:
+    lock = threading.Lock()
+    running, peak = [0], [0]
+
+    def tracked(x):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.01)
+        with lock:
+            running[0] -= 1
+        return x * 2
+
+    results = unify.map(tracked, list(range(50)), max_workers=4)
+    assert results == [x * 2 for x in range(50)]
+    assert peak[0] <= 4
+
+
+def test_process_map() -> None:
+    with unify.Params(a=1):
+        results = unify.map(
+            contextual_square,
+            list(range(20)),
+            mode="process",
+            max_workers=2,
+        )
+    assert results == [(x * x, {"a": 1}) for x in range(20)]
+    results = unify.map(contextual_square, [3, 4], mode="process", from_args=True)
+    assert results == [(9, {}), (16, {})]
+
+
+def test_imap() -> None:
+    drawn = list()
+
+    def items():
+        for i in range(100):
+            drawn.append(i)
+            yield i
+
+    results = unify.imap(lambda x: x * 2, items(), max_workers=2, max_in_flight=4)
+    assert [next(results) for _ in range(10)] == [x * 2 for x in range(10)]
+    assert len(drawn) < 20
+    results.close()
+    results = unify.imap(contextual_square, range(10), ordered=False)
+    assert sorted(results) == [(x * x, {}) for x in range(10)]
+    results = unify.imap(contextual_square, range(10), mode="process")
+    assert list(results) == [(x * x, {}) for x in range(10)]
+
+
+def test_rate_limited_map() -> None:
+    t0 = time.perf_counter()
+    # a burst of one second's worth of requests, then 50 requests per second
+    results = unify.map(abs, list(range(-75, 0)), rps=50, rate_limit_key="abs")
+    assert results == list(range(75, 0, -1))
+    assert time.perf_counter() - t0 >= 0.45
+
+    t0 = time.perf_counter()
+    threads = [
+        threading.Thread(
+            target=unify.map,
+            args=(abs, list(range(50))),
+            kwargs=dict(rps=50, rate_limit_key="shared"),
+        )
+        for _ in range(2)
+    ]
+    [thread.start() for thread in threads]
+    [thread.join() for thread in threads]
+    # both maps draw from the same budget
+    assert time.perf_counter() - t0 >= 0.95
+
+    t0 = time.perf_counter()
+    # 20 prompts of roughly 100 tokens each, at 1000 tokens per second
+    unify.map(len, ["x" * 400] * 20, tpm=60 * 1000, rate_limit_key="len")
+    assert time.perf_counter() - t0 >= 0.95
+
+
+def test_adaptive_concurrency_map() -> None:
+    lock = threading.Lock()
+    running = [0]
+
+    # latency quadruples once more than 8 calls are in flight
+    def overloaded(x):
+        with lock:
+            running[0] += 1
+            n = running[0]
+        time.sleep(0.01 if n <= 8 else 0.04)
+        with lock:
+            running[0] -= 1
+        return x
+
+    controller = unify.AdaptiveConcurrency()
+    results = unify.map(overloaded, list(range(1000)), concurrency=controller)
+    assert results == list(range(1000))
+    stats = controller.stats()
+    assert 4 <= stats["concurrency"] <= 12
+    assert stats["completed"] == 1000 and stats["throughput"] > 0
+
+    controller = unify.AdaptiveConcurrency(initial=8)
+    with pytest.raises(Exception):
+        with controller.track():
+            raise Exception("429 Too Many Requests")
+    assert controller.concurrency == 4
+
+    async def sleep(x):
+        await asyncio.sleep(0.01)
+        return x
+
+    results = unify.map(sleep, list(range(100)), mode="asyncio", concurrency="adaptive")
+    assert results == list(range(100))
+
+
+def test_adaptive_concurrency_shared_between_modes() -> None:
+    controller = unify.AdaptiveConcurrency(initial=2, max_concurrency=2)
+
+    def blocking(x):
+        time.sleep(0.005)
+        return x
+
+    async def sleep(x):
+        await asyncio.sleep(0.005)
+        return x
+
+    threaded = threading.Thread(
+        target=unify.map,
+        args=(blocking, list(range(200))),
+        kwargs=dict(concurrency=controller),
+    )
+    threaded.start()
+    # coroutines waiting for a slot are woken by releases from the threaded map
+    results = unify.map(sleep, list(range(200)), mode="asyncio", concurrency=controller)
+    threaded.join(timeout=30)
+    assert not threaded.is_alive()
+    assert results == list(range(200))
+    assert controller.stats()["completed"] == 400
+
+
+def test_adaptive_concurrency_shared_between_loops() -> None:
+    controller = unify.AdaptiveConcurrency(initial=2, max_concurrency=2)
+    results = dict()
+
+    async def sleep(x):
+        await asyncio.sleep(0.005)
+        return x
+
+    def run(i):
+        results[i] = unify.map(
+            sleep,
+            list(range(200)),
+            mode="asyncio",
+            concurrency=controller,
+        )
+
+    # each map waits on its own loop, and is woken by releases from the other
+    threads = [threading.Thread(target=run, args=(i,), daemon=True) for i in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+        assert not thread.is_alive()
+    assert results == {0: list(range(200)), 1: list(range(200))}
+    assert controller.stats()["completed"] == 400
+
+
 if __name__ == "__main__":
     pass
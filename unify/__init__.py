@@ -60,8 +60,19 @@ from .logging.utils.datasets import *
 from .logging.utils.logs import *
 from .logging.utils.projects import *
 
-from .utils import helpers, map, _caching
-from .utils._caching import set_caching, set_caching_fname
+from .utils import helpers, http, map, imap, _caching
+from .utils._concurrency import AdaptiveConcurrency
+from .utils._caching import (
+    set_caching,
+    set_caching_fname,
+    set_cache_backend,
+    set_cache_debug,
+    set_cache_size,
+    set_stream_replay_timing,
+    set_cache_ttl,
+    cache_stats,
+    migrate_json_cache,
+)
 
 from .universal_api import chatbot, clients, usage
 from .universal_api.clients import multi_llm
@@ -79,6 +90,8 @@ from .universal_api.types import *
 from .logging.dataset import *
 from .logging.logs import *
 
+from . import aio, cache
+
 
 # Project #
 # --------#
@@ -0,0 +1,41 @@
+"""
+Awaitable mirrors of the project, context, log and dataset utilities.
+
+Their connections are pooled per event loop, and must be closed before the loop
+exits, either by awaiting `close()` or by running within `session()`:
+
+    async def main():
+        async with unify.aio.session():
+            await unify.aio.log(x=1)
+
+    asyncio.run(main())
+"""
+
+import contextlib
+
+from ..utils import http
+from . import contexts, datasets, logs, projects
+from .contexts import *
+from .datasets import *
+from .logs import *
+from .projects import *
+
+
+async def close() -> None:
+    """
+    Close the pooled HTTP sessions and openai clients of the running event loop.
+    """
+    await http.close_async_sessions()
+    await http.close_async_openai_clients()
+
+
+@contextlib.asynccontextmanager
+async def session():
+    """
+    Async context manager which closes the pooled connections of the running event
+    loop on exit.
+    """
+    try:
+        yield
+    finally:
+        await close()
@@ -0,0 +1,176 @@
+from typing import Dict, List, Optional
+
+from unify import BASE_URL
+
+from ..utils import http
+from ..utils.helpers import _validate_api_key
+from .projects import _get_and_maybe_create_project
+
+# Contexts #
+# ---------#
+
+
+async def create_context(
+    name: str,
+    description: str = None,
+    is_versioned: bool = False,
+    *,
+    project: Optional[str] = None,
+    api_key: Optional[str] = None,
+) -> None:
+    """
+    Create a context.
+
+    Args:
+        name: Name of the context to create.
+
+        description: Description of the context to create.
+
+        is_versioned: Whether the context is versioned.
+
+        project: Name of the project the context belongs to.
+
+        api_key: If specified, unify API key to be used. Defaults to the value in the
+        `UNIFY_KEY` environment variable.
+
+    Returns:
+        A message indicating whether the context was successfully created.
+    """
+    api_key = _validate_api_key(api_key)
+    project = await _get_and_maybe_create_project(
+        project,
+        api_key=api_key,
+        create_if_missing=False,
+    )
+    body = {
+        "name": name,
+        "description": description,
+        "is_versioned": is_versioned,
+    }
+    response = await http.async_post(
+        BASE_URL + f"/project/{project}/contexts",
+        api_key=api_key,
+        json=body,
+    )
+    if response.status_code != 200:
+        raise Exception(response.json())
+    return response.json()
+
+
+async def get_contexts(
+    *,
+    prefix: Optional[str] = None,
+    project: Optional[str] = None,
+    api_key: Optional[str] = None,
+) -> Dict[str, str]:
+    """
+    Gets all contexts associated with a project, with the corresponding prefix.
+
+    Args:
+        prefix: Prefix of the contexts to get.
+
+        project: Name of the project the contexts belong to.
+
+        api_key: If specified, unify API key to be used. Defaults to the value in the
+        `UNIFY_KEY` environment variable.
+
+    Returns:
+        A dictionary mapping the context names to their descriptions.
+    """
+    api_key = _validate_api_key(api_key)
+    project = await _get_and_maybe_create_project(
+        project,
+        api_key=api_key,
+        create_if_missing=False,
+    )
+    response = await http.async_get(
+        BASE_URL + f"/project/{project}/contexts",
+        api_key=api_key,
+    )
+    if response.status_code != 200:
+        raise Exception(response.json())
+    contexts = response.json()
+    contexts = {context["name"]: context["description"] for context in contexts}
+    if prefix:
+        contexts = {
+            context: description
+            for context, description in contexts.items()
+            if context.startswith(prefix)
+        }
+    return contexts
+
+
+async def delete_context(
+    name: str,
+    *,
+    project: Optional[str] = None,
+    api_key: Optional[str] = None,
+) -> None:
+    """
+    Delete a context from the server.
+
+    Args:
+        name: Name of the context to delete.
+
+        project: Name of the project the context belongs to.
+
+        api_key: If specified, unify API key to be used. Defaults to the value in the
+        `UNIFY_KEY` environment variable.
+    """
+    api_key = _validate_api_key(api_key)
+    project = await _get_and_maybe_create_project(
+        project,
+        api_key=api_key,
+        create_if_missing=False,
+    )
+    response = await http.async_delete(
+        BASE_URL + f"/project/{project}/contexts",
+        params={"name": name},
+        api_key=api_key,
+    )
+    if response.status_code != 200:
+        raise Exception(response.json())
+    return response.json()
+
+
+async def add_logs_to_context(
+    log_ids: List[int],
+    context: str,
+    *,
+    project: Optional[str] = None,
+    api_key: Optional[str] = None,
+) -> None:
+    """
+    Add logs to a context.
+
+    Args:
+        log_ids: List of log ids to add to the context.
+
+        context: Name of the context to add the logs to.
+
+        project: Name of the project the logs belong to.
+
+        api_key: If specified, unify API key to be used. Defaults to the value in the
+        `UNIFY_KEY` environment variable.
+
+    Returns:
+        A message indicating whether the logs were successfully added to the context.
+    """
+    api_key = _validate_api_key(api_key)
+    project = await _get_and_maybe_create_project(
+        project,
+        api_key=api_key,
+        create_if_missing=False,
+    )
+    body = {
+        "context_name": context,
+        "log_ids": log_ids,
+    }
+    response = await http.async_post(
+        BASE_URL + f"/project/{project}/contexts/add_logs",
+        api_key=api_key,
+        json=body,
+    )
+    if response.status_code != 200:
+        raise Exception(response.json())
+    return response.json()
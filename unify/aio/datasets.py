@@ -0,0 +1,253 @@
+from typing import Any, Dict, List, Optional
+
+import unify
+
+from ..logging.logs import Log
+from ..utils.helpers import _validate_api_key
+from .contexts import *
+from .logs import *
+from .projects import _get_and_maybe_create_project
+
+# Datasets #
+# ---------#
+
+
+async def list_datasets(
+    *,
+    project: Optional[str] = None,
+    prefix: str = "",
+    api_key: Optional[str] = None,
+) -> Dict[str, str]:
+    """
+    List all datasets associated with a project and context.
+
+    Args:
+        project: Name of the project the datasets belong to.
+
+        prefix: Prefix of the datasets to get.
+
+        api_key: If specified, unify API key to be used. Defaults to the value in the
+        `UNIFY_KEY` environment variable.
+
+    Returns:
+        A list of datasets.
+    """
+    api_key = _validate_api_key(api_key)
+    contexts = await get_contexts(
+        prefix=f"Datasets/{prefix}",
+        project=project,
+        api_key=api_key,
+    )
+    return {
+        "/".join(name.split("/")[1:]): description
+        for name, description in contexts.items()
+    }
+
+
+async def upload_dataset(
+    name: str,
+    data: List[Any],
+    *,
+    overwrite: bool = False,
+    allow_duplicates: bool = False,
+    project: Optional[str] = None,
+    api_key: Optional[str] = None,
+) -> List[int]:
+    """
+    Upload a dataset to the server.
+
+    Args:
+        name: Name of the dataset.
+
+        data: Contents of the dataset.
+
+        overwrite: Whether to overwrite the dataset if it already exists.
+
+        allow_duplicates: Whether to allow duplicates in the dataset.
+
+        project: Name of the project the dataset belongs to.
+
+        api_key: If specified, unify API key to be used. Defaults to the value in the
+        `UNIFY_KEY` environment variable.
+    Returns:
+        A list all log ids in the dataset.
+    """
+    api_key = _validate_api_key(api_key)
+    project = await _get_and_maybe_create_project(project, api_key=api_key)
+    log_instances = [isinstance(item, unify.Log) for item in data]
+    are_logs = False
+    dataset_exists = name in await list_datasets(project=project, api_key=api_key)
+    if not allow_duplicates and not overwrite:
+        # ToDo: remove this verbose logic once ignore_duplicates is implemented
+        if dataset_exists:
+            upstream_dataset = unify.Dataset(
+                await download_dataset(name, project=project, api_key=api_key),
+            )
+        else:
+            upstream_dataset = unify.Dataset([])
+    if any(log_instances):
+        assert all(log_instances), "If any items are logs, all items must be logs"
+        are_logs = True
+        # ToDo: remove this verbose logic once ignore_duplicates is implemented
+        if not allow_duplicates and not overwrite:
+            data = [l for l in data if l not in upstream_dataset]
+    elif not all(isinstance(item, dict) for item in data):
+        # ToDo: remove this verbose logic once ignore_duplicates is implemented
+        if not allow_duplicates and not overwrite:
+            data = [item for item in data if item not in upstream_dataset]
+        data = [{"data": item} for item in data]
+    if dataset_exists:
+        upstream_ids = await get_logs(
+            project=project,
+            context=f"Datasets/{name}",
+            return_ids_only=True,
+            api_key=api_key,
+        )
+    else:
+        upstream_ids = []
+    if not are_logs:
+        return upstream_ids + await create_logs(
+            project=project,
+            context=f"Datasets/{name}",
+            entries=data,
+            mutable=True,
+            api_key=api_key,
+        )
+    local_ids = [l.id for l in data]
+    matching_ids = [id for id in upstream_ids if id in local_ids]
+    matching_data = [l.entries for l in data if l.id in matching_ids]
+    assert len(matching_data) == len(
+        matching_ids,
+    ), "matching data and ids must be the same length"
+    if matching_data:
+        await update_logs(
+            logs=matching_ids,
+            api_key=api_key,
+            entries=matching_data,
+            overwrite=True,
+        )
+    if overwrite:
+        upstream_only_ids = [id for id in upstream_ids if id not in local_ids]
+        if upstream_only_ids:
+            await delete_logs(
+                logs=upstream_only_ids,
+                project=project,
+                api_key=api_key,
+            )
+            upstream_ids = [id for id in upstream_ids if id not in upstream_only_ids]
+    ids_not_in_dataset = [
+        id for id in local_ids if id not in matching_ids and id is not None
+    ]
+    if ids_not_in_dataset:
+        context = f"Datasets/{name}"
+        if context not in await get_contexts(project=project, api_key=api_key):
+            await create_context(
+                context,
+                project=project,
+                api_key=api_key,
+            )
+        await add_logs_to_context(
+            log_ids=ids_not_in_dataset,
+            context=context,
+            project=project,
+            api_key=api_key,
+        )
+    local_only_data = [l.entries for l in data if l.id is None]
+    if local_only_data:
+        return upstream_ids + await create_logs(
+            project=project,
+            context=f"Datasets/{name}",
+            entries=local_only_data,
+            mutable=True,
+            api_key=api_key,
+        )
+    return upstream_ids + ids_not_in_dataset
+
+
+async def download_dataset(
+    name: str,
+    *,
+    project: Optional[str] = None,
+    api_key: Optional[str] = None,
+) -> List[Log]:
+    """
+    Download a dataset from the server.
+
+    Args:
+        name: Name of the dataset.
+
+        project: Name of the project the dataset belongs to.
+
+        api_key: If specified, unify API key to be used. Defaults to the value in the
+        `UNIFY_KEY` environment variable.
+    """
+    api_key = _validate_api_key(api_key)
+    project = await _get_and_maybe_create_project(project, api_key=api_key)
+    logs = await get_logs(
+        project=project,
+        context=f"Datasets/{name}",
+        api_key=api_key,
+    )
+    return list(reversed(logs))
+
+
+async def delete_dataset(
+    name: str,
+    *,
+    project: Optional[str] = None,
+    api_key: Optional[str] = None,
+) -> None:
+    """
+    Delete a dataset from the server.
+
+    Args:
+        name: Name of the dataset.
+
+        project: Name of the project the dataset belongs to.
+
+        api_key: If specified, unify API key to be used. Defaults to the value in the
+        `UNIFY_KEY` environment variable.
+    """
+    api_key = _validate_api_key(api_key)
+    project = await _get_and_maybe_create_project(project, api_key=api_key)
+    await delete_context(f"Datasets/{name}", project=project, api_key=api_key)
+
+
+async def add_dataset_entries(
+    name: str,
+    data: List[Any],
+    *,
+    project: Optional[str] = None,
+    api_key: Optional[str] = None,
+) -> List[int]:
+    """
+    Adds entries to an existing dataset in the server.
+
+    Args:
+        name: Name of the dataset.
+
+        data: Contents to add to the dataset.
+
+        project: Name of the project the dataset belongs to.
+
+        api_key: If specified, unify API key to be used. Defaults to the value in the
+        `UNIFY_KEY` environment variable.
+    Returns:
+        A list of the newly added dataset logs.
+    """
+    api_key = _validate_api_key(api_key)
+    project = await _get_and_maybe_create_project(
+        project,
+        api_key=api_key,
+        create_if_missing=False,
+    )
+    if not all(isinstance(item, dict) for item in data):
+        data = [{"data": item} for item in data]
+    logs = await create_logs(
+        project=project,
+        context=f"Datasets/{name}",
+        entries=data,
+        mutable=True,
+        api_key=api_key,
+    )
+    return logs
@@ -0,0 +1,613 @@
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, List, Optional, Union
+
+import unify
+from unify import BASE_URL
+
+from ..logging.utils import logs as _logs
+from ..logging.utils.logs import (
+    ACTIVE_ENTRIES,
+    ACTIVE_LOG,
+    ACTIVE_PARAMS,
+    ENTRIES_NEST_LEVEL,
+    LOGGED,
+    PARAMS_NEST_LEVEL,
+    _apply_col_context,
+    _handle_context,
+    _handle_mutability,
+    _handle_special_types,
+    _to_log_ids,
+)
+from ..utils import http
+from ..utils.helpers import _validate_api_key
+from .projects import _get_and_maybe_create_project
+
+# Logs #
+# -----#
+
+
+async def log(
+    *,
+    project: Optional[str] = None,
+    context: Optional[str] = None,
+    params: Dict[str, Any] = None,
+    new: bool = False,
+    overwrite: bool = False,
+    mutable: Optional[Union[bool, Dict[str, bool]]] = True,
+    api_key: Optional[str] = None,
+    **entries,
+) -> unify.Log:
+    """
+    Creates a log associated to a project, or adds to the currently active log.
+
+    Args:
+        project: Name of the project the stored logs will be associated to.
+
+        context: Context for the logs.
+
+        params: Dictionary containing one or more key:value pairs that will be
+        logged into the platform as params.
+
+        new: Whether to create a new log if there is a currently active global lob.
+        Defaults to False, in which case log will add to the existing log.
+
+        overwrite: If adding to an existing log, dictates whether or not to overwrite
+        fields with the same name.
+
+        mutable: Either a boolean to apply uniform mutability for all fields, or a dictionary mapping field names to booleans for per-field control. Defaults to True.
+
+        api_key: If specified, unify API key to be used. Defaults to the value in the
+        `UNIFY_KEY` environment variable.
+
+        entries: Dictionary containing one or more key:value pairs that will be logged
+        into the platform as entries.
+
+    Returns:
+        The created or updated log.
+    """
+    api_key = _validate_api_key(api_key)
+    context = _handle_context(context)
+    if not new and ACTIVE_LOG.get():
+        await _add_to_log(
+            context=context,
+            mode="entries",
+            overwrite=overwrite,
+            mutable=mutable,
+            api_key=api_key,
+            **entries,
+        )
+        await _add_to_log(
+            context=context,
+            mode="params",
+            overwrite=overwrite,
+            mutable=mutable,
+            api_key=api_key,
+            **(params if params is not None else {}),
+        )
+        log = ACTIVE_LOG.get()[-1]
+        if _logs.USR_LOGGING:
+            logging.info(f"Updated Log({log.id})")
+        return log
+    params = _apply_col_context(**(params if params else {}))
+    params = {**params, **ACTIVE_PARAMS.get()}
+    params = _handle_special_types(params)
+    params = _handle_mutability(mutable, params)
+    entries = _apply_col_context(**entries)
+    entries = {**entries, **ACTIVE_ENTRIES.get()}
+    entries = _handle_special_types(entries)
+    entries = _handle_mutability(mutable, entries)
+    project = await _get_and_maybe_create_project(project, api_key=api_key)
+    body = {
+        "project": project,
+        "context": context,
+        "params": params,
+        "entries": entries,
+    }
+    response = await http.async_post(BASE_URL + "/logs", api_key=api_key, json=body)
+    if response.status_code != 200:
+        raise Exception(response.json())
+    created_log = unify.Log(
+        id=response.json()[0],
+        api_key=api_key,
+        **entries,
+        params=params,
+        context=context,
+    )
+    if PARAMS_NEST_LEVEL.get() > 0 or ENTRIES_NEST_LEVEL.get() > 0:
+        LOGGED.set(
+            {
+                **LOGGED.get(),
+                created_log.id: list(params.keys()) + list(entries.keys()),
+            },
+        )
+    if _logs.USR_LOGGING:
+        logging.info(f"Created Log({created_log.id})")
+    return created_log
+
+
+async def create_logs(
+    *,
+    project: Optional[str] = None,
+    context: Optional[str] = None,
+    params: Optional[Union[List[Dict[str, Any]], Dict[str, Any]]] = None,
+    entries: Optional[Union[List[Dict[str, Any]], Dict[str, Any]]] = None,
+    mutable: Optional[Union[bool, Dict[str, bool]]] = True,
+    api_key: Optional[str] = None,
+) -> List[unify.Log]:
+    """
+    Creates one or more logs associated to a project.
+
+    Args:
+        project: Name of the project the stored logs will be associated to.
+
+        context: Context for the logs.
+
+        entries: List of dictionaries with the entries to be logged.
+
+        params: List of dictionaries with the params to be logged.
+
+        mutable: Either a boolean to apply uniform mutability for all fields, or a dictionary mapping field names to booleans for per-field control. Defaults to True.
+
+        api_key: If specified, unify API key to be used. Defaults to the value in the
+        `UNIFY_KEY` environment variable.
+
+    Returns:
+        A list of the created logs.
+    """
+    api_key = _validate_api_key(api_key)
+    project = await _get_and_maybe_create_project(project, api_key=api_key)
+    context = _handle_context(context)
+    params = _handle_mutability(mutable, params)
+    entries = _handle_mutability(mutable, entries)
+    # ToDo remove the params/entries logic above once this [https://app.clickup.com/t/86c25g263] is done
+    params = [{}] * len(entries) if params in [None, []] else params
+    entries = [{}] * len(params) if entries in [None, []] else entries
+    # end ToDo
+    body = {
+        "project": project,
+        "context": context,
+        "params": params,
+        "entries": entries,
+    }
+    response = await http.async_post(BASE_URL + "/logs", api_key=api_key, json=body)
+    if response.status_code != 200:
+        raise Exception(response.json())
+    return [
+        unify.Log(
+            project=project,
+            context=context,
+            **{k: v for k, v in e.items() if k != "explicit_types"},
+            **p,
+            id=i,
+        )
+        for e, p, i in zip(entries, params, response.json())
+    ]
+
+
+async def _add_to_log(
+    *,
+    context: Optional[str] = None,
+    logs: Optional[Union[int, unify.Log, List[Union[int, unify.Log]]]] = None,
+    mode: str = None,
+    overwrite: bool = False,
+    mutable: Optional[Union[bool, Dict[str, bool]]] = True,
+    api_key: Optional[str] = None,
+    **data,
+) -> Dict[str, str]:
+    assert mode in ("params", "entries"), "mode must be one of 'params', 'entries'"
+    data = _apply_col_context(**data)
+    nest_level = {"params": PARAMS_NEST_LEVEL, "entries": ENTRIES_NEST_LEVEL}[mode]
+    active = {"params": ACTIVE_PARAMS, "entries": ACTIVE_ENTRIES}[mode]
+    api_key = _validate_api_key(api_key)
+    context = _handle_context(context)
+    data = _handle_special_types(data)
+    data = _handle_mutability(mutable, data)
+    log_ids = _to_log_ids(logs)
+    all_kwargs = []
+    if nest_level.get() > 0:
+        for log_id in log_ids:
+            combined_kwargs = {
+                **data,
+                **{
+                    k: v
+                    for k, v in active.get().items()
+                    if k not in LOGGED.get().get(log_id, {})
+                },
+            }
+            all_kwargs.append(combined_kwargs)
+        assert all(
+            kw == all_kwargs[0] for kw in all_kwargs
+        ), "All logs must share the same context if they're all being updated at the same time."
+        data = all_kwargs[0]
+    body = {"ids": log_ids, mode: data, "overwrite": overwrite, "context": context}
+    response = await http.async_put(BASE_URL + "/logs", api_key=api_key, json=body)
+    if response.status_code != 200:
+        raise Exception(response.json())
+    if nest_level.get() > 0:
+        logged = LOGGED.get()
+        new_logged = {}
+        for log_id in log_ids:
+            if log_id in logged:
+                new_logged[log_id] = logged[log_id] + list(data.keys())
+            else:
+                new_logged[log_id] = list(data.keys())
+        LOGGED.set({**logged, **new_logged})
+    return response.json()
+
+
+async def add_log_params(
+    *,
+    logs: Optional[Union[int, unify.Log, List[Union[int, unify.Log]]]] = None,
+    mutable: Optional[Union[bool, Dict[str, bool]]] = True,
+    api_key: Optional[str] = None,
+    **params,
+) -> Dict[str, str]:
+    """
+    Add extra params into an existing log.
+
+    Args:
+        logs: The log(s) to update with extra params. Looks for the current active log if
+        no id is provided.
+
+        mutable: Either a boolean to apply uniform mutability for all parameters, or a dictionary mapping parameter names to booleans for per-field control.
+        Defaults to True.
+
+        api_key: If specified, unify API key to be used. Defaults to the value in the
+        `UNIFY_KEY` environment variable.
+
+        params: Dictionary containing one or more key:value pairs that will be
+        logged into the platform as params.
+
+    Returns:
+        A message indicating whether the logs were successfully updated.
+    """
+    ret = await _add_to_log(
+        logs=logs,
+        mode="params",
+        mutable=mutable,
+        api_key=api_key,
+        **params,
+    )
+    if _logs.USR_LOGGING:
+        logging.info(
+            f"Added Params {', '.join(list(params.keys()))} "
+            f"to [Logs({', '.join([str(i) for i in _to_log_ids(logs)])})]",
+        )
+    return ret
+
+
+async def add_log_entries(
+    *,
+    logs: Optional[Union[int, unify.Log, List[Union[int, unify.Log]]]] = None,
+    overwrite: bool = False,
+    mutable: Optional[Union[bool, Dict[str, bool]]] = True,
+    api_key: Optional[str] = None,
+    **entries,
+) -> Dict[str, str]:
+    """
+    Add extra entries into an existing log.
+
+    Args:
+        logs: The log(s) to update with extra entries. Looks for the current active log if
+        no id is provided.
+
+        overwrite: Whether or not to overwrite an entry pre-existing with the same name.
+
+        mutable: Either a boolean to apply uniform mutability for all entries, or a dictionary mapping entry names to booleans for per-field control.
+        Defaults to True.
+
+        api_key: If specified, unify API key to be used. Defaults to the value in the
+        `UNIFY_KEY` environment variable.
+
+        entries: Dictionary containing one or more key:value pairs that will be logged
+        into the platform as entries.
+
+    Returns:
+        A message indicating whether the logs were successfully updated.
+    """
+    ret = await _add_to_log(
+        logs=logs,
+        mode="entries",
+        overwrite=overwrite,
+        mutable=mutable,
+        api_key=api_key,
+        **entries,
+    )
+    if _logs.USR_LOGGING:
+        logging.info(
+            f"Added Entries {', '.join(list(entries.keys()))} "
+            f"to Logs({', '.join([str(i) for i in _to_log_ids(logs)])})",
+        )
+    return ret
+
+
+async def update_logs(
+    *,
+    logs: Optional[Union[int, unify.Log, List[Union[int, unify.Log]]]] = None,
+    context: Optional[Union[str, List[str]]] = None,
+    params: Optional[Union[Dict[str, Any], List[Dict[str, Any]]]] = None,
+    entries: Optional[Union[Dict[str, Any], List[Dict[str, Any]]]] = None,
+    overwrite: bool = False,
+    api_key: Optional[str] = None,
+) -> Dict[str, str]:
+    """
+    Updates existing logs.
+    """
+    if not logs and not params and not entries:
+        return {"detail": "No logs to update."}
+    api_key = _validate_api_key(api_key)
+    body = {
+        "ids": _to_log_ids(logs),
+        "context": context,
+        # ToDo: remove once this [https://app.clickup.com/t/86c25g263] is done
+        "params": [{}] * len(entries) if params is None else params,
+        "entries": [{}] * len(params) if entries is None else entries,
+        # end ToDo
+        "overwrite": overwrite,
+    }
+    response = await http.async_put(BASE_URL + "/logs", api_key=api_key, json=body)
+    if response.status_code != 200:
+        raise Exception(response.json())
+    return response.json()
+
+
+async def delete_logs(
+    *,
+    logs: Optional[Union[int, unify.Log, List[Union[int, unify.Log]]]] = None,
+    project: Optional[str] = None,
+    api_key: Optional[str] = None,
+) -> Dict[str, str]:
+    """
+    Deletes logs from a project.
+
+    Args:
+        logs: log(s) to delete from a project.
+
+        project: Name of the project to delete logs from.
+
+        api_key: If specified, unify API key to be used. Defaults to the value in the
+        `UNIFY_KEY` environment variable.
+
+    Returns:
+        A message indicating whether the logs were successfully deleted.
+    """
+    if logs is None:
+        logs = await get_logs(project=project, api_key=api_key)
+        if not logs:
+            return {"message": "No logs to delete"}
+    project = await _get_and_maybe_create_project(project, api_key=api_key)
+    log_ids = _to_log_ids(logs)
+    api_key = _validate_api_key(api_key)
+    body = {"project": project, "ids_and_fields": [(log_ids, None)]}
+    response = await http.async_delete(BASE_URL + "/logs", api_key=api_key, json=body)
+    if response.status_code != 200:
+        raise Exception(response.json())
+    if _logs.USR_LOGGING:
+        logging.info(f"Deleted Logs({', '.join([str(i) for i in log_ids])})")
+    return response.json()
+
+
+async def delete_log_fields(
+    *,
+    field: str,
+    logs: Optional[Union[int, unify.Log, List[Union[int, unify.Log]]]] = None,
+    project: Optional[str] = None,
+    api_key: Optional[str] = None,
+) -> Dict[str, str]:
+    """
+    Deletes an entry from a log.
+
+    Args:
+        field: Name of the field to delete from the given logs.
+
+        logs: log(s) to delete entries from.
+
+        project: Name of the project to delete logs from.
+
+        api_key: If specified, unify API key to be used. Defaults to the value in the
+        `UNIFY_KEY` environment variable.
+
+    Returns:
+        A message indicating whether the log entries were successfully deleted.
+    """
+    log_ids = _to_log_ids(logs)
+    api_key = _validate_api_key(api_key)
+    project = await _get_and_maybe_create_project(project, api_key=api_key)
+    body = {"project": project, "ids_and_fields": [(log_ids, field)]}
+    response = await http.async_delete(BASE_URL + "/logs", api_key=api_key, json=body)
+    if response.status_code != 200:
+        raise Exception(response.json())
+    if _logs.USR_LOGGING:
+        logging.info(
+            f"Deleted Field `{field}` from Logs({', '.join([str(i) for i in log_ids])})",
+        )
+    return response.json()
+
+
+# noinspection PyShadowingBuiltins
+async def get_logs(
+    *,
+    project: Optional[str] = None,
+    context: Optional[str] = None,
+    filter: Optional[str] = None,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    return_ids_only: bool = False,
+    api_key: Optional[str] = None,
+) -> List[unify.Log]:
+    """
+    Returns a list of filtered logs from a project.
+
+    Args:
+        project: Name of the project to get logs from.
+
+        context: Context of the logs to get.
+
+        filter: Boolean string to filter logs, for example:
+        "(temperature > 0.5 and (len(system_msg) < 100 or 'no' in usr_response))"
+
+        limit: The maximum number of logs to return. Default is None (unlimited).
+
+        offset: The starting index of the logs to return. Default is 0.
+
+        return_ids_only: Whether to return only the log ids.
+
+        api_key: If specified, unify API key to be used. Defaults to the value in the
+        `UNIFY_KEY` environment variable.
+
+    Returns:
+        The list of logs for the project, after optionally applying filtering.
+    """
+    api_key = _validate_api_key(api_key)
+    project = await _get_and_maybe_create_project(project, api_key=api_key)
+    params = {
+        "project": project,
+        "context": context,
+        "filter_expr": filter,
+        "limit": limit,
+        "offset": offset,
+        "return_ids_only": return_ids_only,
+    }
+    response = await http.async_get(BASE_URL + "/logs", api_key=api_key, params=params)
+    if response.status_code != 200:
+        raise Exception(response.json())
+    if return_ids_only:
+        return response.json()
+    params, logs, _ = response.json().values()
+    return [
+        unify.Log(
+            id=dct["id"],
+            ts=dct["ts"],
+            **dct["entries"],
+            params={
+                param_name: (param_ver, params[param_name][param_ver])
+                for param_name, param_ver in dct["params"].items()
+            },
+            api_key=api_key,
+        )
+        for dct in logs
+    ]
+
+
+# noinspection PyShadowingBuiltins
+async def get_log_by_id(
+    id: int,
+    project: Optional[str] = None,
+    *,
+    api_key: Optional[str] = None,
+) -> unify.Log:
+    """
+    Returns the log associated with a given id.
+
+    Args:
+        id: IDs of the logs to fetch.
+
+        project: Name of the project to get logs from.
+
+        api_key: If specified, unify API key to be used. Defaults to the value in the
+        `UNIFY_KEY` environment variable.
+
+    Returns:
+        The full set of log data.
+    """
+    api_key = _validate_api_key(api_key)
+    project = await _get_and_maybe_create_project(project, api_key=api_key)
+    response = await http.async_get(
+        BASE_URL + "/logs",
+        params={"project": project, "from_ids": [id]},
+        api_key=api_key,
+    )
+    if response.status_code != 200:
+        raise Exception(response.json())
+    params, lgs, count = response.json().values()
+    if len(lgs) == 0:
+        raise Exception(f"Log with id {id} does not exist")
+    lg = lgs[0]
+    return unify.Log(
+        id=lg["id"],
+        ts=lg["ts"],
+        **lg["entries"],
+        params={k: (v, params[k][v]) for k, v in lg["params"].items()},
+        api_key=api_key,
+    )
+
+
+# noinspection PyShadowingBuiltins
+async def get_logs_metric(
+    *,
+    metric: str,
+    key: str,
+    filter: Optional[str] = None,
+    project: Optional[str] = None,
+    api_key: Optional[str] = None,
+) -> Union[float, int, bool]:
+    """
+    Retrieve a set of log metrics across a project, after applying the filtering.
+
+    Args:
+        metric: The reduction metric to compute for the specified key. Supported are:
+        sum, mean, var, std, min, max, median, mode.
+
+        key: The key to compute the reduction statistic for.
+
+        filter: The filtering to apply to the various log values, expressed as a string,
+        for example:
+        "(temperature > 0.5 and (len(system_msg) < 100 or 'no' in usr_response))"
+
+        project: The id of the project to retrieve the logs for.
+
+        api_key: If specified, unify API key to be used. Defaults to the value in the
+        `UNIFY_KEY` environment variable.
+
+    Returns:
+        The full set of reduced log metrics for the project, after optionally applying
+        the optional filtering.
+    """
+    api_key = _validate_api_key(api_key)
+    project = await _get_and_maybe_create_project(project, api_key=api_key)
+    params = {"project": project, "filter_expr": filter, "key": key}
+    response = await http.async_get(
+        BASE_URL + f"/logs/metric/{metric}",
+        api_key=api_key,
+        params=params,
+    )
+    if response.status_code != 200:
+        raise Exception(response.json())
+    return response.json()
+
+
+async def get_groups(
+    *,
+    key: str,
+    project: Optional[str] = None,
+    api_key: Optional[str] = None,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Returns a list of the different version/values of one entry within a given project
+    based on its key.
+
+    Args:
+        key: Name of the log entry to do equality matching for.
+
+        project: Name of the project to get logs from.
+
+        api_key: If specified, unify API key to be used. Defaults to the value in the
+        `UNIFY_KEY` environment variable.
+
+    Returns:
+        A dict containing the grouped logs, with each key of the dict representing the
+        version of the log key with equal values, and the value being the equal value.
+    """
+    api_key = _validate_api_key(api_key)
+    project = await _get_and_maybe_create_project(project, api_key=api_key)
+    params = {"project": project, "key": key}
+    response = await http.async_get(
+        BASE_URL + "/logs/groups",
+        api_key=api_key,
+        params=params,
+    )
+    if response.status_code != 200:
+        raise Exception(response.json())
+    return response.json()
@@ -0,0 +1,156 @@
+from typing import Dict, List, Optional
+
+import unify
+from unify import BASE_URL
+
+from ..utils import http
+from ..utils.helpers import (
+    _add_known_project,
+    _is_known_project,
+    _remove_known_project,
+    _set_known_projects,
+    _validate_api_key,
+)
+
+# Projects #
+# ---------#
+
+
+async def create_project(
+    name: str,
+    *,
+    overwrite: bool = False,
+    api_key: Optional[str] = None,
+) -> Dict[str, str]:
+    """
+    Creates a logging project and adds this to your account. This project will have
+    a set of logs associated with it.
+
+    Args:
+        name: A unique, user-defined name used when referencing the project.
+
+        overwrite: Whether to overwrite an existing project if is already exists.
+
+        api_key: If specified, unify API key to be used. Defaults to the value in the
+        `UNIFY_KEY` environment variable.
+
+    Returns:
+        A message indicating whether the project was created successfully.
+    """
+    api_key = _validate_api_key(api_key)
+    body = {"name": name}
+    if overwrite:
+        if name in await list_projects(api_key=api_key):
+            await delete_project(name=name, api_key=api_key)
+    response = await http.async_post(BASE_URL + "/project", api_key=api_key, json=body)
+    if response.status_code != 200:
+        raise Exception(response.json())
+    _add_known_project(api_key, name)
+    return response.json()
+
+
+async def rename_project(
+    name: str,
+    new_name: str,
+    *,
+    api_key: Optional[str] = None,
+) -> Dict[str, str]:
+    """
+    Renames a project from `name` to `new_name` in your account.
+
+    Args:
+        name: Name of the project to rename.
+
+        new_name: A unique, user-defined name used when referencing the project.
+
+        api_key: If specified, unify API key to be used. Defaults to the value in the
+        `UNIFY_KEY` environment variable.
+
+    Returns:
+        A message indicating whether the project was successfully renamed.
+    """
+    api_key = _validate_api_key(api_key)
+    body = {"name": new_name}
+    response = await http.async_patch(
+        BASE_URL + f"/project/{name}",
+        api_key=api_key,
+        json=body,
+    )
+    if response.status_code != 200:
+        raise Exception(response.json())
+    _remove_known_project(api_key, name)
+    _add_known_project(api_key, new_name)
+    return response.json()
+
+
+async def delete_project(
+    name: str,
+    *,
+    api_key: Optional[str] = None,
+) -> str:
+    """
+    Deletes a project from your account.
+
+    Args:
+        name: Name of the project to delete.
+
+        api_key: If specified, unify API key to be used. Defaults to the value in the
+        `UNIFY_KEY` environment variable.
+
+    Returns:
+        Whether the project was successfully deleted.
+    """
+    api_key = _validate_api_key(api_key)
+    response = await http.async_delete(BASE_URL + f"/project/{name}", api_key=api_key)
+    if response.status_code != 200:
+        raise Exception(response.json())
+    _remove_known_project(api_key, name)
+    return response.json()
+
+
+async def list_projects(
+    *,
+    api_key: Optional[str] = None,
+) -> List[str]:
+    """
+    Returns the names of all projects stored in your account.
+
+    Args:
+        api_key: If specified, unify API key to be used. Defaults to the value in the
+        `UNIFY_KEY` environment variable.
+
+    Returns:
+        List of all project names.
+    """
+    api_key = _validate_api_key(api_key)
+    response = await http.async_get(BASE_URL + "/projects", api_key=api_key)
+    if response.status_code != 200:
+        raise Exception(response.json())
+    _set_known_projects(api_key, response.json())
+    return response.json()
+
+
+async def _get_and_maybe_create_project(
+    project: Optional[str] = None,
+    required: bool = True,
+    api_key: Optional[str] = None,
+    create_if_missing: bool = True,
+) -> Optional[str]:
+    api_key = _validate_api_key(api_key)
+    if project is None:
+        project = unify.active_project()
+        if project is None:
+            if required:
+                project = "_"
+            else:
+                return None
+    if not create_if_missing or _is_known_project(api_key, project):
+        return project
+    if project not in await list_projects(api_key=api_key):
+        try:
+            await create_project(project, api_key=api_key)
+        except Exception:
+            # another coroutine may have created the project in the meantime
+            if project not in await list_projects(api_key=api_key):
+                raise
+    return project
@@ -0,0 +1,19 @@
+"""Configuration and maintenance of the local cache of responses."""
+
+from .utils._caching import (
+    CacheBackend,
+    SQLiteCacheBackend,
+    cache_stats,
+    compact,
+    export_cache as export,
+    import_cache as import_,
+    migrate_json_cache,
+    set_cache_backend,
+    set_cache_debug,
+    set_cache_size,
+    set_cache_ttl,
+    set_caching,
+    set_caching_fname,
+    set_stream_replay_timing,
+    warm_cache_from_logs as warm_from_logs,
+)
@@ -1,8 +1,8 @@
 from typing import Any, Dict, Optional
 
-import requests
 from unify import BASE_URL
 
+from ...utils import http
 from ...utils.helpers import _get_and_maybe_create_project, _validate_api_key
 
 # Artifacts #
@@ -32,15 +32,11 @@ def add_project_artifacts(
         A message indicating whether the artifacts were successfully added.
     """
     api_key = _validate_api_key(api_key)
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {api_key}",
-    }
     body = {"artifacts": kwargs}
     project = _get_and_maybe_create_project(project, api_key=api_key)
-    response = requests.post(
+    response = http.post(
         BASE_URL + f"/project/{project}/artifacts",
-        headers=headers,
+        api_key=api_key,
         json=body,
     )
     if response.status_code != 200:
@@ -69,14 +65,10 @@ def delete_project_artifact(
         Whether the artifact was successfully deleted.
     """
     api_key = _validate_api_key(api_key)
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {api_key}",
-    }
     project = _get_and_maybe_create_project(project, api_key=api_key)
-    response = requests.delete(
+    response = http.delete(
         BASE_URL + f"/project/{project}/artifacts/{key}",
-        headers=headers,
+        api_key=api_key,
     )
     if response.status_code != 200:
         raise Exception(response.json())
@@ -102,12 +94,8 @@ def get_project_artifacts(
         artifact names and values for the artifacts themselves.
     """
     api_key = _validate_api_key(api_key)
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {api_key}",
-    }
     project = _get_and_maybe_create_project(project, api_key=api_key)
-    response = requests.get(BASE_URL + f"/project/{project}/artifacts", headers=headers)
+    response = http.get(BASE_URL + f"/project/{project}/artifacts", api_key=api_key)
     if response.status_code != 200:
         raise Exception(response.json())
     return response.json()
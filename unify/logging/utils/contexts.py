@@ -1,8 +1,8 @@
 from typing import Dict, List, Optional
 
-import requests
 from unify import BASE_URL
 
+from ...utils import http
 from ...utils.helpers import _get_and_maybe_create_project, _validate_api_key
 
 # Contexts #
@@ -41,18 +41,14 @@ def create_context(
         api_key=api_key,
         create_if_missing=False,
     )
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {api_key}",
-    }
     body = {
         "name": name,
         "description": description,
         "is_versioned": is_versioned,
     }
-    response = requests.post(
+    response = http.post(
         BASE_URL + f"/project/{project}/contexts",
-        headers=headers,
+        api_key=api_key,
         json=body,
     )
     if response.status_code != 200:
@@ -84,18 +80,14 @@ def get_contexts(
         A message indicating whether the artifacts were successfully added.
     """
     api_key = _validate_api_key(api_key)
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {api_key}",
-    }
     project = _get_and_maybe_create_project(
         project,
         api_key=api_key,
         create_if_missing=False,
     )
-    response = requests.get(
+    response = http.get(
         BASE_URL + f"/project/{project}/contexts",
-        headers=headers,
+        api_key=api_key,
     )
     if response.status_code != 200:
         raise Exception(response.json())
@@ -133,14 +125,10 @@ def delete_context(
         api_key=api_key,
         create_if_missing=False,
     )
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {api_key}",
-    }
-    response = requests.delete(
+    response = http.delete(
         BASE_URL + f"/project/{project}/contexts",
         params={"name": name},
-        headers=headers,
+        api_key=api_key,
     )
     if response.status_code != 200:
         raise Exception(response.json())
@@ -176,17 +164,13 @@ def add_logs_to_context(
         api_key=api_key,
         create_if_missing=False,
     )
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {api_key}",
-    }
     body = {
         "context_name": context,
         "log_ids": log_ids,
     }
-    response = requests.post(
+    response = http.post(
         BASE_URL + f"/project/{project}/contexts/add_logs",
-        headers=headers,
+        api_key=api_key,
         json=body,
     )
     if response.status_code != 200:
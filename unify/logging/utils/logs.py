@@ -10,12 +10,13 @@ import sys
 from contextvars import ContextVar
 from typing import Any, Callable, Dict, List, Optional, Union
 
-import requests
 import unify
 from tqdm import tqdm
 from unify import BASE_URL
 
+from ...utils import http
 from ...utils._caching import (
+    _cache_key,
     _get_cache,
     _get_caching,
     _get_caching_fname,
@@ -63,16 +64,13 @@ RUNNING_TIME = ContextVar("running_time", default=0.0)
 CHUNK_LIMIT = 5000000
 
 
-def _removes_unique_trace_values(kw: Dict[str, Any]) -> Dict[str, Any]:
-    del kw["id"]
-    del kw["exec_time"]
-    if "parent_span_id" in kw:
-        del kw["parent_span_id"]
-    if "child_spans" in kw:
-        kw["child_spans"] = [
-            _removes_unique_trace_values(cs) for cs in kw["child_spans"]
-        ]
-    return kw
+# trace fields which differ between otherwise identical calls, left out of cache keys
+_VOLATILE_SPAN_FIELDS: Dict[str, Any] = {
+    "id": None,
+    "exec_time": None,
+    "parent_span_id": None,
+}
+_VOLATILE_SPAN_FIELDS["child_spans"] = [_VOLATILE_SPAN_FIELDS]
 
 
 def initialize_async_logger(
@@ -125,14 +123,18 @@ def _handle_cache(fn: Callable) -> Callable:
     def wrapped(*args, **kwargs):
         if not _get_caching():
             return fn(*args, **kwargs)
-        kw_for_key = copy.deepcopy(kwargs)
-        if fn.__name__ == "add_log_entries" and "trace" in kwargs:
-            kw_for_key["trace"] = _removes_unique_trace_values(kw_for_key["trace"])
-        combined_kw = {**{f"arg{i}": a for i, a in enumerate(args)}, **kw_for_key}
+        combined_kw = {**{f"arg{i}": a for i, a in enumerate(args)}, **kwargs}
+        if fn.__name__ == "add_log_entries":
+            volatile = {"trace": _VOLATILE_SPAN_FIELDS}
+        else:
+            volatile = None
+        # the key is hashed up front, as the call itself may mutate the arguments
+        cache_key = _cache_key(fn.__name__, combined_kw, volatile)
         ret = _get_cache(
             fn_name=fn.__name__,
             kw=combined_kw,
             filename=_get_caching_fname(),
+            cache_key=cache_key,
         )
         if ret is not None:
             return ret
@@ -142,6 +144,7 @@ def _handle_cache(fn: Callable) -> Callable:
             kw=combined_kw,
             response=ret,
             filename=_get_caching_fname(),
+            cache_key=cache_key,
         )
         return ret
 
@@ -409,18 +412,13 @@ def _sync_log(
 
     This is a helper function used when async logging is disabled or unavailable.
     """
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {api_key}",
-    }
-
     body = {
         "project": project,
         "context": context,
         "params": params,
         "entries": entries,
     }
-    response = requests.post(BASE_URL + "/logs", headers=headers, json=body)
+    response = http.post(BASE_URL + "/logs", api_key=api_key, json=body)
     if response.status_code != 200:
         raise Exception(response.json())
     return unify.Log(
@@ -465,10 +463,6 @@ def create_logs(
     api_key = _validate_api_key(api_key)
     project = _get_and_maybe_create_project(project, api_key=api_key)
     context = _handle_context(context)
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {api_key}",
-    }
     # ToDo: add support for all of the context variables, as is done for `unify.log` above
     params = _handle_mutability(mutable, params)
     entries = _handle_mutability(mutable, entries)
@@ -484,11 +478,11 @@ def create_logs(
     }
     body_size = sys.getsizeof(json.dumps(body))
     if body_size < CHUNK_LIMIT:
-        response = requests.post(BASE_URL + "/logs", headers=headers, json=body)
+        response = http.post(BASE_URL + "/logs", api_key=api_key, json=body)
     else:
-        response = requests.post(
+        response = http.post(
             BASE_URL + "/logs",
-            headers=headers,
+            api_key=api_key,
             data=_json_chunker(body),
         )
     if response.status_code != 200:
@@ -557,10 +551,6 @@ def _add_to_log(
     else:
         # Fallback to synchronous update if async logging isn’t enabled.
         log_ids = _to_log_ids(logs)
-        headers = {
-            "accept": "application/json",
-            "Authorization": f"Bearer {api_key}",
-        }
         all_kwargs = []
         if nest_level.get() > 0:
             for log_id in log_ids:
@@ -578,7 +568,7 @@ def _add_to_log(
             ), "All logs must share the same context if they're all being updated at the same time."
             data = all_kwargs[0]
         body = {"ids": log_ids, mode: data, "overwrite": overwrite, "context": context}
-        response = requests.put(BASE_URL + "/logs", headers=headers, json=body)
+        response = http.put(BASE_URL + "/logs", api_key=api_key, json=body)
         if response.status_code != 200:
             raise Exception(response.json())
         if nest_level.get() > 0:
@@ -696,10 +686,6 @@ def update_logs(
     if not logs and not params and not entries:
         return {"detail": "No logs to update."}
     api_key = _validate_api_key(api_key)
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {api_key}",
-    }
     body = {
         "ids": _to_log_ids(logs),
         "context": context,
@@ -709,7 +695,7 @@ def update_logs(
         # end ToDo
         "overwrite": overwrite,
     }
-    response = requests.put(BASE_URL + "/logs", headers=headers, json=body)
+    response = http.put(BASE_URL + "/logs", api_key=api_key, json=body)
     if response.status_code != 200:
         raise Exception(response.json())
     return response.json()
@@ -743,12 +729,8 @@ def delete_logs(
     project = _get_and_maybe_create_project(project, api_key=api_key)
     log_ids = _to_log_ids(logs)
     api_key = _validate_api_key(api_key)
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {api_key}",
-    }
     body = {"project": project, "ids_and_fields": [(log_ids, None)]}
-    response = requests.delete(BASE_URL + f"/logs", headers=headers, json=body)
+    response = http.delete(BASE_URL + f"/logs", api_key=api_key, json=body)
     if response.status_code != 200:
         raise Exception(response.json())
     if USR_LOGGING:
@@ -782,15 +764,11 @@ def delete_log_fields(
     """
     log_ids = _to_log_ids(logs)
     api_key = _validate_api_key(api_key)
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {api_key}",
-    }
     project = _get_and_maybe_create_project(project, api_key=api_key)
     body = {"project": project, "ids_and_fields": [(log_ids, field)]}
-    response = requests.delete(
+    response = http.delete(
         BASE_URL + f"/logs",
-        headers=headers,
+        api_key=api_key,
         json=body,
     )
     if response.status_code != 200:
@@ -838,10 +816,6 @@ def get_logs(
     """
     # ToDo: add support for all context handlers
     api_key = _validate_api_key(api_key)
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {api_key}",
-    }
     project = _get_and_maybe_create_project(project, api_key=api_key)
     params = {
         "project": project,
@@ -851,7 +825,7 @@ def get_logs(
         "offset": offset,
         "return_ids_only": return_ids_only,
     }
-    response = requests.get(BASE_URL + "/logs", headers=headers, params=params)
+    response = http.get(BASE_URL + "/logs", api_key=api_key, params=params)
     if response.status_code != 200:
         raise Exception(response.json())
     if return_ids_only:
@@ -894,15 +868,11 @@ def get_log_by_id(
         The full set of log data.
     """
     api_key = _validate_api_key(api_key)
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {api_key}",
-    }
     project = _get_and_maybe_create_project(project, api_key=api_key)
-    response = requests.get(
+    response = http.get(
         BASE_URL + "/logs",
         params={"project": project, "from_ids": [id]},
-        headers=headers,
+        api_key=api_key,
     )
     if response.status_code != 200:
         raise Exception(response.json())
@@ -951,15 +921,11 @@ def get_logs_metric(
         the optional filtering.
     """
     api_key = _validate_api_key(api_key)
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {api_key}",
-    }
     project = _get_and_maybe_create_project(project, api_key=api_key)
     params = {"project": project, "filter_expr": filter, "key": key}
-    response = requests.get(
+    response = http.get(
         BASE_URL + f"/logs/metric/{metric}",
-        headers=headers,
+        api_key=api_key,
         params=params,
     )
     if response.status_code != 200:
@@ -990,13 +956,9 @@ def get_groups(
         version of the log key with equal values, and the value being the equal value.
     """
     api_key = _validate_api_key(api_key)
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {api_key}",
-    }
     project = _get_and_maybe_create_project(project, api_key=api_key)
     params = {"project": project, "key": key}
-    response = requests.get(BASE_URL + "/logs/groups", headers=headers, params=params)
+    response = http.get(BASE_URL + "/logs/groups", api_key=api_key, params=params)
     if response.status_code != 200:
         raise Exception(response.json())
     return response.json()
@@ -1,9 +1,14 @@
 from typing import Dict, List, Optional
 
-import requests
 from unify import BASE_URL
 
-from ...utils.helpers import _validate_api_key
+from ...utils import http
+from ...utils.helpers import (
+    _add_known_project,
+    _remove_known_project,
+    _set_known_projects,
+    _validate_api_key,
+)
 
 # Projects #
 # ---------#
@@ -31,17 +36,14 @@ def create_project(
         A message indicating whether the project was created successfully.
     """
     api_key = _validate_api_key(api_key)
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {api_key}",
-    }
     body = {"name": name}
     if overwrite:
         if name in list_projects(api_key=api_key):
             delete_project(name=name, api_key=api_key)
-    response = requests.post(BASE_URL + "/project", headers=headers, json=body)
+    response = http.post(BASE_URL + "/project", api_key=api_key, json=body)
     if response.status_code != 200:
         raise Exception(response.json())
+    _add_known_project(api_key, name)
     return response.json()
 
 
@@ -66,14 +68,12 @@ def rename_project(
         A message indicating whether the project was successfully renamed.
     """
     api_key = _validate_api_key(api_key)
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {api_key}",
-    }
     body = {"name": new_name}
-    response = requests.patch(BASE_URL + f"/project/{name}", headers=headers, json=body)
+    response = http.patch(BASE_URL + f"/project/{name}", api_key=api_key, json=body)
     if response.status_code != 200:
         raise Exception(response.json())
+    _remove_known_project(api_key, name)
+    _add_known_project(api_key, new_name)
     return response.json()
 
 
@@ -95,13 +95,10 @@ def delete_project(
         Whether the project was successfully deleted.
     """
     api_key = _validate_api_key(api_key)
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {api_key}",
-    }
-    response = requests.delete(BASE_URL + f"/project/{name}", headers=headers)
+    response = http.delete(BASE_URL + f"/project/{name}", api_key=api_key)
     if response.status_code != 200:
         raise Exception(response.json())
+    _remove_known_project(api_key, name)
     return response.json()
 
 
@@ -120,11 +117,8 @@ def list_projects(
         List of all project names.
     """
     api_key = _validate_api_key(api_key)
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {api_key}",
-    }
-    response = requests.get(BASE_URL + "/projects", headers=headers)
+    response = http.get(BASE_URL + "/projects", api_key=api_key)
     if response.status_code != 200:
         raise Exception(response.json())
+    _set_known_projects(api_key, response.json())
     return response.json()
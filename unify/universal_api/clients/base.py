@@ -18,6 +18,8 @@ from typing_extensions import Self
 # local
 from unify import BASE_URL
 
+from unify.utils import http
+
 # noinspection PyProtectedMember
 from unify.utils.helpers import _validate_api_key
 
@@ -959,12 +961,8 @@ class _Client(ABC):
             ValueError: If there was an error parsing the JSON response.
         """
         url = f"{BASE_URL}/credits"
-        headers = {
-            "accept": "application/json",
-            "Authorization": f"Bearer {self._api_key}",
-        }
         try:
-            response = requests.get(url, headers=headers, timeout=10)
+            response = http.get(url, api_key=self._api_key, timeout=10)
             if response.status_code != 200:
                 raise Exception(response.json())
             return response.json()["credits"]
@@ -1,150 +1,250 @@
+import functools
+import re
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
 import unify
 
-# Helpers
+from ..utils import supported_endpoints
 
+# Routing Specs #
+# --------------#
 
-def _is_custom_endpoint(endpoint: str):
-    _, provider = endpoint.split("@")
-    return "custom" in provider
+META_METRICS = frozenset(
+    (
+        "highest-quality",
+        "lowest-time-to-first-token",
+        "lowest-inter-token-latency",
+        "lowest-input-cost",
+        "lowest-output-cost",
+        "lowest-cost",
+        "lowest-ttft",
+        "lowest-itl",
+        "lowest-ic",
+        "lowest-oc",
+        "highest-q",
+        "lowest-t",
+        "lowest-i",
+        "lowest-c",
+    )
+    + (
+        "quality",
+        "time-to-first-token",
+        "inter-token-latency",
+        "input-cost",
+        "output-cost",
+        "cost",
+    )
+    + (
+        "q",
+        "ttft",
+        "itl",
+        "ic",
+        "oc",
+        "t",
+        "i",
+        "c",
+    ),
+)
 
+_META_FILTERS = ("skip_providers", "providers", "skip_models", "models")
 
-def _is_local_endpoint(endpoint: str):
-    _, provider = endpoint.split("@")
-    return provider == "local"
+_METRIC_PATTERN = re.compile(
+    r"(?P<metric>[a-z-]+)(?:(?P<op><=|>=|[:<>=])(?P<value>\d*\.?\d+))?",
+)
 
 
-def _is_fallback_provider(provider: str, api_key: str = None):
-    public_providers = unify.list_providers(api_key=api_key)
-    return all(p in public_providers for p in provider.split("->"))
+class MetaProvider(NamedTuple):
+    """
+    A parsed meta-provider, such as `q:1|ttft:0.5|providers:a,b`. Each metric is a
+    (name, operator, value) triple, where the operator is ":" for a weight and one of
+    "<", ">", "=", "<=", ">=" for a threshold, and both are None for a bare objective
+    like "lowest-cost".
+    """
 
+    metrics: Tuple[Tuple[str, Optional[str], Optional[float]], ...] = ()
+    providers: Tuple[str, ...] = ()
+    skip_providers: Tuple[str, ...] = ()
+    models: Tuple[str, ...] = ()
+    skip_models: Tuple[str, ...] = ()
 
-def _is_fallback_model(model: str, api_key: str = None):
-    public_models = unify.list_models(api_key=api_key)
-    return all(p in public_models for p in model.split("->"))
 
+class RoutingStep(NamedTuple):
+    """
+    One link of a (possibly single-link) fallback chain. Either side is None when the
+    routing string only specifies a model or only a provider.
+    """
 
-def _is_fallback_endpoint(endpoint: str, api_key: str = None):
-    public_endpoints = unify.list_endpoints(api_key=api_key)
-    return all(e in public_endpoints for e in endpoint.split("->"))
+    model: Optional[str]
+    provider: Optional[str]
+    meta: Optional[MetaProvider] = None
 
 
-def _is_meta_provider(provider: str, api_key: str = None):
-    public_providers = unify.list_providers(api_key=api_key)
-    if "skip_providers:" in provider:
-        skip_provs = provider.split("skip_providers:")[-1].split("|")[0]
-        for prov in skip_provs.split(","):
-            if prov.strip() not in public_providers:
-                return False
-        chnk0, chnk1 = provider.split("skip_providers:")
-        chnk2 = "|".join(chnk1.split("|")[1:])
-        provider = "".join([chnk0, chnk2])
-    if "providers:" in provider:
-        provs = provider.split("providers:")[-1].split("|")[0]
-        for prov in provs.split(","):
-            if prov.strip() not in public_providers:
-                return False
-        chnk0, chnk1 = provider.split("providers:")
-        chnk2 = "|".join(chnk1.split("|")[1:])
-        provider = "".join([chnk0, chnk2])
-        if provider[-1] == "|":
-            provider = provider[:-1]
-    public_models = unify.list_models(api_key=api_key)
-    if "skip_models:" in provider:
-        skip_mods = provider.split("skip_models:")[-1].split("|")[0]
-        for md in skip_mods.split(","):
-            if md.strip() not in public_models:
-                return False
-        chnk0, chnk1 = provider.split("skip_models:")
-        chnk2 = "|".join(chnk1.split("|")[1:])
-        provider = "".join([chnk0, chnk2])
-    if "models:" in provider:
-        mods = provider.split("models:")[-1].split("|")[0]
-        for md in mods.split(","):
-            if md.strip() not in public_models:
-                return False
-        chnk0, chnk1 = provider.split("models:")
-        chnk2 = "|".join(chnk1.split("|")[1:])
-        provider = "".join([chnk0, chnk2])
-    meta_providers = (
-        (
-            "highest-quality",
-            "lowest-time-to-first-token",
-            "lowest-inter-token-latency",
-            "lowest-input-cost",
-            "lowest-output-cost",
-            "lowest-cost",
-            "lowest-ttft",
-            "lowest-itl",
-            "lowest-ic",
-            "lowest-oc",
-            "highest-q",
-            "lowest-t",
-            "lowest-i",
-            "lowest-c",
-        )
-        + (
-            "quality",
-            "time-to-first-token",
-            "inter-token-latency",
-            "input-cost",
-            "output-cost",
-            "cost",
-        )
-        + (
-            "q",
-            "ttft",
-            "itl",
-            "ic",
-            "oc",
-            "t",
-            "i",
-            "c",
+RoutingSpec = Tuple[RoutingStep, ...]
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_meta_provider(provider: str) -> Optional[MetaProvider]:
+    metrics = list()
+    filters = {k: () for k in _META_FILTERS}
+    for segment in provider.split("|"):
+        if not segment:
+            continue
+        key, sep, names = segment.partition(":")
+        if sep and key in filters:
+            filters[key] = tuple(n.strip() for n in names.split(",") if n.strip())
+            continue
+        match = _METRIC_PATTERN.fullmatch(segment)
+        if match is None or match["metric"] not in META_METRICS:
+            return None
+        value = match["value"]
+        metrics.append(
+            (match["metric"], match["op"], None if value is None else float(value)),
         )
+    return MetaProvider(tuple(metrics), **filters)
+
+
+def _provider_step(model: Optional[str], provider: str) -> RoutingStep:
+    return RoutingStep(model, provider, _parse_meta_provider(provider))
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_model(model: str) -> RoutingSpec:
+    return tuple(RoutingStep(m, None) for m in model.split("->"))
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_provider(provider: str) -> RoutingSpec:
+    return tuple(_provider_step(None, p) for p in provider.split("->"))
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_endpoint(endpoint: str) -> RoutingSpec:
+    links = endpoint.split("->")
+    if all(link.count("@") == 1 for link in links):
+        # model1@provider1->model2@provider2
+        return tuple(_provider_step(*link.split("@")) for link in links)
+    if endpoint.count("@") != 1:
+        raise ValueError(f"{endpoint} is not a valid endpoint string")
+    models, providers = endpoint.split("@")
+    # model1->model2@provider or model@provider1->provider2
+    return tuple(
+        _provider_step(m, p) for m in models.split("->") for p in providers.split("->")
     )
-    operators = ("<", ">", "=", "|", ".", ":")
-    for s in meta_providers + operators:
-        provider = provider.replace(s, "")
-    return all(c.isnumeric() for c in provider)
+
+
+# Catalog Checks #
+# ---------------#
+
+# positive validation results, stored as (kind, api key, value) -> timestamp
+_validated: Dict[Tuple[str, Optional[str], str], float] = dict()
+
+
+class _CatalogView:
+    """
+    Public providers, models and endpoints, each fetched at most once per instance so
+    that a whole batch of routing strings is checked against a single catalog read.
+    """
+
+    def __init__(self, api_key: Optional[str] = None):
+        self._api_key = api_key
+
+    @functools.cached_property
+    def providers(self) -> Set[str]:
+        return set(unify.list_providers(api_key=self._api_key))
+
+    @functools.cached_property
+    def models(self) -> Set[str]:
+        return set(unify.list_models(api_key=self._api_key))
+
+    @functools.cached_property
+    def endpoints(self) -> Set[str]:
+        return set(unify.list_endpoints(api_key=self._api_key))
+
+
+def _is_custom_or_local(provider: Optional[str]) -> bool:
+    return provider is not None and (provider == "local" or "custom" in provider)
+
+
+def _is_valid_meta(meta: MetaProvider, catalog: _CatalogView) -> bool:
+    if any(p not in catalog.providers for p in meta.providers + meta.skip_providers):
+        return False
+    return all(m in catalog.models for m in meta.models + meta.skip_models)
+
+
+def _is_valid_step(
+    step: RoutingStep,
+    catalog: _CatalogView,
+    custom_or_local: bool = False,
+) -> bool:
+    model, provider, meta = step
+    if _is_custom_or_local(provider):
+        return True
+    if model is not None and provider is not None:
+        if f"{model}@{provider}" in catalog.endpoints:
+            return True
+    if provider is not None:
+        if meta is not None:
+            if not _is_valid_meta(meta, catalog):
+                return False
+        elif provider not in catalog.providers:
+            return False
+    if model is not None and not custom_or_local:
+        return model == "router" or model in catalog.models
+    return True
+
+
+def _find_invalid(
+    kind: str,
+    values: Iterable[str],
+    api_key: Optional[str] = None,
+    custom_or_local: bool = False,
+) -> List[str]:
+    parse = {"model": _parse_model, "provider": _parse_provider}.get(
+        kind,
+        _parse_endpoint,
+    )
+    catalog = _CatalogView(api_key)
+    now = time.time()
+    invalid = list()
+    for value in values:
+        key = (kind, api_key, value)
+        if now - _validated.get(key, 0.0) < supported_endpoints.CATALOG_TTL:
+            continue
+        try:
+            spec = parse(value)
+        except ValueError:
+            invalid.append(value)
+            continue
+        if all(_is_valid_step(s, catalog, custom_or_local) for s in spec):
+            if not custom_or_local:
+                _validated[key] = now
+        else:
+            invalid.append(value)
+    return invalid
+
+
+# Helpers
+
+
+def _is_meta_provider(provider: str, api_key: str = None):
+    meta = _parse_meta_provider(provider)
+    return meta is not None and _is_valid_meta(meta, _CatalogView(api_key))
 
 
 # Checks
 
 
 def _is_valid_endpoint(endpoint: str, api_key: str = None):
-    if _is_fallback_endpoint(endpoint, api_key):
-        return True
-    model, provider = endpoint.split("@")
-    if _is_valid_provider(provider) and _is_valid_model(model):
-        return True
-    if endpoint in unify.list_endpoints(api_key=api_key):
-        return True
-    if _is_custom_endpoint(endpoint) or _is_local_endpoint(endpoint):
-        return True
-    return False
+    return not _find_invalid("endpoint", [endpoint], api_key)
 
 
 def _is_valid_provider(provider: str, api_key: str = None):
-    if _is_meta_provider(provider):
-        return True
-    if provider in unify.list_providers(api_key=api_key):
-        return True
-    if _is_fallback_provider(provider):
-        return True
-    if provider == "local" or "custom" in provider:
-        return True
-    return False
+    return not _find_invalid("provider", [provider], api_key)
 
 
 def _is_valid_model(model: str, custom_or_local: bool = False, api_key: str = None):
-    if custom_or_local:
-        return True
-    if model in unify.list_models(api_key=api_key):
-        return True
-    if _is_fallback_model(model):
-        return True
-    if model == "router":
-        return True
-    return False
+    return not _find_invalid("model", [model], api_key, custom_or_local)
 
 
 # Assertions
@@ -154,6 +254,11 @@ def _assert_is_valid_endpoint(endpoint: str, api_key: str = None):
     assert _is_valid_endpoint(endpoint, api_key), f"{endpoint} is not a valid endpoint"
 
 
+def _assert_is_valid_endpoints(endpoints: Iterable[str], api_key: str = None):
+    invalid = _find_invalid("endpoint", endpoints, api_key)
+    assert not invalid, f"invalid endpoints: {', '.join(invalid)}"
+
+
 def _assert_is_valid_provider(provider: str, api_key: str = None):
     assert _is_valid_provider(provider, api_key), f"{provider} is not a valid provider"
 
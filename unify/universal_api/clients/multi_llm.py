@@ -1,6 +1,8 @@
 # global
 import abc
 import asyncio
+import threading
+import weakref
 from typing import Any, Dict, Iterable, List, Optional, Tuple, Type, Union
 
 import requests
@@ -20,11 +22,13 @@ from openai.types.chat import (
 from pydantic import BaseModel
 from typing_extensions import Self
 from unify import BASE_URL
+from unify.utils import http
 
 # noinspection PyProtectedMember
 from unify.utils.helpers import _default, _validate_api_key
 
 from ..clients import AsyncUnify, _Client, _UniClient
+from ..clients.helpers import _assert_is_valid_endpoints
 from ..utils.endpoint_metrics import Metrics
 
 
@@ -68,6 +72,12 @@ class _MultiClient(_Client, abc.ABC):
         return_full_completion: bool = False,
         traced: bool = False,
         cache: Union[bool, str] = None,
+        defer_validation: bool = False,
+        endpoint_timeout: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        return_partial: bool = False,
+        hedge: bool = False,
+        hedge_delay: Optional[Union[float, str]] = None,
         # passthrough arguments
         extra_headers: Optional[Headers] = None,
         extra_query: Optional[Query] = None,
@@ -198,8 +208,33 @@ class _MultiClient(_Client, abc.ABC):
             of running the LLM query. If "write" then the cache will only be written
             to, if "read" then the cache will be read from if a cache is available but
             will not write, and if "read-only" then the argument must be present in the
-            cache, else an exception will be raised. This argument only has any effect
-            when stream=False.
+            cache, else an exception will be raised. When stream=True, the full stream is
+            recorded once consumed, and replayed chunk by chunk on future calls.
+
+            defer_validation: If True, the endpoints are not checked against the list
+            of available endpoints until the first call to generate. Either way, all
+            endpoints are validated together in a single batch.
+
+            endpoint_timeout: The maximum number of seconds to wait for each endpoint to
+            respond. An endpoint which takes longer raises `asyncio.TimeoutError`, or is
+            marked as failed when return_partial is True. Defaults to no timeout.
+
+            max_concurrency: The maximum number of endpoints to query at the same time.
+            Defaults to querying all endpoints concurrently.
+
+            return_partial: If True, an endpoint which fails does not raise, and its
+            entry in the returned dictionary is instead the exception it raised, with
+            the responses from all other endpoints still returned.
+
+            hedge: If True, the endpoints race against one another. The first successful
+            response is returned on its own, and the requests still in flight are
+            cancelled. Endpoints are launched in the order they were passed.
+
+            hedge_delay: When hedging, the number of seconds to wait for a response
+            before launching the request to the next endpoint. If "ttft", then the
+            benchmarked time-to-first-token of the endpoint most recently launched is
+            used instead. A failed request always launches the next one immediately.
+            Defaults to launching all endpoints at once.
 
             extra_headers: Additional "passthrough" headers for the request which are
             provider-specific, and are not part of the OpenAI standard. They are handled
@@ -257,6 +292,12 @@ class _MultiClient(_Client, abc.ABC):
         super().__init__(**self._base_constructor_args)
         self._constructor_args = dict(
             endpoints=endpoints,
+            defer_validation=defer_validation,
+            endpoint_timeout=endpoint_timeout,
+            max_concurrency=max_concurrency,
+            return_partial=return_partial,
+            hedge=hedge,
+            hedge_delay=hedge_delay,
             **self._base_constructor_args,
         )
         if isinstance(endpoints, str):
@@ -266,48 +307,159 @@ class _MultiClient(_Client, abc.ABC):
         self._api_key = _validate_api_key(api_key)
         self._endpoints = endpoints
         self._client_class = AsyncUnify
+        self._defer_validation = defer_validation
+        self._endpoint_timeout = endpoint_timeout
+        self._max_concurrency = max_concurrency
+        self._return_partial = return_partial
+        self._hedge = hedge
+        self._hedge_delay = hedge_delay
+        self._hedge_delays = None
+        self._unvalidated_endpoints = list()
+        self._validate_endpoints(endpoints)
         self._clients = self._create_clients(endpoints)
 
-    def _create_clients(self, endpoints: List[str]) -> Dict[str, AsyncUnify]:
-        return {
-            endpoint: self._client_class(
-                endpoint,
-                system_message=self.system_message,
-                messages=self.messages,
-                frequency_penalty=self.frequency_penalty,
-                logit_bias=self.logit_bias,
-                logprobs=self.logprobs,
-                top_logprobs=self.top_logprobs,
-                max_completion_tokens=self.max_completion_tokens,
-                n=self.n,
-                presence_penalty=self.presence_penalty,
-                response_format=self.response_format,
-                seed=self.seed,
-                stop=self.stop,
-                temperature=self.temperature,
-                top_p=self.top_p,
-                tools=self.tools,
-                tool_choice=self.tool_choice,
-                parallel_tool_calls=self.parallel_tool_calls,
-                # platform arguments
-                use_custom_keys=self.use_custom_keys,
-                tags=self.tags,
-                drop_params=self.drop_params,
-                region=self.region,
-                log_query_body=self.log_query_body,
-                log_response_body=self.log_response_body,
+    def _validate_endpoints(self, endpoints: List[str]) -> None:
+        if self._defer_validation:
+            self._unvalidated_endpoints += endpoints
+        else:
+            _assert_is_valid_endpoints(endpoints, api_key=self._api_key)
+
+    def _validate_pending_endpoints(self) -> None:
+        if self._unvalidated_endpoints:
+            _assert_is_valid_endpoints(
+                self._unvalidated_endpoints,
                 api_key=self._api_key,
-                # python client arguments
-                stateful=self.stateful,
-                return_full_completion=self.return_full_completion,
-                cache=self.cache,
-                # passthrough arguments
-                extra_headers=self.extra_headers,
-                extra_query=self.extra_query,
-                **self.extra_body,
             )
-            for endpoint in endpoints
-        }
+            self._unvalidated_endpoints = list()
+
+    def _create_client(self, endpoint: str) -> AsyncUnify:
+        # the endpoint is set without validation, which is done in bulk instead
+        client = self._client_class(
+            system_message=self.system_message,
+            messages=self.messages,
+            frequency_penalty=self.frequency_penalty,
+            logit_bias=self.logit_bias,
+            logprobs=self.logprobs,
+            top_logprobs=self.top_logprobs,
+            max_completion_tokens=self.max_completion_tokens,
+            n=self.n,
+            presence_penalty=self.presence_penalty,
+            response_format=self.response_format,
+            seed=self.seed,
+            stop=self.stop,
+            temperature=self.temperature,
+            top_p=self.top_p,
+            tools=self.tools,
+            tool_choice=self.tool_choice,
+            parallel_tool_calls=self.parallel_tool_calls,
+            # platform arguments
+            use_custom_keys=self.use_custom_keys,
+            tags=self.tags,
+            drop_params=self.drop_params,
+            region=self.region,
+            log_query_body=self.log_query_body,
+            log_response_body=self.log_response_body,
+            api_key=self._api_key,
+            # python client arguments
+            stateful=self.stateful,
+            return_full_completion=self.return_full_completion,
+            cache=self.cache,
+            # passthrough arguments
+            extra_headers=self.extra_headers,
+            extra_query=self.extra_query,
+            **self.extra_body,
+        )
+        client._constructor_args["endpoint"] = endpoint
+        return client._set_endpoint(endpoint)
+
+    def _create_clients(self, endpoints: List[str]) -> Dict[str, AsyncUnify]:
+        return {endpoint: self._create_client(endpoint) for endpoint in endpoints}
+
+    async def _gen_endpoint(
+        self,
+        endpoint: str,
+        kw: Dict[str, Any],
+        semaphore: Optional[asyncio.Semaphore] = None,
+    ):
+        if isinstance(kw.get("messages"), dict):
+            kw = {**kw, "messages": kw["messages"][endpoint]}
+        if semaphore is None:
+            return await asyncio.wait_for(
+                self._clients[endpoint].generate(**kw),
+                self._endpoint_timeout,
+            )
+        async with semaphore:
+            return await asyncio.wait_for(
+                self._clients[endpoint].generate(**kw),
+                self._endpoint_timeout,
+            )
+
+    async def _fan_out(self, **kw) -> Dict[str, Any]:
+        semaphore = (
+            asyncio.Semaphore(self._max_concurrency) if self._max_concurrency else None
+        )
+        tasks = [
+            asyncio.ensure_future(self._gen_endpoint(endpoint, kw, semaphore))
+            for endpoint in self._clients
+        ]
+        try:
+            results = await asyncio.gather(
+                *tasks,
+                return_exceptions=self._return_partial,
+            )
+        except BaseException:
+            # fail fast, without leaving the slower endpoints running
+            for task in tasks:
+                task.cancel()
+            raise
+        return dict(zip(self._clients.keys(), results))
+
+    def _get_hedge_delays(self) -> Dict[str, float]:
+        if self._hedge_delays is None:
+            if self._hedge_delay == "ttft":
+                # benchmarked ttft is reported in milliseconds
+                self._hedge_delays = {
+                    ep: (ttft or 0.0) / 1000 for ep, ttft in self.ttft.items()
+                }
+            else:
+                self._hedge_delays = dict.fromkeys(
+                    self._endpoints,
+                    self._hedge_delay or 0.0,
+                )
+        return self._hedge_delays
+
+    async def _race(self, **kw) -> Any:
+        if self._hedge_delay == "ttft" and self._hedge_delays is None:
+            await asyncio.get_running_loop().run_in_executor(
+                None,
+                self._get_hedge_delays,
+            )
+        delays = self._get_hedge_delays()
+        queue = list(self._clients)
+        launched = dict()
+        errors = dict()
+        try:
+            while queue or launched:
+                timeout = None
+                if queue:
+                    endpoint = queue.pop(0)
+                    task = asyncio.ensure_future(self._gen_endpoint(endpoint, kw))
+                    launched[task] = endpoint
+                    timeout = delays.get(endpoint, 0.0) if queue else None
+                done, _ = await asyncio.wait(
+                    launched,
+                    timeout=timeout,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    endpoint = launched.pop(task)
+                    if task.exception() is None:
+                        return task.result()
+                    errors[endpoint] = task.exception()
+        finally:
+            for task in launched:
+                task.cancel()
+        raise Exception(f"all hedged endpoints failed: {errors}")
 
     def add_endpoints(
         self,
@@ -342,6 +494,8 @@ class _MultiClient(_Client, abc.ABC):
                 ),
             )
         # update endpoints
+        self._validate_endpoints(endpoints)
+        self._hedge_delays = None
         self._endpoints = self._endpoints + endpoints
         # create new clients
         self._clients.update(self._create_clients(endpoints))
@@ -382,9 +536,12 @@ class _MultiClient(_Client, abc.ABC):
                 ),
             )
         # update endpoints and clients
+        self._hedge_delays = None
         for endpoint in endpoints:
             self._endpoints.remove(endpoint)
             del self._clients[endpoint]
+            if endpoint in self._unvalidated_endpoints:
+                self._unvalidated_endpoints.remove(endpoint)
         return self
 
     def get_credit_balance(self) -> Union[float, None]:
@@ -398,12 +555,8 @@ class _MultiClient(_Client, abc.ABC):
             ValueError: If there was an error parsing the JSON response.
         """
         url = f"{BASE_URL}/credits"
-        headers = {
-            "accept": "application/json",
-            "Authorization": f"Bearer {self._api_key}",
-        }
         try:
-            response = requests.get(url, headers=headers, timeout=10)
+            response = http.get(url, api_key=self._api_key, timeout=10)
             if response.status_code != 200:
                 raise Exception(response.json())
             return response.json()["credits"]
@@ -654,8 +807,8 @@ class _MultiClient(_Client, abc.ABC):
             of running the LLM query. If "write" then the cache will only be written
             to, if "read" then the cache will be read from if a cache is available but
             will not write, and if "read-only" then the argument must be present in the
-            cache, else an exception will be raised. This argument only has any effect
-            when stream=False.
+            cache, else an exception will be raised. When stream=True, the full stream is
+            recorded once consumed, and replayed chunk by chunk on future calls.
 
             extra_headers: Additional "passthrough" headers for the request which are
             provider-specific, and are not part of the OpenAI standard. They are handled
@@ -676,6 +829,7 @@ class _MultiClient(_Client, abc.ABC):
         Raises:
             UnifyError: If an error occurs during content generation.
         """
+        self._validate_pending_endpoints()
         system_message = _default(system_message, self._system_message)
         messages = _default(messages, self._messages)
         stateful = _default(stateful, self._stateful)
@@ -753,6 +907,46 @@ class _MultiClient(_Client, abc.ABC):
 
 
 class MultiUnify(_MultiClient):
+    # the event loop is started lazily, and runs in a daemon thread owned by the client
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+    _loop_thread: Optional[threading.Thread] = None
+    _loop_lock = threading.Lock()
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None or self._loop.is_closed():
+                loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(
+                    target=loop.run_forever,
+                    name=f"{self.__class__.__name__}-event-loop",
+                    daemon=True,
+                )
+                self._loop_thread.start()
+                self._loop = loop
+                weakref.finalize(self, _stop_loop, loop)
+            return self._loop
+
+    def _run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._get_loop()).result()
+
+    def close(self) -> None:
+        """
+        Stop the background event loop used to run the requests, closing its open
+        connections. The loop is restarted if the client is used again.
+        """
+        with self._loop_lock:
+            if self._loop is None:
+                return
+            loop, thread = self._loop, self._loop_thread
+            self._loop = self._loop_thread = None
+        asyncio.run_coroutine_threadsafe(
+            http.close_async_openai_clients(),
+            loop,
+        ).result()
+        _stop_loop(loop)
+        thread.join()
+        loop.close()
+
     async def _async_gen(
         self,
         messages: Optional[
@@ -819,14 +1013,10 @@ class MultiUnify(_MultiClient):
             extra_query=extra_query,
             **kwargs,
         )
-        multi_message = isinstance(kw["messages"], dict)
-        kw_ = {k: v for k, v in kw.items() if v is not None}
-        responses = dict()
-        for endpoint, client in self._clients.items():
-            these_kw = kw_.copy()
-            if multi_message:
-                these_kw["messages"] = these_kw["messages"][endpoint]
-            responses[endpoint] = await client.generate(**these_kw)
+        kw = {k: v for k, v in kw.items() if v is not None}
+        if self._hedge:
+            return await self._race(**kw)
+        responses = await self._fan_out(**kw)
         return responses[self._endpoints[0]] if len(self._endpoints) == 1 else responses
 
     async def _multi_inp_gen(
@@ -864,7 +1054,7 @@ class MultiUnify(_MultiClient):
         Perform multiple generations to multiple inputs asynchronously, based on the
         list keywords arguments passed in.
         """
-        return asyncio.run(self._multi_inp_gen(*args, **kwargs))
+        return self._run(self._multi_inp_gen(*args, **kwargs))
 
     def _generate(  # noqa: WPS234, WPS211
         self,
@@ -883,12 +1073,9 @@ class MultiUnify(_MultiClient):
             ],
         ],
     ]:
-        # refresh the openai client before doing a new event loop
-        for key, client in self._clients.items():
-            client._client = client._get_client()
         if args and isinstance(args[0], list):
             return self._multi_inp_generate(*args, **kwargs)
-        return asyncio.run(
+        return self._run(
             self._async_gen(
                 *args,
                 **kwargs,
@@ -907,6 +1094,11 @@ class MultiUnify(_MultiClient):
         return AsyncMultiUnify(**self._constructor_args)
 
 
+def _stop_loop(loop: asyncio.AbstractEventLoop) -> None:
+    if not loop.is_closed():
+        loop.call_soon_threadsafe(loop.stop)
+
+
 class AsyncMultiUnify(_MultiClient):
     async def _generate(  # noqa: WPS234, WPS211
         self,
@@ -974,15 +1166,10 @@ class AsyncMultiUnify(_MultiClient):
             extra_query=extra_query,
             **kwargs,
         )
-        multi_message = isinstance(messages, dict)
         kw = {k: v for k, v in kw.items() if v is not None}
-        responses = dict()
-        for endpoint, client in self._clients.items():
-            these_kw = kw.copy()
-            if multi_message:
-                these_kw["messages"] = these_kw["messages"][endpoint]
-            responses[endpoint] = await client.generate(**these_kw)
-        return responses
+        if self._hedge:
+            return await self._race(**kw)
+        return await self._fan_out(**kw)
 
     def to_sync_client(self):
         """
@@ -3,6 +3,7 @@ import abc
 import json
 import threading
 from typing import (
+    Any,
     AsyncGenerator,
     Dict,
     Generator,
@@ -36,12 +37,58 @@ from unify.universal_api.clients.helpers import (
     _assert_is_valid_provider,
 )
 
-from ...utils._caching import _get_cache, _get_caching, _write_to_cache
+from ...utils import http
+from ...utils._caching import (
+    _get_cache,
+    _get_cache_async,
+    _get_caching,
+    _record_stream,
+    _record_stream_async,
+    _replay_stream,
+    _replay_stream_async,
+    _write_to_cache,
+    _write_to_cache_async,
+)
 from ...utils.helpers import _default
 from ..clients.base import _Client
 from ..types import Prompt
 from ..utils.endpoint_metrics import Metrics
 
+# arguments set by the platform in the extra body of every request
+_PLATFORM_ARGS = (
+    "use_custom_keys",
+    "tags",
+    "drop_params",
+    "region",
+    "log_query_body",
+    "log_response_body",
+)
+# arguments of the requests built by `_handle_kw`
+_REQUEST_ARGS = (
+    "model",
+    "messages",
+    "frequency_penalty",
+    "logit_bias",
+    "logprobs",
+    "top_logprobs",
+    "max_completion_tokens",
+    "n",
+    "presence_penalty",
+    "response_format",
+    "seed",
+    "stop",
+    "temperature",
+    "top_p",
+    "tools",
+    "tool_choice",
+    "parallel_tool_calls",
+    "extra_headers",
+    "extra_query",
+    "extra_body",
+    "stream",
+    "stream_options",
+)
+
 
 class _UniClient(_Client, abc.ABC):
     def __init__(
@@ -223,8 +270,8 @@ class _UniClient(_Client, abc.ABC):
             of running the LLM query. If "write" then the cache will only be written
             to, if "read" then the cache will be read from if a cache is available but
             will not write, and if "read-only" then the argument must be present in the
-            cache, else an exception will be raised. This argument only has any effect
-            when stream=False.
+            cache, else an exception will be raised. When stream=True, the full stream is
+            recorded once consumed, and replayed chunk by chunk on future calls.
 
             extra_headers: Additional "passthrough" headers for the request which are
             provider-specific, and are not part of the OpenAI standard. They are handled
@@ -291,7 +338,6 @@ class _UniClient(_Client, abc.ABC):
                 "if the model or provider are passed, then the endpoint must not be"
                 "passed.",
             )
-        self._client = self._get_client()
         self._endpoint = None
         self._provider = None
         self._model = None
@@ -305,6 +351,11 @@ class _UniClient(_Client, abc.ABC):
     # Read-only Properties #
     # ---------------------#
 
+    @property
+    def _client(self):
+        # looked up on each use, as the clients are pooled per event loop
+        return self._get_client()
+
     def _get_metric(self) -> Metrics:
         return unify.get_endpoint_metrics(self._endpoint, api_key=self._api_key)[0]
 
@@ -371,6 +422,10 @@ class _UniClient(_Client, abc.ABC):
             This client, useful for chaining inplace calls.
         """
         _assert_is_valid_endpoint(value, api_key=self._api_key)
+        return self._set_endpoint(value)
+
+    def _set_endpoint(self, value: str) -> Self:
+        # assumes the endpoint has already been validated, possibly in a batch
         self._endpoint = value
         lhs = value.split("->")[0]
         if "@" in lhs:
@@ -454,6 +509,34 @@ class _UniClient(_Client, abc.ABC):
         )
         return {k: v for k, v in kw.items() if v is not None}
 
+    @staticmethod
+    def _kw_from_span(inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Rebuild the arguments of a completion the way `_handle_kw` does, from the
+        inputs recorded in its "llm" span. Spans are pruned of None values and also
+        record the arguments which were left to their defaults, so the omitted
+        arguments are dropped and the platform arguments restored.
+        """
+        omitted = (openai.NotGiven, getattr(openai, "Omit", openai.NotGiven))
+
+        def is_omitted(v: Any) -> bool:
+            # logs downloaded from the platform hold the sentinels as strings
+            return isinstance(v, omitted) or (
+                isinstance(v, str)
+                and (v == str(openai.NOT_GIVEN) or v.startswith("<openai.Omit "))
+            )
+
+        kw = {
+            k: v
+            for k, v in inputs.items()
+            if k in _REQUEST_ARGS and v is not None and not is_omitted(v)
+        }
+        kw["extra_body"] = {
+            **{k: None for k in _PLATFORM_ARGS},
+            **kw.get("extra_body", {}),
+        }
+        return kw
+
     # Representation #
     # ---------------#
 
@@ -648,8 +731,8 @@ class _UniClient(_Client, abc.ABC):
             of running the LLM query. If "write" then the cache will only be written
             to, if "read" then the cache will be read from if a cache is available but
             will not write, and if "read-only" then the argument must be present in the
-            cache, else an exception will be raised. This argument only has any effect
-            when stream=False.
+            cache, else an exception will be raised. When stream=True, the full stream is
+            recorded once consumed, and replayed chunk by chunk on future calls.
 
             extra_headers: Additional "passthrough" headers for the request which are
             provider-specific, and are not part of the OpenAI standard. They are handled
@@ -752,11 +835,7 @@ class Unify(_UniClient):
 
     def _get_client(self):
         try:
-            return openai.OpenAI(
-                base_url=f"{BASE_URL}",
-                api_key=self._api_key,
-                timeout=3600.0,  # one hour
-            )
+            return http.get_openai_client(self._api_key, f"{BASE_URL}")
         except openai.OpenAIError as e:
             raise Exception(f"Failed to initialize Unify client: {str(e)}")
 
@@ -775,6 +854,7 @@ class Unify(_UniClient):
         log_response_body: Optional[bool],
         # python client arguments
         return_full_completion: bool,
+        cache: Union[bool, str],
     ) -> Generator[str, None, None]:
         kw = self._handle_kw(
             prompt=prompt,
@@ -788,8 +868,22 @@ class Unify(_UniClient):
             log_query_body=log_query_body,
             log_response_body=log_response_body,
         )
+        chat_completion = None
+        if cache in [True, "read", "read-only"] or (
+            _get_caching() in [True, "read", "read-only"] and cache is None
+        ):
+            recording = _get_cache(fn_name="chat.completions.create", kw=kw)
+            if recording is None and "read-only" in [cache, _get_caching()]:
+                raise Exception(
+                    f"read-only cache mode, "
+                    f"but failed to load cache for arguments {json.dumps(kw, indent=4)}",
+                )
+            if recording is not None:
+                chat_completion = _replay_stream(recording)
         try:
-            if endpoint in LOCAL_MODELS:
+            if chat_completion is not None:
+                pass
+            elif endpoint in LOCAL_MODELS:
                 kw.pop("extra_body")
                 kw.pop("model")
                 kw.pop("max_completion_tokens")
@@ -807,6 +901,17 @@ class Unify(_UniClient):
                     chat_completion = self._client.chat.completions.create(**kw)
                 if unify.CLIENT_LOGGING:
                     print(f"done (thread {threading.get_ident()})")
+                if cache in [True, "write"] or (
+                    _get_caching() in [True, "write"] and cache is None
+                ):
+                    chat_completion = _record_stream(
+                        chat_completion,
+                        lambda recording: _write_to_cache(
+                            fn_name="chat.completions.create",
+                            kw=kw,
+                            response=recording,
+                        ),
+                    )
             for chunk in chat_completion:
                 if return_full_completion:
                     content = chunk
@@ -864,7 +969,11 @@ class Unify(_UniClient):
                     name=endpoint,
                 )(**kw)
             else:
-                chat_completion = _get_cache(fn_name="chat.completions.create", kw=kw)
+                chat_completion = _get_cache(
+                    fn_name="chat.completions.create",
+                    kw=kw,
+                    content_only=not return_full_completion,
+                )
             if chat_completion is None and "read-only" in [cache, _get_caching()]:
                 raise Exception(
                     f"read-only cache mode, "
@@ -904,6 +1013,9 @@ class Unify(_UniClient):
                 )
         if return_full_completion:
             return chat_completion
+        # cache hits for the content alone are returned without building the models
+        if isinstance(chat_completion, str):
+            return chat_completion.strip(" ")
         content = chat_completion.choices[0].message.content
         if content:
             return content.strip(" ")
@@ -981,6 +1093,7 @@ class Unify(_UniClient):
                 log_response_body=log_response_body,
                 # python client arguments
                 return_full_completion=return_full_completion,
+                cache=cache,
             )
         return self._generate_non_stream(
             self._endpoint,
@@ -1015,11 +1128,7 @@ class AsyncUnify(_UniClient):
 
     def _get_client(self):
         try:
-            return openai.AsyncOpenAI(
-                base_url=f"{BASE_URL}",
-                api_key=self._api_key,
-                timeout=3600.0,  # one hour
-            )
+            return http.get_async_openai_client(self._api_key, f"{BASE_URL}")
         except openai.APIStatusError as e:
             raise Exception(f"Failed to initialize Unify client: {str(e)}")
 
@@ -1038,6 +1147,7 @@ class AsyncUnify(_UniClient):
         log_response_body: Optional[bool],
         # python client arguments
         return_full_completion: bool,
+        cache: Union[bool, str],
     ) -> AsyncGenerator[str, None]:
         kw = self._handle_kw(
             prompt=prompt,
@@ -1051,8 +1161,25 @@ class AsyncUnify(_UniClient):
             log_query_body=log_query_body,
             log_response_body=log_response_body,
         )
+        async_stream = None
+        if cache in [True, "read", "read-only"] or (
+            _get_caching() in [True, "read", "read-only"] and cache is None
+        ):
+            recording = await _get_cache_async(
+                fn_name="chat.completions.create",
+                kw=kw,
+            )
+            if recording is None and "read-only" in [cache, _get_caching()]:
+                raise Exception(
+                    f"read-only cache mode, "
+                    f"but failed to load cache for arguments {json.dumps(kw, indent=4)}",
+                )
+            if recording is not None:
+                async_stream = _replay_stream_async(recording)
         try:
-            if endpoint in LOCAL_MODELS:
+            if async_stream is not None:
+                pass
+            elif endpoint in LOCAL_MODELS:
                 kw.pop("extra_body")
                 kw.pop("model")
                 kw.pop("max_completion_tokens")
@@ -1071,6 +1198,17 @@ class AsyncUnify(_UniClient):
                     async_stream = await self._client.chat.completions.create(**kw)
                 if unify.CLIENT_LOGGING:
                     print(f"done (thread {threading.get_ident()})")
+                if cache in [True, "write"] or (
+                    _get_caching() in [True, "write"] and cache is None
+                ):
+                    async_stream = _record_stream_async(
+                        async_stream,
+                        lambda recording: _write_to_cache_async(
+                            fn_name="chat.completions.create",
+                            kw=kw,
+                            response=recording,
+                        ),
+                    )
             async for chunk in async_stream:  # type: ignore[union-attr]
                 if return_full_completion:
                     yield chunk
@@ -1106,10 +1244,20 @@ class AsyncUnify(_UniClient):
             log_query_body=log_query_body,
             log_response_body=log_response_body,
         )
-        if cache is True or _get_caching() and cache is None:
-            chat_completion = _get_cache(fn_name="chat.completions.create", kw=kw)
-        else:
-            chat_completion = None
+        chat_completion = None
+        if cache in [True, "read", "read-only"] or (
+            _get_caching() in [True, "read", "read-only"] and cache is None
+        ):
+            chat_completion = await _get_cache_async(
+                fn_name="chat.completions.create",
+                kw=kw,
+                content_only=not return_full_completion,
+            )
+            if chat_completion is None and "read-only" in [cache, _get_caching()]:
+                raise Exception(
+                    f"read-only cache mode, "
+                    f"but failed to load cache for arguments {json.dumps(kw, indent=4)}",
+                )
         if chat_completion is None:
             try:
                 if endpoint in LOCAL_MODELS:
@@ -1139,14 +1287,19 @@ class AsyncUnify(_UniClient):
                         )
             except openai.APIStatusError as e:
                 raise Exception(e.message)
-            if cache is True or _get_caching() and cache is None:
-                _write_to_cache(
+            if cache in [True, "write"] or (
+                _get_caching() in [True, "write"] and cache is None
+            ):
+                await _write_to_cache_async(
                     fn_name="chat.completions.create",
                     kw=kw,
                     response=chat_completion,
                 )
         if return_full_completion:
             return chat_completion
+        # cache hits for the content alone are returned without building the models
+        if isinstance(chat_completion, str):
+            return chat_completion.strip(" ")
         content = chat_completion.choices[0].message.content
         if content:
             return content.strip(" ")
@@ -1224,6 +1377,7 @@ class AsyncUnify(_UniClient):
                 log_response_body=log_response_body,
                 # python client arguments
                 return_full_completion=return_full_completion,
+                cache=cache,
             )
         return await self._generate_non_stream(
             self._endpoint,
@@ -1,8 +1,8 @@
 from typing import Optional
 
-import requests
 from unify import BASE_URL
 
+from ...utils import http
 from ...utils.helpers import _res_to_list, _validate_api_key
 
 
@@ -20,12 +20,8 @@ def get_credits(*, api_key: Optional[str] = None) -> float:
         ValueError: If there was an HTTP error.
     """
     api_key = _validate_api_key(api_key)
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {api_key}",
-    }
     # Send GET request to the /get_credits endpoint
-    response = requests.get(BASE_URL + "/credits", headers=headers)
+    response = http.get(BASE_URL + "/credits", api_key=api_key)
     if response.status_code != 200:
         raise Exception(response.json())
     return _res_to_list(response)["credits"]
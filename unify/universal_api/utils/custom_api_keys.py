@@ -1,8 +1,8 @@
 from typing import Any, Dict, List, Optional
 
-import requests
 from unify import BASE_URL
 
+from ...utils import http
 from ...utils.helpers import _validate_api_key
 
 
@@ -26,15 +26,11 @@ def create_custom_api_key(
 
     """
     api_key = _validate_api_key(api_key)
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {api_key}",
-    }
     url = f"{BASE_URL}/custom_api_key"
 
     params = {"name": name, "value": value}
 
-    response = requests.post(url, headers=headers, params=params)
+    response = http.post(url, api_key=api_key, params=params)
     if response.status_code != 200:
         raise Exception(response.json())
 
@@ -61,14 +57,10 @@ def get_custom_api_key(
         requests.HTTPError: If the request fails.
     """
     api_key = _validate_api_key(api_key)
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {api_key}",
-    }
     url = f"{BASE_URL}/custom_api_key"
     params = {"name": name}
 
-    response = requests.get(url, headers=headers, params=params)
+    response = http.get(url, api_key=api_key, params=params)
     if response.status_code != 200:
         raise Exception(response.json())
 
@@ -96,15 +88,11 @@ def delete_custom_api_key(
         KeyError: If the API key is not found.
     """
     api_key = _validate_api_key(api_key)
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {api_key}",
-    }
     url = f"{BASE_URL}/custom_api_key"
 
     params = {"name": name}
 
-    response = requests.delete(url, headers=headers, params=params)
+    response = http.delete(url, api_key=api_key, params=params)
 
     if response.status_code == 200:
         return response.json()
@@ -138,15 +126,11 @@ def rename_custom_api_key(
         KeyError: If the API key is not provided or found in environment variables.
     """
     api_key = _validate_api_key(api_key)
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {api_key}",
-    }
     url = f"{BASE_URL}/custom_api_key/rename"
 
     params = {"name": name, "new_name": new_name}
 
-    response = requests.post(url, headers=headers, params=params)
+    response = http.post(url, api_key=api_key, params=params)
     if response.status_code != 200:
         raise Exception(response.json())
 
@@ -170,13 +154,9 @@ def list_custom_api_keys(
 
     """
     api_key = _validate_api_key(api_key)
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {api_key}",
-    }
     url = f"{BASE_URL}/custom_api_key/list"
 
-    response = requests.get(url, headers=headers)
+    response = http.get(url, api_key=api_key)
     if response.status_code != 200:
         raise Exception(response.json())
 
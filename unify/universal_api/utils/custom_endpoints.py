@@ -1,9 +1,10 @@
 from typing import Any, Dict, List, Optional
 
-import requests
 from unify import BASE_URL
 
+from ...utils import http
 from ...utils.helpers import _validate_api_key
+from .supported_endpoints import _invalidate_catalog
 
 
 def create_custom_endpoint(
@@ -35,10 +36,6 @@ def create_custom_endpoint(
         KeyError: If the UNIFY_KEY is not set and no api_key is provided.
     """
     api_key = _validate_api_key(api_key)
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {api_key}",
-    }
 
     params = {
         "name": name,
@@ -51,13 +48,14 @@ def create_custom_endpoint(
     if provider:
         params["provider"] = provider
 
-    response = requests.post(
+    response = http.post(
         f"{BASE_URL}/custom_endpoint",
-        headers=headers,
+        api_key=api_key,
         params=params,
     )
     if response.status_code != 200:
         raise Exception(response.json())
+    _invalidate_catalog(api_key)
 
     return response.json()
 
@@ -82,17 +80,14 @@ def delete_custom_endpoint(
         requests.HTTPError: If the API request fails.
     """
     api_key = _validate_api_key(api_key)
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {api_key}",
-    }
     url = f"{BASE_URL}/custom_endpoint"
 
     params = {"name": name}
 
-    response = requests.delete(url, headers=headers, params=params)
+    response = http.delete(url, api_key=api_key, params=params)
     if response.status_code != 200:
         raise Exception(response.json())
+    _invalidate_catalog(api_key)
 
     return response.json()
 
@@ -119,17 +114,14 @@ def rename_custom_endpoint(
         requests.HTTPError: If the API request fails.
     """
     api_key = _validate_api_key(api_key)
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {api_key}",
-    }
     url = f"{BASE_URL}/custom_endpoint/rename"
 
     params = {"name": name, "new_name": new_name}
 
-    response = requests.post(url, headers=headers, params=params)
+    response = http.post(url, api_key=api_key, params=params)
     if response.status_code != 200:
         raise Exception(response.json())
+    _invalidate_catalog(api_key)
 
     return response.json()
 
@@ -153,13 +145,9 @@ def list_custom_endpoints(
         requests.exceptions.RequestException: If the API request fails.
     """
     api_key = _validate_api_key(api_key)
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {api_key}",
-    }
     url = f"{BASE_URL}/custom_endpoint/list"
 
-    response = requests.get(url, headers=headers)
+    response = http.get(url, api_key=api_key)
     if response.status_code != 200:
         raise Exception(response.json())
 
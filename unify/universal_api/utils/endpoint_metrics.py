@@ -1,10 +1,10 @@
 import datetime
 from typing import Dict, List, Optional, Union
 
-import requests
 from pydantic import BaseModel
 from unify import BASE_URL
 
+from ...utils import http
 from ...utils.helpers import _validate_api_key
 
 
@@ -42,19 +42,15 @@ def get_endpoint_metrics(
         The set of metrics for the specified endpoint.
     """
     api_key = _validate_api_key(api_key)
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {api_key}",
-    }
     params = {
         "model": endpoint.split("@")[0],
         "provider": endpoint.split("@")[1],
         "start_time": start_time,
         "end_time": end_time,
     }
-    response = requests.get(
+    response = http.get(
         BASE_URL + "/endpoint-metrics",
-        headers=headers,
+        api_key=api_key,
         params=params,
     )
     if response.status_code != 200:
@@ -98,19 +94,15 @@ def log_endpoint_metric(
         `UNIFY_KEY` environment variable.
     """
     api_key = _validate_api_key(api_key)
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {api_key}",
-    }
     params = {
         "endpoint_name": endpoint_name,
         "metric_name": metric_name,
         "value": value,
         "measured_at": measured_at,
     }
-    response = requests.post(
+    response = http.post(
         BASE_URL + "/endpoint-metrics",
-        headers=headers,
+        api_key=api_key,
         params=params,
     )
     if response.status_code != 200:
@@ -125,17 +117,13 @@ def delete_endpoint_metrics(
     api_key: Optional[str] = None,
 ) -> Dict[str, str]:
     api_key = _validate_api_key(api_key)
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {api_key}",
-    }
     params = {
         "endpoint_name": endpoint_name,
         "timestamps": timestamps,
     }
-    response = requests.delete(
+    response = http.delete(
         BASE_URL + "/endpoint-metrics",
-        headers=headers,
+        api_key=api_key,
         params=params,
     )
     if response.status_code != 200:
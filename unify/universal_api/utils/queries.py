@@ -1,9 +1,9 @@
 import datetime
 from typing import Any, Dict, List, Optional, Union
 
-import requests
 from unify import BASE_URL
 
+from ...utils import http
 from ...utils.helpers import _validate_api_key
 
 
@@ -22,12 +22,8 @@ def get_query_tags(
         A list of available query tags if successful, otherwise an empty list.
     """
     api_key = _validate_api_key(api_key)
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {api_key}",
-    }
     url = f"{BASE_URL}/tags"
-    response = requests.get(url, headers=headers)
+    response = http.get(url, api_key=api_key)
     if response.status_code != 200:
         raise Exception(response.json())
 
@@ -72,10 +68,6 @@ def get_queries(
         A dictionary containing the query history data.
     """
     api_key = _validate_api_key(api_key)
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {api_key}",
-    }
 
     params = {}
     if tags:
@@ -92,7 +84,7 @@ def get_queries(
         params["failures"] = failures
 
     url = f"{BASE_URL}/queries"
-    response = requests.get(url, headers=headers, params=params)
+    response = http.get(url, api_key=api_key, params=params)
     if response.status_code != 200:
         raise Exception(response.json())
 
@@ -128,10 +120,6 @@ def log_query(
         requests.HTTPError: If the API request fails.
     """
     api_key = _validate_api_key(api_key)
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {api_key}",
-    }
 
     data = {
         "endpoint": endpoint,
@@ -146,7 +134,7 @@ def log_query(
 
     url = f"{BASE_URL}/queries"
 
-    response = requests.post(url, headers=headers, json=data)
+    response = http.post(url, api_key=api_key, json=data)
     if response.status_code != 200:
         raise Exception(response.json())
 
@@ -179,10 +167,6 @@ def get_query_metrics(
         A dictionary containing the query metrics.
     """
     api_key = _validate_api_key(api_key)
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {api_key}",
-    }
 
     params = {
         "start_time": start_time,
@@ -198,7 +182,7 @@ def get_query_metrics(
 
     url = f"{BASE_URL}/metrics"
 
-    response = requests.get(url, headers=headers, params=params)
+    response = http.get(url, api_key=api_key, params=params)
     if response.status_code != 200:
         raise Exception(response.json())
 
@@ -1,10 +1,120 @@
-from typing import List, Optional
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
 
-import requests
 from unify import BASE_URL
 
+from ...utils import _caching, http
 from ...utils.helpers import _res_to_list, _validate_api_key
 
+# Catalog Cache #
+# --------------#
+
+CATALOG_TTL = float(os.environ.get("UNIFY_CATALOG_TTL", 3600))
+CATALOG_FNAME = ".catalog.json"
+CATALOG_LOCK = threading.Lock()
+
+# maps "<api key hash>|<base url>|<route>|<filter>" to (fetch timestamp, catalog list)
+_catalog: Optional[Dict[str, Tuple[float, List[str]]]] = None
+
+
+def set_catalog_ttl(value: float) -> None:
+    """
+    Set how long (in seconds) the lists of providers, models and endpoints are cached
+    for, both in memory and in the on-disk snapshot. The snapshot is only written
+    when `UNIFY_CACHE_DIR` is set or caching is enabled. Zero disables the cache.
+
+    Args:
+        value: The time to live, in seconds.
+    """
+    global CATALOG_TTL
+    CATALOG_TTL = value
+
+
+def _catalog_fpath() -> str:
+    return os.path.join(_caching._cache_dir, CATALOG_FNAME)
+
+
+def _load_catalog() -> Dict[str, Tuple[float, List[str]]]:
+    global _catalog
+    if _catalog is None:
+        try:
+            with open(_catalog_fpath()) as infile:
+                _catalog = {k: tuple(v) for k, v in json.load(infile).items()}
+        except (OSError, ValueError):
+            _catalog = dict()
+    return _catalog
+
+
+def _save_catalog() -> None:
+    # files are only written into the user's directory once they have opted in
+    if "UNIFY_CACHE_DIR" not in os.environ and not _caching.CACHING:
+        return
+    fpath = _catalog_fpath()
+    tmp_fpath = f"{fpath}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_fpath, "w") as outfile:
+            json.dump(_catalog, outfile)
+        os.replace(tmp_fpath, fpath)
+    except OSError:
+        # the snapshot only speeds up cold starts, so a read-only dir is fine
+        pass
+
+
+def _catalog_key(api_key: str, route: str, params: Optional[Dict[str, str]]) -> str:
+    key_hash = hashlib.sha256(api_key.encode()).hexdigest()[:16]
+    param_str = ",".join(f"{k}={v}" for k, v in sorted((params or {}).items()))
+    # deployments behind different base urls have different catalogs
+    return f"{key_hash}|{BASE_URL}|{route}|{param_str}"
+
+
+def _get_catalog(
+    route: str,
+    params: Optional[Dict[str, str]],
+    api_key: str,
+) -> List[str]:
+    key = _catalog_key(api_key, route, params)
+    with CATALOG_LOCK:
+        entry = _load_catalog().get(key)
+    if entry is not None and time.time() - entry[0] < CATALOG_TTL:
+        return list(entry[1])
+    response = http.get(f"{BASE_URL}/{route}", api_key=api_key, params=params)
+    if response.status_code != 200:
+        raise Exception(response.json())
+    ret = _res_to_list(response)
+    if CATALOG_TTL > 0:
+        with CATALOG_LOCK:
+            _load_catalog()[key] = (time.time(), ret)
+            _save_catalog()
+    return list(ret)
+
+
+def _invalidate_catalog(api_key: str) -> None:
+    key_hash = hashlib.sha256(api_key.encode()).hexdigest()[:16]
+    with CATALOG_LOCK:
+        catalog = _load_catalog()
+        for key in [k for k in catalog if k.startswith(key_hash + "|")]:
+            del catalog[key]
+        _save_catalog()
+
+
+def refresh_catalog(*, api_key: Optional[str] = None) -> None:
+    """
+    Discard the cached lists of providers, models and endpoints, both in memory and
+    on disk, and re-fetch the full lists from the server.
+
+    Args:
+        api_key: If specified, unify API key to be used. Defaults to the value in the
+        `UNIFY_KEY` environment variable.
+    """
+    api_key = _validate_api_key(api_key)
+    _invalidate_catalog(api_key)
+    for route in ("providers", "models", "endpoints"):
+        _get_catalog(route, None, api_key)
+
 
 def list_providers(
     model: Optional[str] = None,
@@ -27,19 +137,7 @@ def list_providers(
         ValueError: If there was an error parsing the JSON response.
     """
     api_key = _validate_api_key(api_key)
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {api_key}",
-    }
-    url = f"{BASE_URL}/providers"
-    if model:
-        kw = dict(headers=headers, params={"model": model})
-    else:
-        kw = dict(headers=headers)
-    response = requests.get(url, **kw)
-    if response.status_code != 200:
-        raise Exception(response.json())
-    return _res_to_list(response)
+    return _get_catalog("providers", {"model": model} if model else None, api_key)
 
 
 def list_models(
@@ -62,19 +160,7 @@ def list_models(
         ValueError: If there was an error parsing the JSON response.
     """
     api_key = _validate_api_key(api_key)
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {api_key}",
-    }
-    url = f"{BASE_URL}/models"
-    if provider:
-        kw = dict(headers=headers, params={"provider": provider})
-    else:
-        kw = dict(headers=headers)
-    response = requests.get(url, **kw)
-    if response.status_code != 200:
-        raise Exception(response.json())
-    return _res_to_list(response)
+    return _get_catalog("models", {"provider": provider} if provider else None, api_key)
 
 
 def list_endpoints(
@@ -101,21 +187,12 @@ def list_endpoints(
         ValueError: If there was an error parsing the JSON response.
     """
     api_key = _validate_api_key(api_key)
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {api_key}",
-    }
-    url = f"{BASE_URL}/endpoints"
     if model and provider:
         raise ValueError("Please specify either model OR provider, not both.")
     elif model:
-        kw = dict(headers=headers, params={"model": model})
-        return _res_to_list(requests.get(url, headers=headers, params={"model": model}))
+        params = {"model": model}
     elif provider:
-        kw = dict(headers=headers, params={"provider": provider})
+        params = {"provider": provider}
     else:
-        kw = dict(headers=headers)
-    response = requests.get(url, **kw)
-    if response.status_code != 200:
-        raise Exception(response.json())
-    return _res_to_list(response)
+        params = None
+    return _get_catalog("endpoints", params, api_key)
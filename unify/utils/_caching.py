@@ -1,22 +1,394 @@
+import abc
+import asyncio
+import contextlib
+import gzip
+import hashlib
 import inspect
 import json
 import os
+import sqlite3
 import threading
-from typing import Any, Dict, List, Optional, Union
+import time
+import weakref
+from collections import OrderedDict
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterable,
+    Awaitable,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
 
-from openai.types.chat import ChatCompletion, ParsedChatCompletion
+from openai.types.chat import (
+    ChatCompletion,
+    ChatCompletionChunk,
+    ParsedChatCompletion,
+)
 from pydantic import BaseModel
 
-_cache: Optional[Dict] = None
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - windows
+    fcntl = None
+
+# maps each store file path to its open backend
+_cache: Optional[Dict[str, "CacheBackend"]] = None
 _cache_dir = (
     os.environ["UNIFY_CACHE_DIR"] if "UNIFY_CACHE_DIR" in os.environ else os.getcwd()
 )
-_cache_fpath: str = os.path.join(_cache_dir, ".cache.json")
+_cache_fpath: str = os.path.join(_cache_dir, ".cache.db")
 
 CACHE_LOCK = threading.Lock()
 
 CACHING = False
-CACHE_FNAME = ".cache.json"
+CACHE_FNAME = ".cache.db"
+CACHE_DEBUG = os.environ.get("UNIFY_CACHE_DEBUG", "false").lower() == "true"
+CACHE_MAX_ENTRIES = int(os.environ.get("UNIFY_CACHE_MAX_ENTRIES", 4096))
+CACHE_MAX_BYTES = int(os.environ.get("UNIFY_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+# seconds a write waits for other processes to release the store
+CACHE_TIMEOUT = float(os.environ.get("UNIFY_CACHE_TIMEOUT", 60))
+STREAM_REPLAY_TIMING = False
+# seconds a cached response stays valid for, None meaning forever
+CACHE_TTL = (
+    float(os.environ["UNIFY_CACHE_TTL"]) if "UNIFY_CACHE_TTL" in os.environ else None
+)
+# ttls overriding CACHE_TTL, keyed by endpoint or by model
+_endpoint_ttls: Dict[str, Optional[float]] = dict()
+
+
+# Backends #
+# ---------#
+
+
+# value, res_types, created_at, endpoint
+Entry = Tuple[str, Optional[str], Optional[float], Optional[str]]
+# key, value, res_types, canonical, created_at, endpoint
+Item = Tuple[str, str, Optional[str], Optional[str], Optional[float], Optional[str]]
+
+
+class CacheBackend(abc.ABC):
+    """
+    Persistent key-value store for cached responses. Each value is the serialized
+    response, alongside the optional json-encoded `_res_types` index recording which
+    parts of the response should be rebuilt as pydantic models or logs, the
+    canonical form of the hashed arguments when debugging is enabled, the time the
+    entry was written and the endpoint which produced it, if any.
+    """
+
+    def __init__(self, fpath: str):
+        self._fpath = fpath
+
+    @abc.abstractmethod
+    def get(self, key: str) -> Optional[Entry]:
+        raise NotImplementedError
+
+    def set(
+        self,
+        key: str,
+        value: str,
+        res_types: Optional[str] = None,
+        canonical: Optional[str] = None,
+        created_at: Optional[float] = None,
+        endpoint: Optional[str] = None,
+    ) -> None:
+        self.set_many([(key, value, res_types, canonical, created_at, endpoint)])
+
+    @abc.abstractmethod
+    def set_many(self, items: List[Item]) -> None:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def items(self) -> Iterator[Item]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def metadata(self) -> Iterator[Tuple[str, int, Optional[float], Optional[str]]]:
+        """Yield the key, size in bytes, creation time and endpoint of each entry."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def delete(self, keys: List[str]) -> None:
+        raise NotImplementedError
+
+    def vacuum(self) -> None:
+        """Give the space freed by deleted entries back to the file system."""
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    Indexed SQLite store in WAL mode, so that lookups and inserts do not depend on
+    the size of the cache and readers never block one another.
+    """
+
+    def __init__(self, fpath: str):
+        super().__init__(fpath)
+        # one connection per thread, as sqlite connections are not thread-safe
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: Set[sqlite3.Connection] = set()
+        connection = self._connect()
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, res_types TEXT, "
+                "canonical TEXT, created_at REAL, endpoint TEXT)",
+            )
+            columns = [row[1] for row in connection.execute("PRAGMA table_info(cache)")]
+            if "created_at" not in columns:
+                # stores written before timestamps were kept count as written now
+                connection.execute("ALTER TABLE cache ADD COLUMN created_at REAL")
+                connection.execute("ALTER TABLE cache ADD COLUMN endpoint TEXT")
+                connection.execute("UPDATE cache SET created_at = ?", (time.time(),))
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS cache_created_at ON cache (created_at)",
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            # each connection is only used by its own thread, but can be closed by any
+            connection = sqlite3.connect(
+                self._fpath,
+                timeout=CACHE_TIMEOUT,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            with self._lock:
+                self._connections.add(connection)
+            # worker threads come and go with every map, so close their connections
+            # when they exit rather than holding them open until close()
+            weakref.finalize(
+                threading.current_thread(),
+                self._close_connection,
+                connection,
+            )
+        return connection
+
+    def _close_connection(self, connection: sqlite3.Connection) -> None:
+        with self._lock:
+            self._connections.discard(connection)
+        connection.close()
+
+    def get(self, key: str) -> Optional[Entry]:
+        return (
+            self._connect()
+            .execute(
+                "SELECT value, res_types, created_at, endpoint FROM cache "
+                "WHERE key = ?",
+                (key,),
+            )
+            .fetchone()
+        )
+
+    def set_many(self, items: List[Item]) -> None:
+        connection = self._connect()
+        with connection:
+            # take the write lock up front, rather than failing to upgrade a read lock
+            connection.execute("BEGIN IMMEDIATE")
+            connection.executemany(
+                "INSERT OR REPLACE INTO cache "
+                "(key, value, res_types, canonical, created_at, endpoint) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                items,
+            )
+
+    def items(self) -> Iterator[Item]:
+        yield from self._connect().execute(
+            "SELECT key, value, res_types, canonical, created_at, endpoint FROM cache",
+        )
+
+    def metadata(self) -> Iterator[Tuple[str, int, Optional[float], Optional[str]]]:
+        yield from self._connect().execute(
+            "SELECT key, length(CAST(value AS BLOB)) "
+            "+ coalesce(length(CAST(res_types AS BLOB)), 0), created_at, endpoint "
+            "FROM cache",
+        )
+
+    def delete(self, keys: List[str]) -> None:
+        connection = self._connect()
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.executemany(
+                "DELETE FROM cache WHERE key = ?",
+                [(key,) for key in keys],
+            )
+
+    def vacuum(self) -> None:
+        connection = self._connect()
+        connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        connection.execute("VACUUM")
+
+    def close(self) -> None:
+        with self._lock:
+            connections, self._connections = self._connections, set()
+        for connection in connections:
+            connection.close()
+        self._local = threading.local()
+
+
+_backend_cls: Type[CacheBackend] = SQLiteCacheBackend
+
+
+# Memory Tier #
+# ------------#
+
+
+class _MemoryCache:
+    """
+    Bounded LRU of recently used entries, kept in front of the persistent stores and
+    limited both by the number of entries and by their total size in bytes.
+    """
+
+    def __init__(self):
+        self._entries: OrderedDict = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _sizeof(entry: Entry) -> int:
+        return len(entry[0]) + len(entry[1] or "")
+
+    def get(self, fpath: str, key: str) -> Optional[Entry]:
+        with self._lock:
+            entry = self._entries.get((fpath, key))
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((fpath, key))
+            self.hits += 1
+            return entry
+
+    def set(self, fpath: str, key: str, entry: Entry) -> None:
+        nbytes = self._sizeof(entry)
+        if nbytes > CACHE_MAX_BYTES:
+            return
+        with self._lock:
+            previous = self._entries.pop((fpath, key), None)
+            if previous is not None:
+                self._nbytes -= self._sizeof(previous)
+            self._entries[(fpath, key)] = entry
+            self._nbytes += nbytes
+            self._evict()
+
+    def _evict(self) -> None:
+        while self._entries and (
+            len(self._entries) > CACHE_MAX_ENTRIES or self._nbytes > CACHE_MAX_BYTES
+        ):
+            _, entry = self._entries.popitem(last=False)
+            self._nbytes -= self._sizeof(entry)
+            self.evictions += 1
+
+    def discard(self, fpath: Optional[str] = None) -> None:
+        with self._lock:
+            if fpath is None:
+                self._entries.clear()
+                self._nbytes = 0
+                return
+            for key in [k for k in self._entries if k[0] == fpath]:
+                self._nbytes -= self._sizeof(self._entries.pop(key))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(
+                hits=self.hits,
+                misses=self.misses,
+                evictions=self.evictions,
+                entries=len(self._entries),
+                bytes=self._nbytes,
+            )
+
+
+_memory = _MemoryCache()
+
+# lookups which missed the memory tier, split by whether the store had them
+_store_hits = 0
+_store_misses = 0
+
+
+def set_cache_size(
+    max_entries: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+) -> None:
+    """
+    Set the bounds of the in-memory tier of the cache, which holds the most recently
+    used responses in front of the persistent store.
+
+    Args:
+        max_entries: The maximum number of responses to hold in memory.
+
+        max_bytes: The maximum total size of the responses held in memory.
+    """
+    global CACHE_MAX_ENTRIES, CACHE_MAX_BYTES
+    if max_entries is not None:
+        CACHE_MAX_ENTRIES = max_entries
+    if max_bytes is not None:
+        CACHE_MAX_BYTES = max_bytes
+    with _memory._lock:
+        _memory._evict()
+
+
+def cache_stats() -> Dict[str, int]:
+    """
+    Get the hit, miss and eviction counters of the cache since the process started.
+
+    Returns:
+        A dict with the hits and misses of the in-memory tier, the hits and misses of
+        the persistent store on lookups which missed the memory tier, the number of
+        evictions from memory, and the current number and total bytes of the entries
+        held in memory.
+    """
+    stats = _memory.stats()
+    return dict(
+        memory_hits=stats["hits"],
+        memory_misses=stats["misses"],
+        store_hits=_store_hits,
+        store_misses=_store_misses,
+        evictions=stats["evictions"],
+        entries=stats["entries"],
+        bytes=stats["bytes"],
+    )
+
+
+def set_cache_backend(backend_cls: Type[CacheBackend]) -> None:
+    """
+    Set the class used to store cached responses. Any open stores are closed, and are
+    re-opened lazily with the new backend.
+
+    Args:
+        backend_cls: A `CacheBackend` subclass, constructed with the store file path.
+    """
+    global _backend_cls
+    _backend_cls = backend_cls
+    _close_cache()
+
+
+def _close_cache() -> None:
+    global _cache
+    with CACHE_LOCK:
+        backends, _cache = _cache, None
+    for backend in (backends or dict()).values():
+        backend.close()
+    _memory.discard()
 
 
 def set_caching(value: bool) -> None:
@@ -25,11 +397,83 @@ def set_caching(value: bool) -> None:
 
 
 def set_caching_fname(value: Optional[str] = None) -> None:
-    global CACHE_FNAME
+    global CACHE_FNAME, _cache_fpath
     if value is not None:
         CACHE_FNAME = value
     else:
-        CACHE_FNAME = ".cache.json"
+        CACHE_FNAME = ".cache.db"
+    _cache_fpath = os.path.join(_cache_dir, CACHE_FNAME)
+
+
+def set_cache_debug(value: bool) -> None:
+    """
+    Set whether the canonical form of the arguments behind each cache key is stored
+    alongside the cached response, to help debug unexpected cache misses. Keys are
+    otherwise stored only as digests.
+
+    Args:
+        value: Whether to store the canonical arguments.
+    """
+    global CACHE_DEBUG
+    CACHE_DEBUG = value
+
+
+def set_cache_ttl(ttl: Optional[float], endpoint: Optional[str] = None) -> None:
+    """
+    Set how long cached responses stay valid for. Older responses are treated as
+    cache misses, and are removed from the store by `unify.cache.compact`.
+
+    Args:
+        ttl: The number of seconds a response stays valid for, or None for forever.
+
+        endpoint: The endpoint (such as "gpt-4o@openai") or model (such as "gpt-4o")
+        to set the ttl for, overriding the ttl set for all other responses. Setting
+        the ttl to None again removes the override. Defaults to all responses.
+    """
+    global CACHE_TTL
+    if endpoint is None:
+        CACHE_TTL = ttl
+    elif ttl is None:
+        _endpoint_ttls.pop(endpoint, None)
+    else:
+        _endpoint_ttls[endpoint] = ttl
+
+
+def _get_ttl(endpoint: Optional[str]) -> Optional[float]:
+    if endpoint is not None:
+        for name in (endpoint, endpoint.split("@")[0]):
+            if name in _endpoint_ttls:
+                return _endpoint_ttls[name]
+    return CACHE_TTL
+
+
+def _is_expired(
+    created_at: Optional[float],
+    endpoint: Optional[str],
+    now: Optional[float] = None,
+) -> bool:
+    ttl = _get_ttl(endpoint)
+    if ttl is None or created_at is None:
+        return False
+    return (time.time() if now is None else now) - created_at > ttl
+
+
+def _get_endpoint(kw: Dict[str, Any]) -> Optional[str]:
+    # chat completions are keyed by the endpoint they were sent to
+    endpoint = kw.get("model")
+    return endpoint if isinstance(endpoint, str) else None
+
+
+def set_stream_replay_timing(value: bool) -> None:
+    """
+    Set whether cached streams are replayed with the delays recorded between the
+    original chunks, rather than as fast as possible.
+
+    Args:
+        value: Whether to replay the original timing.
+    """
+    global STREAM_REPLAY_TIMING
+    STREAM_REPLAY_TIMING = value
 
 
 def _get_caching():
@@ -40,72 +484,260 @@ def _get_caching_fname():
     return CACHE_FNAME
 
 
-def _create_cache_if_none(filename: str = None):
-    global _cache, _cache_fpath, _cache_dir
+def _get_cache_fpath(filename: Optional[str] = None) -> str:
     if filename is None:
-        cache_fpath = _cache_fpath
+        return _cache_fpath
+    return os.path.join(_cache_dir, filename)
+
+
+def _create_cache_if_none(filename: str = None) -> CacheBackend:
+    global _cache
+    cache_fpath = _get_cache_fpath(filename)
+    backend = (_cache or dict()).get(cache_fpath)
+    # re-open the store if the file has been removed from under us
+    if backend is not None and os.path.exists(cache_fpath):
+        return backend
+    # the file lock stops concurrent processes from racing to create or migrate
+    with CACHE_LOCK, _file_lock(cache_fpath + ".lock"):
+        if _cache is None:
+            _cache = dict()
+        if cache_fpath in _cache:
+            stale = _cache.pop(cache_fpath)
+        else:
+            stale = None
+        legacy_fpath = os.path.splitext(cache_fpath)[0] + ".json"
+        if _is_json_cache(cache_fpath):
+            # a json cache selected by name, which is moved aside and migrated
+            legacy_fpath = cache_fpath + ".bak"
+            os.replace(cache_fpath, legacy_fpath)
+        migrate = not os.path.exists(cache_fpath) and os.path.exists(legacy_fpath)
+        backend = _backend_cls(cache_fpath)
+        _cache[cache_fpath] = backend
+        _memory.discard(cache_fpath)
+        if migrate:
+            _migrate_json_cache(legacy_fpath, backend)
+    if stale is not None:
+        stale.close()
+    return backend
+
+
+@contextlib.contextmanager
+def _file_lock(fpath: str):
+    if fcntl is None:
+        yield
+        return
+    with open(fpath, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+# stores inherited over a fork, which the child must neither use nor close
+_forked_backends: List[CacheBackend] = list()
+
+
+def _reset_cache_after_fork() -> None:
+    global _cache, CACHE_LOCK
+    CACHE_LOCK = threading.Lock()
+    _memory._lock = threading.Lock()
+    if _cache is not None:
+        _forked_backends.extend(_cache.values())
+        _cache = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_cache_after_fork)
+
+
+def _is_json_cache(fpath: str) -> bool:
+    if not os.path.exists(fpath):
+        return False
+    with open(fpath, "rb") as infile:
+        return infile.read(1) == b"{"
+
+
+def _migrate_json_cache(json_fpath: str, backend: CacheBackend) -> int:
+    with open(json_fpath) as infile:
+        legacy = json.load(infile)
+    items = list()
+    # legacy caches kept no timestamps, so their entries count as written now
+    now = time.time()
+    for legacy_key, value in legacy.items():
+        if legacy_key.endswith("_res_types"):
+            continue
+        # legacy keys are the function name followed by the json-encoded arguments
+        fn_name, kw_str = legacy_key.split("_{", 1)
+        key, canonical = _cache_key(fn_name, json.loads("{" + kw_str))
+        res_types = legacy.get(legacy_key + "_res_types")
+        items.append(
+            (
+                key,
+                value,
+                None if res_types is None else json.dumps(res_types),
+                canonical,
+                now,
+                _get_endpoint(json.loads("{" + kw_str)),
+            ),
+        )
+    backend.set_many(items)
+    return len(items)
+
+
+def migrate_json_cache(json_fpath: str, filename: Optional[str] = None) -> int:
+    """
+    Copy every entry of a legacy `.cache.json` file into the cache store. This is
+    done automatically the first time a store is created next to a json cache of the
+    same name, so is only needed for json caches stored elsewhere.
+
+    Args:
+        json_fpath: Path to the legacy json cache file.
+
+        filename: Name of the store file within the cache directory to copy into.
+        Defaults to the file set via `set_caching_fname`.
+
+    Returns:
+        The number of entries migrated.
+    """
+    return _migrate_json_cache(json_fpath, _create_cache_if_none(filename))
+
+
+def _count_store_lookup(hit: bool) -> None:
+    global _store_hits, _store_misses
+    # only approximate under contention, which is fine for counters
+    if hit:
+        _store_hits += 1
     else:
-        cache_fpath = os.path.join(_cache_dir, filename)
-    if _cache is None:
-        if not os.path.exists(cache_fpath):
-            with open(cache_fpath, "w") as outfile:
-                json.dump({}, outfile)
-        with open(cache_fpath) as outfile:
-            _cache = json.load(outfile)
+        _store_misses += 1
+
+
+def _fresh(entry: Optional[Entry]) -> Optional[Entry]:
+    if entry is None or _is_expired(entry[2], entry[3]):
+        return None
+    return entry
+
+
+def _load_entry(
+    cache_str: str,
+    filename: Optional[str] = None,
+    check_memory: bool = True,
+) -> Optional[Entry]:
+    backend = _create_cache_if_none(filename)
+    cache_fpath = _get_cache_fpath(filename)
+    entry = _memory.get(cache_fpath, cache_str) if check_memory else None
+    if entry is None:
+        entry = backend.get(cache_str)
+        _count_store_lookup(entry is not None)
+        if entry is None:
+            return
+        entry = tuple(entry)
+        _memory.set(cache_fpath, cache_str, entry)
+    return _fresh(entry)
 
 
 # noinspection PyTypeChecker,PyUnboundLocalVariable
-def _get_cache(fn_name: str, kw: Dict[str, Any], filename: str = None) -> Optional[Any]:
-    global CACHE_LOCK
+def _decode_entry(entry: Entry) -> Any:
     # prevents circular import
     from unify.logging.logs import Log
 
     type_str_to_type = {
         "ChatCompletion": ChatCompletion,
+        "ChatCompletionChunk": ChatCompletionChunk,
         "Log": Log,
         "ParsedChatCompletion": ParsedChatCompletion,
     }
-    CACHE_LOCK.acquire()
-    # noinspection PyBroadException
-    try:
-        _create_cache_if_none(filename)
-        kw = {k: v for k, v in kw.items() if v is not None}
-        kw_str = _dumps(kw)
-        cache_str = fn_name + "_" + kw_str
-        if cache_str not in _cache:
-            CACHE_LOCK.release()
-            return
-        ret = json.loads(_cache[cache_str])
-        if cache_str + "_res_types" not in _cache:
-            CACHE_LOCK.release()
-            return ret
-        for idx_str, type_str in _cache[cache_str + "_res_types"].items():
-            type_str = type_str.split("[")[0]
-            idx_list = json.loads(idx_str)
-            if len(idx_list) == 0:
-                CACHE_LOCK.release()
+    ret = json.loads(entry[0])
+    if entry[1] is None:
+        return ret
+    for idx_str, type_str in json.loads(entry[1]).items():
+        type_str = type_str.split("[")[0]
+        idx_list = json.loads(idx_str)
+        if len(idx_list) == 0:
+            typ = type_str_to_type[type_str]
+            if issubclass(typ, BaseModel):
+                return type_str_to_type[type_str](**ret)
+            elif issubclass(typ, Log):
+                return type_str_to_type[type_str].from_json(ret)
+            raise Exception(f"Cache indexing found for unsupported type: {typ}")
+        item = ret
+        for i, idx in enumerate(idx_list):
+            if i == len(idx_list) - 1:
                 typ = type_str_to_type[type_str]
                 if issubclass(typ, BaseModel):
-                    return type_str_to_type[type_str](**ret)
+                    item[idx] = typ(**item[idx])
                 elif issubclass(typ, Log):
-                    return type_str_to_type[type_str].from_json(ret)
-                raise Exception(f"Cache indexing found for unsupported type: {typ}")
-            item = ret
-            for i, idx in enumerate(idx_list):
-                if i == len(idx_list) - 1:
-                    typ = type_str_to_type[type_str]
-                    if issubclass(typ, BaseModel) or issubclass(typ, Log):
-                        item[idx] = type_str_to_type[type_str].from_json(item[idx])
-                    else:
-                        raise Exception(
-                            f"Cache indexing found for unsupported type: {typ}",
-                        )
-                    break
-                item = item[idx]
-        CACHE_LOCK.release()
-        return ret
+                    item[idx] = typ.from_json(item[idx])
+                else:
+                    raise Exception(
+                        f"Cache indexing found for unsupported type: {typ}",
+                    )
+                break
+            item = item[idx]
+    return ret
+
+
+def _decode_content(entry: Entry) -> str:
+    # completions are read straight from the json, without building the models
+    if entry[1] is not None:
+        type_str = json.loads(entry[1]).get("[]", "").split("[")[0]
+        if type_str in ("ChatCompletion", "ParsedChatCompletion"):
+            content = json.loads(entry[0])["choices"][0]["message"]["content"]
+            return content or ""
+    return _decode_entry(entry).choices[0].message.content or ""
+
+
+def _get_cache(
+    fn_name: str,
+    kw: Dict[str, Any],
+    filename: str = None,
+    content_only: bool = False,
+    cache_key: Optional[Tuple[str, Optional[str]]] = None,
+) -> Optional[Any]:
+    # noinspection PyBroadException
+    try:
+        kw = {k: v for k, v in kw.items() if v is not None}
+        cache_str, _ = cache_key or _cache_key(fn_name, kw)
+        entry = _load_entry(cache_str, filename)
+        if entry is None:
+            return None
+        return _decode_content(entry) if content_only else _decode_entry(entry)
+    except:
+        raise Exception(
+            f"Failed to get cache for function {fn_name} with kwargs {kw} "
+            f"from cache at {filename}",
+        )
+
+
+async def _get_cache_async(
+    fn_name: str,
+    kw: Dict[str, Any],
+    filename: str = None,
+    content_only: bool = False,
+    cache_key: Optional[Tuple[str, Optional[str]]] = None,
+) -> Optional[Any]:
+    # noinspection PyBroadException
+    try:
+        kw = {k: v for k, v in kw.items() if v is not None}
+        cache_str, _ = cache_key or _cache_key(fn_name, kw)
+        cache_fpath = _get_cache_fpath(filename)
+        # memory hits for an open store are served on the loop, all file IO is not
+        memory_checked = cache_fpath in (_cache or dict())
+        entry = _memory.get(cache_fpath, cache_str) if memory_checked else None
+        if entry is not None:
+            entry = _fresh(entry)
+        else:
+            # the memory tier is not looked up twice, so misses are counted once
+            entry = await asyncio.to_thread(
+                _load_entry,
+                cache_str,
+                filename,
+                not memory_checked,
+            )
+        if entry is None:
+            return None
+        return _decode_content(entry) if content_only else _decode_entry(entry)
     except:
-        CACHE_LOCK.release()
         raise Exception(
             f"Failed to get cache for function {fn_name} with kwargs {kw} "
             f"from cache at {filename}",
@@ -135,7 +767,7 @@ def _dumps(
             cached_types[json.dumps(idx)] = obj.__class__.__name__
         ret = obj.to_json()
     elif isinstance(obj, dict):
-        ret = {k: _dumps(v, cached_types, idx + ["k"]) for k, v in obj.items()}
+        ret = {k: _dumps(v, cached_types, idx + [k]) for k, v in obj.items()}
     elif isinstance(obj, list):
         ret = [_dumps(v, cached_types, idx + [i]) for i, v in enumerate(obj)]
     elif isinstance(obj, tuple):
@@ -145,36 +777,348 @@ def _dumps(
     return json.dumps(ret) if base else ret
 
 
+def _cache_key(
+    fn_name: str,
+    kw: Dict[str, Any],
+    volatile: Optional[Dict[str, Any]] = None,
+) -> Tuple[str, Optional[str]]:
+    """
+    Hash the canonical json form of the arguments (sorted keys, compact separators,
+    integral floats as ints) piece by piece, without building a copy of them. Fields
+    in `volatile` are left out of the key: each maps to None to be skipped, to a
+    dict of the volatile fields within it, or to a list holding the volatile fields
+    of each of its elements. The canonical form is only returned when debugging.
+    """
+    # prevents circular import
+    from unify.logging.logs import Log
+
+    hasher = hashlib.blake2b(digest_size=16)
+    pieces = list() if CACHE_DEBUG else None
+
+    def write(piece: str) -> None:
+        hasher.update(piece.encode())
+        if pieces is not None:
+            pieces.append(piece)
+
+    def walk(obj: Any, mask: Any) -> None:
+        if isinstance(obj, BaseModel):
+            obj = obj.model_dump()
+        elif inspect.isclass(obj) and issubclass(obj, BaseModel):
+            obj = obj.schema_json()
+        elif isinstance(obj, Log):
+            obj = obj.to_json()
+        if isinstance(obj, dict):
+            mask = mask if isinstance(mask, dict) else dict()
+            separator = "{"
+            for k, v in sorted(((str(k), v) for k, v in obj.items()), key=_first):
+                if k in mask and mask[k] is None:
+                    continue
+                write(separator + json.dumps(k, ensure_ascii=False) + ":")
+                walk(v, mask.get(k))
+                separator = ","
+            write("}" if separator == "," else "{}")
+        elif isinstance(obj, (list, tuple)):
+            mask = mask[0] if isinstance(mask, list) else None
+            separator = "["
+            for v in obj:
+                write(separator)
+                walk(v, mask)
+                separator = ","
+            write("]" if separator == "," else "[]")
+        elif isinstance(obj, float) and obj.is_integer():
+            # 1.0 and 1 make for the same request, and so the same key
+            write(str(int(obj)))
+        else:
+            write(json.dumps(obj, ensure_ascii=False))
+
+    walk({k: v for k, v in kw.items() if v is not None}, volatile)
+    canonical = None if pieces is None else "".join(pieces)
+    return fn_name + "_" + hasher.hexdigest(), canonical
+
+
+def _first(item: Tuple[str, Any]) -> str:
+    return item[0]
+
+
 # noinspection PyTypeChecker,PyUnresolvedReferences
 def _write_to_cache(
     fn_name: str,
     kw: Dict[str, Any],
     response: Any,
     filename: str = None,
+    cache_key: Optional[Tuple[str, Optional[str]]] = None,
 ):
-    global CACHE_LOCK
-    CACHE_LOCK.acquire()
     # noinspection PyBroadException
     try:
-        _create_cache_if_none(filename)
+        backend = _create_cache_if_none(filename)
         kw = {k: v for k, v in kw.items() if v is not None}
-        kw_str = _dumps(kw)
-        cache_str = fn_name + "_" + kw_str
+        cache_str, canonical = cache_key or _cache_key(fn_name, kw)
         _res_types = {}
         response_str = _dumps(response, _res_types)
-        if _res_types:
-            _cache[cache_str + "_res_types"] = _res_types
-        _cache[cache_str] = response_str
-        if filename is None:
-            cache_fpath = _cache_fpath
-        else:
-            cache_fpath = os.path.join(_cache_dir, filename)
-        with open(cache_fpath, "w") as outfile:
-            json.dump(_cache, outfile)
-        CACHE_LOCK.release()
+        res_types_str = json.dumps(_res_types) if _res_types else None
+        created_at, endpoint = time.time(), _get_endpoint(kw)
+        backend.set(
+            cache_str,
+            response_str,
+            res_types_str,
+            canonical,
+            created_at,
+            endpoint,
+        )
+        _memory.set(
+            _get_cache_fpath(filename),
+            cache_str,
+            (response_str, res_types_str, created_at, endpoint),
+        )
     except:
-        CACHE_LOCK.release()
         raise Exception(
             f"Failed to write function {fn_name} with kwargs {kw} and "
             f"response {response} to cache at {filename}",
         )
+
+
+async def _write_to_cache_async(
+    fn_name: str,
+    kw: Dict[str, Any],
+    response: Any,
+    filename: str = None,
+):
+    await asyncio.to_thread(_write_to_cache, fn_name, kw, response, filename)
+
+
+# Streams #
+# --------#
+
+
+def _record_stream(
+    stream: Iterable[Any],
+    on_complete: Callable[[Dict[str, List]], None],
+) -> Generator[Any, None, None]:
+    chunks, delays = list(), list()
+    last = time.perf_counter()
+    for chunk in stream:
+        now = time.perf_counter()
+        delays.append(now - last)
+        last = now
+        chunks.append(chunk)
+        yield chunk
+    # only streams which were consumed in full are recorded
+    on_complete(dict(chunks=chunks, delays=delays))
+
+
+async def _record_stream_async(
+    stream: AsyncIterable[Any],
+    on_complete: Callable[[Dict[str, List]], Awaitable[None]],
+) -> AsyncGenerator[Any, None]:
+    chunks, delays = list(), list()
+    last = time.perf_counter()
+    async for chunk in stream:
+        now = time.perf_counter()
+        delays.append(now - last)
+        last = now
+        chunks.append(chunk)
+        yield chunk
+    await on_complete(dict(chunks=chunks, delays=delays))
+
+
+def _replay_stream(recording: Dict[str, List]) -> Generator[Any, None, None]:
+    for chunk, delay in zip(recording["chunks"], recording["delays"]):
+        if STREAM_REPLAY_TIMING:
+            time.sleep(delay)
+        yield chunk
+
+
+async def _replay_stream_async(
+    recording: Dict[str, List],
+) -> AsyncGenerator[Any, None]:
+    for chunk, delay in zip(recording["chunks"], recording["delays"]):
+        if STREAM_REPLAY_TIMING:
+            await asyncio.sleep(delay)
+        yield chunk
+
+
+# Maintenance #
+# ------------#
+
+
+def compact(
+    filename: Optional[str] = None,
+    *,
+    max_bytes: Optional[int] = None,
+    max_entries: Optional[int] = None,
+) -> Dict[str, int]:
+    """
+    Remove expired responses from the cache store, optionally prune the oldest
+    responses until the store fits within the given size, and then shrink the file.
+
+    Args:
+        filename: Name of the store file within the cache directory to compact.
+        Defaults to the file set via `set_caching_fname`.
+
+        max_bytes: The maximum total size of the responses to keep.
+
+        max_entries: The maximum number of responses to keep.
+
+    Returns:
+        A dict with the number of expired and pruned entries removed, and the number
+        of entries remaining.
+    """
+    backend = _create_cache_if_none(filename)
+    now = time.time()
+    expired, kept = list(), list()
+    for key, nbytes, created_at, endpoint in backend.metadata():
+        if _is_expired(created_at, endpoint, now):
+            expired.append(key)
+        else:
+            kept.append((created_at or 0.0, key, nbytes))
+    # the oldest responses are pruned first
+    kept.sort()
+    total_bytes = sum(nbytes for _, _, nbytes in kept)
+    pruned = list()
+    for _, key, nbytes in kept:
+        if (max_bytes is None or total_bytes <= max_bytes) and (
+            max_entries is None or len(kept) - len(pruned) <= max_entries
+        ):
+            break
+        pruned.append(key)
+        total_bytes -= nbytes
+    backend.delete(expired + pruned)
+    backend.vacuum()
+    _memory.discard(_get_cache_fpath(filename))
+    return dict(
+        expired=len(expired),
+        pruned=len(pruned),
+        remaining=len(kept) - len(pruned),
+    )
+
+
+def _open_dump(path: str, mode: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def export_cache(path: str, filename: Optional[str] = None) -> int:
+    """
+    Write every entry of the cache store to a line-delimited json file, which is
+    gzipped if the path ends with ".gz", to be loaded elsewhere with
+    `unify.cache.import_`.
+
+    Args:
+        path: Path of the file to write.
+
+        filename: Name of the store file within the cache directory to export.
+        Defaults to the file set via `set_caching_fname`.
+
+    Returns:
+        The number of entries exported.
+    """
+    backend = _create_cache_if_none(filename)
+    count = 0
+    with _open_dump(path, "w") as outfile:
+        for item in backend.items():
+            outfile.write(json.dumps(list(item), separators=(",", ":")) + "\n")
+            count += 1
+    return count
+
+
+def import_cache(
+    path: str,
+    filename: Optional[str] = None,
+    batch_size: int = 1000,
+) -> int:
+    """
+    Load the entries of a file written by `unify.cache.export` into the cache
+    store, replacing any entries with the same keys.
+
+    Args:
+        path: Path of the file to read.
+
+        filename: Name of the store file within the cache directory to import into.
+        Defaults to the file set via `set_caching_fname`.
+
+        batch_size: The number of entries written per transaction.
+
+    Returns:
+        The number of entries imported.
+    """
+    backend = _create_cache_if_none(filename)
+    count, batch = 0, list()
+    with _open_dump(path, "r") as infile:
+        for line in infile:
+            if not line.strip():
+                continue
+            batch.append(tuple(json.loads(line)))
+            if len(batch) == batch_size:
+                backend.set_many(batch)
+                count, batch = count + len(batch), list()
+    if batch:
+        backend.set_many(batch)
+        count += len(batch)
+    _memory.discard(_get_cache_fpath(filename))
+    return count
+
+
+def _iter_llm_spans(span: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    if span.get("type") == "llm":
+        yield span
+    for child_span in span.get("child_spans") or list():
+        yield from _iter_llm_spans(child_span)
+
+
+def warm_cache_from_logs(
+    logs: Optional[List[Any]] = None,
+    *,
+    project: Optional[str] = None,
+    filter: Optional[str] = None,
+    filename: Optional[str] = None,
+    api_key: Optional[str] = None,
+) -> int:
+    """
+    Pre-warm the completion cache from the "llm" spans of traced logs, which record
+    the arguments and the response of each completion. Streamed and structured
+    output completions are skipped, as their spans do not hold the full response.
+
+    Args:
+        logs: The logs to read the traces from. Defaults to the logs fetched with
+        `unify.get_logs` using the project, filter and api key below.
+
+        project: Name of the project to fetch the logs from.
+
+        filter: Boolean string to filter the fetched logs with.
+
+        filename: Name of the store file within the cache directory to write to.
+        Defaults to the file set via `set_caching_fname`.
+
+        api_key: If specified, unify API key to be used. Defaults to the value in the
+        `UNIFY_KEY` environment variable.
+
+    Returns:
+        The number of completions written to the cache.
+    """
+    # prevents circular import
+    import unify
+    from unify.universal_api.clients.uni_llm import _UniClient
+
+    if logs is None:
+        logs = unify.get_logs(project=project, filter=filter, api_key=api_key)
+    count = 0
+    for log in logs:
+        trace = log.entries.get("trace")
+        if not isinstance(trace, dict):
+            continue
+        for span in _iter_llm_spans(trace):
+            kw, outputs = span.get("inputs"), span.get("outputs")
+            if not isinstance(kw, dict) or not isinstance(outputs, dict):
+                continue
+            kw = _UniClient._kw_from_span(kw)
+            if kw.get("stream") or "response_format" in kw:
+                continue
+            _write_to_cache(
+                fn_name="chat.completions.create",
+                kw=kw,
+                response=ChatCompletion(**outputs),
+                filename=filename,
+            )
+            count += 1
+    return count
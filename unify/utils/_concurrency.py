@@ -0,0 +1,167 @@
+import asyncio
+import contextlib
+import threading
+import time
+from typing import Dict, Optional
+
+
+def _is_overload(e: BaseException) -> bool:
+    status = getattr(e, "status_code", None)
+    if status is None:
+        status = getattr(getattr(e, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    # the clients re-raise api errors as plain exceptions holding only the message
+    message = str(e).lower()
+    return any(s in message for s in ("429", "rate limit", "too many requests"))
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD controller for the number of concurrent calls made by `unify.map`. The
+    limit grows by one for every round of calls completing at a stable latency,
+    and is cut by `decrease_factor` when a call fails with a rate limit or server
+    error, or takes more than `spike_factor` times the typical latency.
+
+    Pass an instance as the `concurrency` of one or more maps to share the limit
+    between them, and to inspect it through `concurrency` and `stats()`.
+    """
+
+    def __init__(
+        self,
+        initial: int = 4,
+        min_concurrency: int = 1,
+        max_concurrency: Optional[int] = None,
+        decrease_factor: float = 0.5,
+        spike_factor: float = 2.0,
+    ):
+        self._limit = float(initial)
+        self._min = min_concurrency
+        self._max = max_concurrency
+        self._decrease_factor = decrease_factor
+        self._spike_factor = spike_factor
+        self._in_flight = 0
+        self._completed = 0
+        self._errors = 0
+        # moving average of the latency of successful calls
+        self._latency: Optional[float] = None
+        self._last_decrease = 0.0
+        self._started = time.monotonic()
+        self._condition = threading.Condition()
+        # wakes coroutines waiting for a slot, one per loop of the asyncio maps
+        self._events: Dict[asyncio.AbstractEventLoop, asyncio.Event] = dict()
+
+    @property
+    def concurrency(self) -> int:
+        return int(self._limit)
+
+    @property
+    def throughput(self) -> float:
+        """Completed calls per second since the controller was created."""
+        return self._completed / max(time.monotonic() - self._started, 1e-9)
+
+    def stats(self) -> Dict[str, float]:
+        with self._condition:
+            return dict(
+                concurrency=self.concurrency,
+                in_flight=self._in_flight,
+                completed=self._completed,
+                errors=self._errors,
+                throughput=self.throughput,
+                latency=self._latency,
+            )
+
+    def _set_max(self, max_concurrency: int) -> None:
+        with self._condition:
+            if self._max is None:
+                self._max = max_concurrency
+            self._limit = min(self._limit, self._max)
+
+    def _try_acquire(self) -> bool:
+        if self._in_flight >= int(self._limit):
+            return False
+        self._in_flight += 1
+        return True
+
+    def _release(self, latency: float, error: Optional[BaseException]) -> None:
+        with self._condition:
+            self._in_flight -= 1
+            overload = error is not None and _is_overload(error)
+            spike = (
+                error is None
+                and self._latency is not None
+                and latency > self._spike_factor * self._latency
+            )
+            if error is None:
+                self._completed += 1
+                self._latency = (
+                    latency
+                    if self._latency is None
+                    else 0.9 * self._latency + 0.1 * latency
+                )
+            else:
+                self._errors += 1
+            now = time.monotonic()
+            if overload or spike:
+                # calls which were already in flight do not back off again
+                if now - self._last_decrease > (self._latency or 0.0):
+                    self._limit = max(self._min, self._limit * self._decrease_factor)
+                    self._last_decrease = now
+            elif error is None:
+                self._limit += 1 / self._limit
+                if self._max is not None:
+                    self._limit = min(self._limit, self._max)
+            self._condition.notify_all()
+            events = list(self._events.items())
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        for loop, event in events:
+            if loop is running_loop:
+                event.set()
+                continue
+            # asyncio events are not thread-safe, so releases made from other
+            # threads wake the waiting coroutines from their own loop
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # the loop of an asyncio map which has since finished
+                with self._condition:
+                    self._events.pop(loop, None)
+
+    @contextlib.contextmanager
+    def track(self):
+        with self._condition:
+            while not self._try_acquire():
+                self._condition.wait()
+        t0, error = time.perf_counter(), None
+        try:
+            yield
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._release(time.perf_counter() - t0, error)
+
+    @contextlib.asynccontextmanager
+    async def track_async(self):
+        loop = asyncio.get_running_loop()
+        with self._condition:
+            event = self._events.get(loop)
+            if event is None:
+                event = self._events[loop] = asyncio.Event()
+        while True:
+            with self._condition:
+                if self._try_acquire():
+                    break
+                event.clear()
+            await event.wait()
+        t0, error = time.perf_counter(), None
+        try:
+            yield
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._release(time.perf_counter() - t0, error)
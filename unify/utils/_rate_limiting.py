@@ -0,0 +1,116 @@
+import asyncio
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# rough number of characters per token, used to estimate the size of a prompt
+CHARS_PER_TOKEN = 4
+
+# limiters shared by every map targeting the same endpoint
+_rate_limiters: Dict[str, "RateLimiter"] = dict()
+_RATE_LIMITERS_LOCK = threading.Lock()
+
+
+class _TokenBucket:
+    """
+    Token bucket refilled continuously at `rate` tokens per second, holding at most
+    `capacity` tokens. Tokens are reserved up front and may go negative, so that
+    concurrent callers queue up fairly behind one another.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, n: float) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity,
+                self._tokens + (now - self._updated) * self.rate,
+            )
+            self._updated = now
+            self._tokens -= n
+            # seconds until the bucket has refilled the reserved tokens
+            return max(-self._tokens / self.rate, 0.0)
+
+
+class RateLimiter:
+    """
+    Paces calls to at most `rps` requests per second and `tpm` estimated prompt
+    tokens per minute, allowing bursts of up to one second's worth of either.
+    """
+
+    def __init__(self, rps: Optional[float] = None, tpm: Optional[float] = None):
+        self._requests: Optional[_TokenBucket] = None
+        self._tokens: Optional[_TokenBucket] = None
+        self.configure(rps, tpm)
+
+    def configure(self, rps: Optional[float] = None, tpm: Optional[float] = None):
+        if rps is not None:
+            if self._requests is None:
+                self._requests = _TokenBucket(rps, max(rps, 1.0))
+            self._requests.rate, self._requests.capacity = rps, max(rps, 1.0)
+        if tpm is not None:
+            if self._tokens is None:
+                self._tokens = _TokenBucket(tpm / 60, tpm / 60)
+            self._tokens.rate, self._tokens.capacity = tpm / 60, tpm / 60
+
+    def _reserve(self, tokens: int) -> float:
+        delay = 0.0
+        if self._requests is not None:
+            delay = max(delay, self._requests._reserve(1))
+        if self._tokens is not None:
+            delay = max(delay, self._tokens._reserve(tokens))
+        return delay
+
+    def acquire(self, tokens: int = 0) -> None:
+        delay = self._reserve(tokens)
+        if delay:
+            time.sleep(delay)
+
+    async def acquire_async(self, tokens: int = 0) -> None:
+        delay = self._reserve(tokens)
+        if delay:
+            await asyncio.sleep(delay)
+
+
+def _get_rate_limiter(
+    key: str,
+    rps: Optional[float] = None,
+    tpm: Optional[float] = None,
+) -> Optional[RateLimiter]:
+    if rps is None and tpm is None:
+        return None
+    with _RATE_LIMITERS_LOCK:
+        limiter = _rate_limiters.get(key)
+        if limiter is None:
+            limiter = _rate_limiters[key] = RateLimiter(rps, tpm)
+        else:
+            limiter.configure(rps, tpm)
+    return limiter
+
+
+def _rate_limit_key(fn: callable) -> str:
+    # calls to the same endpoint share a limiter, whichever client makes them
+    endpoint = getattr(getattr(fn, "__self__", None), "endpoint", None)
+    if isinstance(endpoint, str):
+        return endpoint
+    return getattr(fn, "__qualname__", repr(fn))
+
+
+def _estimate_tokens(*items: Any) -> int:
+    chars = 0
+    stack = list(items)
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            chars += len(item)
+        elif isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+    return chars // CHARS_PER_TOKEN
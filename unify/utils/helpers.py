@@ -2,7 +2,7 @@ import inspect
 import json
 import os
 import threading
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
 
 import openai
 import requests
@@ -11,6 +11,9 @@ from pydantic import BaseModel, ValidationError
 
 PROJECT_LOCK = threading.Lock()
 
+# projects known to exist, per api key, to avoid listing them before every call
+_known_projects: Dict[str, Set[str]] = dict()
+
 
 def _res_to_list(response: requests.Response) -> Union[List, Dict]:
     return json.loads(response.text)
@@ -57,6 +60,22 @@ def _make_json_serializable(
         return item
 
 
+def _set_known_projects(api_key: str, projects: Iterable[str]) -> None:
+    _known_projects[api_key] = set(projects)
+
+
+def _add_known_project(api_key: str, project: str) -> None:
+    _known_projects.setdefault(api_key, set()).add(project)
+
+
+def _remove_known_project(api_key: str, project: str) -> None:
+    _known_projects.get(api_key, set()).discard(project)
+
+
+def _is_known_project(api_key: str, project: str) -> bool:
+    return project in _known_projects.get(api_key, ())
+
+
 def _get_and_maybe_create_project(
     project: Optional[str] = None,
     required: bool = True,
@@ -80,10 +99,13 @@ def _get_and_maybe_create_project(
         # acquiring the project lock here will block the async logger
         # so we skip the lock if we are in async mode
         return project
-    PROJECT_LOCK.acquire()
-    if project not in unify.list_projects(api_key=api_key):
-        unify.create_project(project, api_key=api_key)
-    PROJECT_LOCK.release()
+    if _is_known_project(api_key, project):
+        return project
+    with PROJECT_LOCK:
+        if _is_known_project(api_key, project):
+            return project
+        if project not in unify.list_projects(api_key=api_key):
+            unify.create_project(project, api_key=api_key)
     return project
 
 
@@ -0,0 +1,382 @@
+import asyncio
+import os
+import threading
+import weakref
+from typing import Any, Dict, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+import aiohttp
+import openai
+import requests
+from requests.adapters import HTTPAdapter
+
+# Transport Configuration #
+# ------------------------#
+
+POOL_CONNECTIONS = 10
+POOL_MAXSIZE = int(os.environ.get("UNIFY_HTTP_POOL_MAXSIZE", 100))
+TIMEOUT: Optional[Union[float, Tuple[float, Optional[float]]]] = (10.0, None)
+
+_sessions: Dict[Tuple[str, str], requests.Session] = dict()
+SESSIONS_LOCK = threading.Lock()
+
+# aiohttp sessions are bound to the event loop they were created in
+_async_sessions: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+OPENAI_TIMEOUT = 3600.0  # one hour
+
+_openai_clients: Dict[Tuple[str, str], openai.OpenAI] = dict()
+
+# as with aiohttp, the httpx pool of an async openai client is bound to its loop
+_async_openai_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def set_pool_size(
+    pool_maxsize: int,
+    pool_connections: Optional[int] = None,
+) -> None:
+    """
+    Set the size of the keep-alive connection pools used for all REST calls. Any
+    existing sessions are closed, and will be re-created lazily with the new size.
+
+    Args:
+        pool_maxsize: Maximum number of connections kept alive per host.
+
+        pool_connections: Number of distinct hosts to keep connection pools for.
+    """
+    global POOL_MAXSIZE, POOL_CONNECTIONS
+    POOL_MAXSIZE = pool_maxsize
+    if pool_connections is not None:
+        POOL_CONNECTIONS = pool_connections
+    close_sessions()
+    close_openai_clients()
+
+
+def set_timeout(value: Optional[Union[float, Tuple[float, Optional[float]]]]) -> None:
+    """
+    Set the default timeout for all REST calls, either as a single float or as a
+    (connect, read) tuple. Passing None disables the timeout entirely.
+
+    Args:
+        value: The timeout, in seconds.
+    """
+    global TIMEOUT
+    TIMEOUT = value
+
+
+def close_sessions() -> None:
+    """
+    Close all pooled sessions, releasing their open connections.
+    """
+    with SESSIONS_LOCK:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+def _reset_sessions_after_fork() -> None:
+    # pooled sockets must never be shared between parent and child processes
+    global SESSIONS_LOCK, _async_sessions, _async_openai_clients
+    SESSIONS_LOCK = threading.Lock()
+    _sessions.clear()
+    _async_sessions = weakref.WeakKeyDictionary()
+    _openai_clients.clear()
+    _async_openai_clients = weakref.WeakKeyDictionary()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_sessions_after_fork)
+
+
+def _create_session(api_key: str) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(
+        {
+            "accept": "application/json",
+            "Authorization": f"Bearer {api_key}",
+        },
+    )
+    return session
+
+
+def _get_session(api_key: str, url: str) -> requests.Session:
+    parts = urlsplit(url)
+    key = (api_key, f"{parts.scheme}://{parts.netloc}")
+    session = _sessions.get(key)
+    if session is not None:
+        return session
+    with SESSIONS_LOCK:
+        if key not in _sessions:
+            _sessions[key] = _create_session(api_key)
+        return _sessions[key]
+
+
+# Requests #
+# ---------#
+
+
+def request(method: str, url: str, *, api_key: str, **kwargs) -> requests.Response:
+    """
+    Send a request through the pooled keep-alive session for this api key and host.
+
+    Args:
+        method: The HTTP method, such as "GET" or "POST".
+
+        url: The full url to send the request to.
+
+        api_key: The unify API key to authenticate the request with.
+
+        kwargs: Any additional arguments accepted by `requests.Session.request`.
+
+    Returns:
+        The response.
+    """
+    kwargs.setdefault("timeout", TIMEOUT)
+    return _get_session(api_key, url).request(method, url, **kwargs)
+
+
+def get(url: str, *, api_key: str, **kwargs) -> requests.Response:
+    return request("GET", url, api_key=api_key, **kwargs)
+
+
+def post(url: str, *, api_key: str, **kwargs) -> requests.Response:
+    return request("POST", url, api_key=api_key, **kwargs)
+
+
+def put(url: str, *, api_key: str, **kwargs) -> requests.Response:
+    return request("PUT", url, api_key=api_key, **kwargs)
+
+
+def patch(url: str, *, api_key: str, **kwargs) -> requests.Response:
+    return request("PATCH", url, api_key=api_key, **kwargs)
+
+
+def delete(url: str, *, api_key: str, **kwargs) -> requests.Response:
+    return request("DELETE", url, api_key=api_key, **kwargs)
+
+
+# Async Requests #
+# ---------------#
+
+
+class AsyncResponse:
+    """
+    The fully-read response of an async request, exposing the same `status_code`,
+    `text` and `json()` interface as `requests.Response`.
+    """
+
+    def __init__(self, status_code: int, text: str, body: Any):
+        self.status_code = status_code
+        self.text = text
+        self._body = body
+
+    def json(self) -> Any:
+        return self._body
+
+
+def _encode_params(params: Optional[Dict[str, Any]]) -> Optional[List[Tuple[str, str]]]:
+    # mirrors the query encoding of requests, which aiohttp does not do for us
+    if params is None:
+        return None
+    encoded = list()
+    for k, v in params.items():
+        for item in v if isinstance(v, (list, tuple)) else [v]:
+            if item is not None:
+                encoded.append((k, item if isinstance(item, str) else str(item)))
+    return encoded
+
+
+def _get_async_session(api_key: str, url: str) -> aiohttp.ClientSession:
+    loop = asyncio.get_running_loop()
+    parts = urlsplit(url)
+    key = (api_key, f"{parts.scheme}://{parts.netloc}")
+    loop_sessions = _async_sessions.setdefault(loop, dict())
+    session = loop_sessions.get(key)
+    if session is None or session.closed:
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=POOL_MAXSIZE),
+            headers={
+                "accept": "application/json",
+                "Authorization": f"Bearer {api_key}",
+            },
+        )
+        loop_sessions[key] = session
+    return session
+
+
+def _async_timeout(
+    timeout: Optional[Union[float, Tuple[float, Optional[float]]]],
+) -> aiohttp.ClientTimeout:
+    if isinstance(timeout, tuple):
+        return aiohttp.ClientTimeout(sock_connect=timeout[0], sock_read=timeout[1])
+    return aiohttp.ClientTimeout(total=timeout)
+
+
+async def async_request(
+    method: str,
+    url: str,
+    *,
+    api_key: str,
+    params: Optional[Dict[str, Any]] = None,
+    **kwargs,
+) -> AsyncResponse:
+    """
+    Send a request through the pooled aiohttp session for this api key, host and
+    running event loop.
+
+    Args:
+        method: The HTTP method, such as "GET" or "POST".
+
+        url: The full url to send the request to.
+
+        api_key: The unify API key to authenticate the request with.
+
+        params: Query parameters, encoded in the same manner as `requests`.
+
+        kwargs: Any additional arguments accepted by `aiohttp.ClientSession.request`.
+
+    Returns:
+        The fully-read response.
+    """
+    kwargs.setdefault("timeout", _async_timeout(TIMEOUT))
+    session = _get_async_session(api_key, url)
+    async with session.request(
+        method,
+        url,
+        params=_encode_params(params),
+        **kwargs,
+    ) as response:
+        text = await response.text()
+        try:
+            body = await response.json(content_type=None)
+        except ValueError:
+            body = text
+        return AsyncResponse(response.status, text, body)
+
+
+async def async_get(url: str, *, api_key: str, **kwargs) -> AsyncResponse:
+    return await async_request("GET", url, api_key=api_key, **kwargs)
+
+
+async def async_post(url: str, *, api_key: str, **kwargs) -> AsyncResponse:
+    return await async_request("POST", url, api_key=api_key, **kwargs)
+
+
+async def async_put(url: str, *, api_key: str, **kwargs) -> AsyncResponse:
+    return await async_request("PUT", url, api_key=api_key, **kwargs)
+
+
+async def async_patch(url: str, *, api_key: str, **kwargs) -> AsyncResponse:
+    return await async_request("PATCH", url, api_key=api_key, **kwargs)
+
+
+async def async_delete(url: str, *, api_key: str, **kwargs) -> AsyncResponse:
+    return await async_request("DELETE", url, api_key=api_key, **kwargs)
+
+
+async def close_async_sessions() -> None:
+    """
+    Close all pooled aiohttp sessions belonging to the running event loop.
+    """
+    loop_sessions = _async_sessions.pop(asyncio.get_running_loop(), dict())
+    for session in loop_sessions.values():
+        await session.close()
+
+
+# OpenAI Clients #
+# ---------------#
+
+
+def _httpx_limits():
+    # built from openai's own defaults, so as not to depend on its httpx directly
+    return type(openai.DEFAULT_CONNECTION_LIMITS)(
+        max_connections=POOL_MAXSIZE,
+        max_keepalive_connections=POOL_MAXSIZE,
+    )
+
+
+def get_openai_client(api_key: str, base_url: str) -> openai.OpenAI:
+    """
+    Get the process-wide `openai.OpenAI` client for this api key and base url, so
+    that all sync clients share one keep-alive connection pool.
+
+    Args:
+        api_key: The unify API key to authenticate the requests with.
+
+        base_url: The base url of the OpenAI-compatible API.
+
+    Returns:
+        The shared client.
+    """
+    key = (api_key, base_url)
+    client = _openai_clients.get(key)
+    if client is not None:
+        return client
+    with SESSIONS_LOCK:
+        if key not in _openai_clients:
+            _openai_clients[key] = openai.OpenAI(
+                base_url=base_url,
+                api_key=api_key,
+                timeout=OPENAI_TIMEOUT,
+                http_client=openai.DefaultHttpxClient(limits=_httpx_limits()),
+            )
+        return _openai_clients[key]
+
+
+def get_async_openai_client(api_key: str, base_url: str) -> openai.AsyncOpenAI:
+    """
+    Get the `openai.AsyncOpenAI` client for this api key and base url, shared by all
+    async clients within the running event loop. Outside an event loop, a new client
+    is returned, as it cannot be known which loop it will later be used in.
+
+    Args:
+        api_key: The unify API key to authenticate the requests with.
+
+        base_url: The base url of the OpenAI-compatible API.
+
+    Returns:
+        The shared client.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    key = (api_key, base_url)
+    loop_clients = dict() if loop is None else _async_openai_clients.get(loop)
+    if loop_clients is None:
+        loop_clients = _async_openai_clients.setdefault(loop, dict())
+    client = loop_clients.get(key)
+    if client is None or client.is_closed():
+        client = openai.AsyncOpenAI(
+            base_url=base_url,
+            api_key=api_key,
+            timeout=OPENAI_TIMEOUT,
+            http_client=openai.DefaultAsyncHttpxClient(limits=_httpx_limits()),
+        )
+        loop_clients[key] = client
+    return client
+
+
+def close_openai_clients() -> None:
+    """
+    Close all shared sync openai clients, releasing their open connections.
+    """
+    with SESSIONS_LOCK:
+        for client in _openai_clients.values():
+            client.close()
+        _openai_clients.clear()
+
+
+async def close_async_openai_clients() -> None:
+    """
+    Close all shared async openai clients belonging to the running event loop.
+    """
+    loop_clients = _async_openai_clients.pop(asyncio.get_running_loop(), dict())
+    for client in loop_clients.values():
+        await client.close()
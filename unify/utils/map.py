@@ -1,10 +1,33 @@
 import asyncio
+import contextlib
 import contextvars
-import threading
-from typing import Any, List
+import os
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from typing import Any, Deque, Dict, Iterable, Iterator, Optional, Tuple, Union
 
 from tqdm import tqdm
 
+from ._concurrency import AdaptiveConcurrency
+from ._rate_limiting import _estimate_tokens, _get_rate_limiter, _rate_limit_key
+
+# upper bound on the threads started by a single threaded map
+MAP_MAX_WORKERS = int(os.environ.get("UNIFY_MAP_MAX_WORKERS", 64))
+# logging context carried into the workers of a process map
+_PROCESS_CONTEXT_VARS = (
+    "ACTIVE_ENTRIES",
+    "ENTRIES_NEST_LEVEL",
+    "ACTIVE_PARAMS",
+    "PARAMS_NEST_LEVEL",
+    "COLUMN_CONTEXT",
+)
+
 
 def _is_iterable(item: Any) -> bool:
     try:
@@ -14,6 +37,50 @@ def _is_iterable(item: Any) -> bool:
         return False
 
 
+def _format_name(name: str) -> str:
+    if not name:
+        return name
+    return " ".join(substr[0].upper() + substr[1:] for substr in name.split("_")) + " "
+
+
+def _as_args_n_kwargs(item: Any) -> Tuple[tuple, dict]:
+    if not isinstance(item, tuple):
+        if isinstance(item, dict):
+            return (), item
+        return (item,), {}
+    elif (
+        not isinstance(item[0], tuple) or len(item) < 2 or not isinstance(item[1], dict)
+    ):
+        return item, {}
+    return item
+
+
+def _get_process_context() -> Dict[str, Any]:
+    import unify
+    from unify.logging.utils import logs
+
+    return dict(
+        project=unify.active_project(),
+        context_vars={
+            name: getattr(logs, name).get() for name in _PROCESS_CONTEXT_VARS
+        },
+    )
+
+
+def _init_process(context: Dict[str, Any]) -> None:
+    import unify
+    from unify.logging.utils import logs
+
+    unify.PROJECT = context["project"]
+    for name, value in context["context_vars"].items():
+        getattr(logs, name).set(value)
+
+
+def _call_in_process(fn: callable, a, kw) -> Any:
+    # workers are reused, so changes made by one call must not leak into the next
+    return contextvars.copy_context().run(fn, *a, **kw)
+
+
 # noinspection PyShadowingBuiltins
 def map(
     fn: callable,
@@ -21,19 +88,57 @@ def map(
     mode="threading",
     name="",
     from_args=False,
+    max_workers: Optional[int] = None,
+    chunksize: Optional[int] = None,
+    rps: Optional[float] = None,
+    tpm: Optional[float] = None,
+    rate_limit_key: Optional[str] = None,
+    concurrency: Optional[Union[str, AdaptiveConcurrency]] = None,
     **kwargs,
 ) -> Any:
 
-    if name:
-        name = (
-            " ".join(substr[0].upper() + substr[1:] for substr in name.split("_")) + " "
-        )
+    name = _format_name(name)
 
     assert mode in (
         "threading",
         "asyncio",
         "loop",
-    ), "map mode must be one of threading, asyncio or loop."
+        "process",
+    ), "map mode must be one of threading, asyncio, loop or process."
+
+    # pace the calls, sharing the budget with other maps over the same endpoint
+    limiter = _get_rate_limiter(
+        _rate_limit_key(fn) if rate_limit_key is None else rate_limit_key,
+        rps,
+        tpm,
+    )
+    assert (
+        limiter is None or mode != "process"
+    ), "rate limiting is not supported in process mode."
+
+    if concurrency == "adaptive":
+        concurrency = AdaptiveConcurrency()
+    assert concurrency is None or (
+        isinstance(concurrency, AdaptiveConcurrency)
+        and mode in ("threading", "asyncio")
+    ), (
+        'concurrency must be "adaptive" or an AdaptiveConcurrency, '
+        "in threading or asyncio mode."
+    )
+    if concurrency is not None:
+        concurrency._set_max(MAP_MAX_WORKERS if max_workers is None else max_workers)
+        track = concurrency.track
+    else:
+        track = contextlib.nullcontext
+
+    def update_pbar() -> None:
+        pbar.update(1)
+        if concurrency is not None:
+            pbar.set_postfix(
+                concurrency=concurrency.concurrency,
+                throughput=f"{concurrency.throughput:.1f}/s",
+                refresh=False,
+            )
 
     if from_args:
         args = list(args)
@@ -86,6 +191,8 @@ def map(
 
         returns = list()
         for a, kw in args_n_kwargs:
+            if limiter is not None:
+                limiter.acquire(_estimate_tokens(a, kw))
             returns.append(fn(*a, **kw))
             pbar.update(1)
         pbar.close()
@@ -95,35 +202,67 @@ def map(
 
         pbar.set_description(f"{name}Threads")
 
-        def fn_w_indexing(rets: List[None], thread_idx: int, *a, **kw):
-            for var, value in kw["context"].items():
-                var.set(value)
-            del kw["context"]
-            ret = fn(*a, **kw)
-            pbar.update(1)
-            rets[thread_idx] = ret
-
-        threads = list()
-        returns = [None] * num_calls
-        for i, a_n_kw in enumerate(args_n_kwargs):
-            a, kw = a_n_kw
-            kw["context"] = contextvars.copy_context()
-            thread = threading.Thread(
-                target=fn_w_indexing,
-                args=(returns, i, *a),
-                kwargs=kw,
-            )
-            thread.start()
-            threads.append(thread)
-        [thread.join() for thread in threads]
+        def fn_w_context(context: contextvars.Context, a, kw):
+            if limiter is not None:
+                limiter.acquire(_estimate_tokens(a, kw))
+            with track():
+                # pool threads are reused, so each call runs in its own copied context
+                ret = context.run(fn, *a, **kw)
+            update_pbar()
+            return ret
+
+        # a pool per call, as a shared one would deadlock on nested maps
+        max_workers = MAP_MAX_WORKERS if max_workers is None else max_workers
+        with ThreadPoolExecutor(
+            max_workers=max(min(max_workers, num_calls), 1),
+        ) as pool:
+            futures = [
+                pool.submit(fn_w_context, contextvars.copy_context(), a, kw)
+                for a, kw in args_n_kwargs
+            ]
+            returns = [future.result() for future in futures]
+        pbar.close()
+        return returns
+
+    elif mode == "process":
+
+        pbar.set_description(f"{name}Processes")
+
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        max_workers = max(min(max_workers, num_calls), 1)
+        if chunksize is None:
+            # a few chunks per worker, to amortize pickling while balancing the load
+            chunksize = max(num_calls // (max_workers * 4), 1)
+        returns = list()
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_process,
+            initargs=(_get_process_context(),),
+        ) as pool:
+            for ret in pool.map(
+                _call_in_process,
+                [fn] * num_calls,
+                [a for a, _ in args_n_kwargs],
+                [kw for _, kw in args_n_kwargs],
+                chunksize=chunksize,
+            ):
+                returns.append(ret)
+                pbar.update(1)
         pbar.close()
         return returns
 
     pbar.set_description(f"{name}Coroutines")
 
     async def _wrapped(*a, **kw):
-        ret = await fn(*a, **kw)
-        pbar.update(1)
+        if limiter is not None:
+            await limiter.acquire_async(_estimate_tokens(a, kw))
+        if concurrency is None:
+            ret = await fn(*a, **kw)
+        else:
+            async with concurrency.track_async():
+                ret = await fn(*a, **kw)
+        update_pbar()
         return ret
 
     fns = []
@@ -137,3 +276,111 @@ def map(
         return ret
 
     return asyncio.run(main())
+
+
+def imap(
+    fn: callable,
+    iterable: Iterable[Any],
+    *,
+    mode: str = "threading",
+    name: str = "",
+    ordered: bool = True,
+    max_workers: Optional[int] = None,
+    max_in_flight: Optional[int] = None,
+) -> Iterator[Any]:
+    """
+    Lazily map a function across an iterable, yielding each result as soon as it is
+    available. Items are drawn from the iterable only as calls complete, so at most
+    `max_in_flight` calls are pending at once and memory use stays constant.
+
+    Args:
+        fn: The function to call for each item.
+
+        iterable: The items to map across, each being a single argument, a dict of
+        keyword arguments, a tuple of arguments, or a tuple of arguments and a dict
+        of keyword arguments.
+
+        mode: One of "threading", "process" or "loop", as for `unify.map`.
+
+        name: Name shown in the progress bar.
+
+        ordered: Whether to yield the results in the order of the items, rather
+        than in the order the calls complete.
+
+        max_workers: The maximum number of threads or processes. Defaults to those
+        of `unify.map`.
+
+        max_in_flight: The maximum number of calls submitted but not yet yielded.
+        Defaults to twice the number of workers.
+
+    Yields:
+        The result of each call.
+    """
+    name = _format_name(name)
+    assert mode in (
+        "threading",
+        "loop",
+        "process",
+    ), "imap mode must be one of threading, loop or process."
+    items = (_as_args_n_kwargs(item) for item in iterable)
+    pbar = tqdm(total=len(iterable) if hasattr(iterable, "__len__") else None)
+
+    if mode == "loop":
+        pbar.set_description(f"{name}Iterations")
+        try:
+            for a, kw in items:
+                ret = fn(*a, **kw)
+                pbar.update(1)
+                yield ret
+        finally:
+            pbar.close()
+        return
+
+    if mode == "threading":
+        pbar.set_description(f"{name}Threads")
+        max_workers = MAP_MAX_WORKERS if max_workers is None else max_workers
+        pool = ThreadPoolExecutor(max_workers=max_workers)
+
+        def submit(a: tuple, kw: dict) -> Future:
+            return pool.submit(contextvars.copy_context().run, fn, *a, **kw)
+
+    else:
+        pbar.set_description(f"{name}Processes")
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        pool = ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_process,
+            initargs=(_get_process_context(),),
+        )
+
+        def submit(a: tuple, kw: dict) -> Future:
+            return pool.submit(_call_in_process, fn, a, kw)
+
+    if max_in_flight is None:
+        max_in_flight = max_workers * 2
+
+    in_flight: Deque[Future] = deque()
+
+    def next_done() -> Future:
+        if ordered:
+            future = in_flight.popleft()
+        else:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            future = next(iter(done))
+            in_flight.remove(future)
+        ret = future.result()
+        pbar.update(1)
+        return ret
+
+    try:
+        for a, kw in items:
+            if len(in_flight) >= max_in_flight:
+                yield next_done()
+            in_flight.append(submit(a, kw))
+        while in_flight:
+            yield next_done()
+    finally:
+        # also reached when the caller stops early, dropping the pending calls
+        pool.shutdown(wait=True, cancel_futures=True)
+        pbar.close()